@@ -0,0 +1,112 @@
+"""Custo da emissão por nó em código com muitas chamadas e das buscas de tipos.
+
+Uso: python benchmarks/emission.py [linhas] [--revs REV1,REV2,...]
+
+A primeira parte mede só a emissão (depois da análise) de um módulo gerado
+em que quase toda linha chama builtins e métodos, o caso que passa pela
+tabela de despacho de expressões e pelos registros de lowerings. Cada
+revisão roda em um processo próprio (ver revisions.py); as padrão são a
+anterior ao despacho por tabela (getattr com nome montado e cadeias de if
+para built-ins e métodos), a do despacho por tabela e a árvore atual. A
+segunda parte mede a construção de tipos internados e as buscas no
+TypeEnvironment da árvore atual.
+"""
+import ast
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from revisions import ROOT, checkout, measure, parse_revs
+
+sys.path.insert(0, ROOT)
+
+from py2swift.swift_types import DOUBLE, INT, STRING, array_of, dict_of  # noqa: E402
+from py2swift.symbol_table import TypeEnvironment  # noqa: E402
+
+# 2b0d78c: "Table-driven expression dispatch and a public lowering registry"
+DEFAULT_REVS = ('2b0d78c^', '2b0d78c', '.')
+
+_EMISSION_TIMER = r"""
+import time
+from py2swift.transpiler import PyToSwiftTranspiler
+source = open(sys.argv[1], encoding='utf-8').read()
+best = float('inf')
+for _ in range(5):
+    # iter_generate roda a análise antes de retornar: só a emissão é medida
+    chunks = PyToSwiftTranspiler().iter_generate(source)
+    start = time.perf_counter()
+    "".join(chunks)
+    best = min(best, time.perf_counter() - start)
+print(best)
+"""
+
+
+def generate_module(lines: int) -> str:
+    """Funções de ~10 linhas dominadas por chamadas de builtins e métodos"""
+    parts = []
+    for i in range(max(1, lines // 10)):
+        parts.append(f"def g{i}(words, n):\n"
+                     f"    out = []\n"
+                     f"    for w in words:\n"
+                     f"        out.append(w.strip().lower().replace('a', 'b'))\n"
+                     f"    total = len(out) + abs(n) + min(n, 3) + max(n, len(words))\n"
+                     f"    text = ', '.join(sorted(out))\n"
+                     f"    print(str(total), text.upper(), int(n), float(n))\n"
+                     f"    counts = {{}}\n"
+                     f"    counts['k'] = counts.get('k', 0) + round(float(n))\n"
+                     f"    return total + sum(range(n))\n")
+    return "\n".join(parts)
+
+
+def type_lookups(rounds: int):
+    env = TypeEnvironment()
+    cls = TypeEnvironment.child_scope(TypeEnvironment.GLOBAL, 'class', 'A')
+    method = TypeEnvironment.child_scope(cls, 'func', 'm')
+    env.declare_scope(cls, TypeEnvironment.GLOBAL)
+    env.declare_scope(method, cls)
+    env.set(TypeEnvironment.GLOBAL, 'xs', array_of(INT))
+    start = time.perf_counter()
+    for _ in range(rounds):
+        array_of(INT)
+        dict_of(STRING, array_of(DOUBLE))
+        env.resolve(method, 'xs')
+    return time.perf_counter() - start
+
+
+def main():
+    args = sys.argv[1:]
+    revs = parse_revs(args, DEFAULT_REVS)
+    lines = int(args[0]) if args else 3000
+    source = generate_module(lines)
+    tree = ast.parse(source)
+    nodes = sum(1 for _ in ast.walk(tree))
+    calls = sum(isinstance(node, ast.Call) for node in ast.walk(tree))
+    print(f"emissão de {lines} linhas ({nodes} nós, {calls} chamadas):")
+    times = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        source_path = os.path.join(tmp, 'module.py')
+        with open(source_path, 'w', encoding='utf-8') as f:
+            f.write(source)
+        for n, rev in enumerate(revs):
+            best = times[rev] = measure(checkout(rev, os.path.join(tmp, f'rev{n}')), _EMISSION_TIMER, source_path)
+            print(f"{rev:>10}: {best * 1000:8.1f} ms, {best / nodes * 1e9:6.0f} ns/nó, "
+                  f"{best / calls * 1e6:6.2f} us/chamada")
+    first = times[revs[0]]
+    for rev in revs[1:]:
+        print(f"{rev:>10}: {first / times[rev]:.2f}x mais rápido que {revs[0]}")
+
+    rounds = 200_000
+    best = min(type_lookups(rounds) for _ in range(5))
+    print(f"   tipos: {best / rounds * 1e9:8.0f} ns por rodada (2 construções internadas + 1 resolve)")
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    type_lookups(rounds)
+    after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"memória: {after - before} bytes retidos, pico {peak - before} bytes em {rounds} rodadas")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""Transpilação de ponta a ponta antes e depois do front end fundido.
+
+Uso: python benchmarks/front_end.py [linhas] [--revs REV1,REV2,...]
+
+Cada revisão é extraída do git (git archive) para um diretório temporário
+e medida em um processo próprio, com generate() sobre o mesmo módulo
+gerado (melhor de 5). As revisões padrão são a anterior à fusão das
+análises (cada verificação e a inferência com o seu próprio ast.walk), a
+da fusão e a árvore de trabalho atual ('.').
+"""
+import os
+import sys
+import tempfile
+
+from revisions import checkout, measure, parse_revs
+
+# 537d304: "Fuse walk-only front-end analyses into one traversal"
+DEFAULT_REVS = ('537d304^', '537d304', '.')
+
+_TIMER = r"""
+import time
+from py2swift.transpiler import PyToSwiftTranspiler
+source = open(sys.argv[1], encoding='utf-8').read()
+best = float('inf')
+for _ in range(5):
+    start = time.perf_counter()
+    PyToSwiftTranspiler().generate(source)
+    best = min(best, time.perf_counter() - start)
+print(best)
+"""
+
+
+def generate_module(lines: int) -> str:
+    """Módulo com funções de ~10 linhas até somar o número pedido"""
+    parts = []
+    for i in range(max(1, lines // 10)):
+        parts.append(f"def f{i}(a, b):\n"
+                     f"    total = 0\n"
+                     f"    for k in range(a):\n"
+                     f"        if k % 3 == 0 and k > 1:\n"
+                     f"            total += k * b\n"
+                     f"        else:\n"
+                     f"            total -= a // 2\n"
+                     f"    xs = [total, a, b]\n"
+                     f"    xs[0], xs[1] = xs[1], xs[0]\n"
+                     f"    return total + f{max(i - 1, 0)}(a, b) ** 2\n")
+    return "\n".join(parts)
+
+
+def main():
+    args = sys.argv[1:]
+    revs = parse_revs(args, DEFAULT_REVS)
+    lines = int(args[0]) if args else 20000
+    with tempfile.TemporaryDirectory() as tmp:
+        source_path = os.path.join(tmp, 'module.py')
+        with open(source_path, 'w', encoding='utf-8') as f:
+            f.write(generate_module(lines))
+        times = {}
+        for n, rev in enumerate(revs):
+            package_root = checkout(rev, os.path.join(tmp, f'rev{n}'))
+            times[rev] = measure(package_root, _TIMER, source_path)
+            print(f"{rev:>10}: {times[rev] * 1000:8.1f} ms")
+    first = times[revs[0]]
+    for rev in revs[1:]:
+        print(f"{rev:>10}: {first / times[rev]:.2f}x mais rápido que {revs[0]} ({lines} linhas)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+"""Mede o mesmo trabalho em revisões diferentes do pacote (usado pelos benchmarks).
+
+Cada revisão tem py2swift/ extraído do git (git archive) para um diretório
+temporário e roda em um processo próprio, então versões antigas e a árvore
+de trabalho ('.') nunca se misturam no mesmo interpretador.
+"""
+import io
+import os
+import subprocess
+import sys
+import tarfile
+from typing import Sequence
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def parse_revs(args: list, default: Sequence[str]) -> tuple:
+    """Remove --revs REV1,REV2 de args e devolve as revisões (ou default)"""
+    if '--revs' not in args:
+        return tuple(default)
+    i = args.index('--revs')
+    revs = tuple(rev for rev in args[i + 1].split(',') if rev)
+    del args[i:i + 2]
+    return revs
+
+
+def checkout(rev: str, target: str) -> str:
+    """Extrai py2swift/ da revisão rev em target (ou usa a árvore atual para '.')"""
+    if rev == '.':
+        return ROOT
+    archive = subprocess.run(['git', 'archive', rev, 'py2swift'], cwd=ROOT,
+                             capture_output=True, check=True).stdout
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(target)
+    return target
+
+
+def measure(package_root: str, timer: str, *args: str) -> float:
+    """Roda o script timer com py2swift de package_root; devolve o número da última linha"""
+    code = f"import sys\nsys.path.insert(0, {package_root!r})\n{timer}"
+    out = subprocess.run([sys.executable, '-c', code, *args],
+                         capture_output=True, text=True, check=True).stdout
+    return float(out.strip().splitlines()[-1])
@@ -1,4 +1,8 @@
-from .transpiler import transpile, PyToSwiftTranspiler
-from .exceptions import TranspileError, UnsupportedFeatureError
+from .transpiler import transpile, transpile_to, transpile_with_source_map, PyToSwiftTranspiler
+from .pool import TranspilerPool
+from .batch import transpile_many, TranspileResult
+from .aio import atranspile, atranspile_many, AsyncTranspiler
+from .incremental import IncrementalTranspiler
+from .exceptions import TranspileError, UnsupportedFeatureError, TranspilerInUseError
 
-__all__ = ['transpile', 'PyToSwiftTranspiler', 'TranspileError', 'UnsupportedFeatureError']
\ No newline at end of file
+__all__ = ['transpile', 'transpile_to', 'transpile_with_source_map', 'PyToSwiftTranspiler', 'TranspilerPool', 'transpile_many', 'TranspileResult', 'atranspile', 'atranspile_many', 'AsyncTranspiler', 'IncrementalTranspiler', 'TranspileError', 'UnsupportedFeatureError', 'TranspilerInUseError']
\ No newline at end of file
@@ -1,31 +1,123 @@
+import json
+import os
 import sys
 from pathlib import Path
-from .transpiler import transpile_source
+from .exceptions import TranspileError
+from .transpiler import PyToSwiftTranspiler
+from . import tracing
 
 
 def main(argv=None):
     if argv is None:
         argv = sys.argv[1:]
+    trace_path = None
+    if "--trace" in argv:
+        i = argv.index("--trace")
+        if i + 1 >= len(argv):
+            print("--trace requires an output path")
+            return 1
+        trace_path = argv[i + 1]
+        argv = argv[:i] + argv[i + 2:]
+    if trace_path is None:
+        return _run(argv)
+    # JSON timing trace (phases, per-statement timings, type decisions)
+    writer = tracing.subscribe(tracing.JsonTraceWriter())
+    try:
+        return _run(argv)
+    finally:
+        tracing.unsubscribe(writer)
+        writer.dump(trace_path)
+        print(f"Wrote trace: {trace_path}", file=sys.stderr)
+
+
+def _run(argv):
     if not argv:
-        print("Usage: python -m py2swift <input.py> [output.swift] [--emit-runtime]")
+        print("Usage: python -m py2swift <input.py> [output.swift | -] [--emit-runtime] [--trace trace.json] [--workers N] [--only name1,name2] [--source-map out.map] [--disable-passes swap,range_for]")
         return 1
     emit_runtime = False
     args = [a for a in argv if a != "--emit-runtime"]
     if "--emit-runtime" in argv:
         emit_runtime = True
-    native_mode = False
-    if "--native" in argv:
-        native_mode = True
-        args = [a for a in args if a != "--native"]
+    # --native was accepted by older versions; there is only one mode now
+    args = [a for a in args if a != "--native"]
+    workers = 0
+    if "--workers" in args:
+        i = args.index("--workers")
+        if i + 1 >= len(args) or not args[i + 1].isdigit():
+            print("--workers requires a number")
+            return 1
+        workers = int(args[i + 1])
+        del args[i:i + 2]
+    only = None
+    if "--only" in args:
+        i = args.index("--only")
+        if i + 1 >= len(args):
+            print("--only requires a comma-separated list of names")
+            return 1
+        only = [name for name in args[i + 1].split(",") if name]
+        del args[i:i + 2]
+    disabled_passes = ()
+    if "--disable-passes" in args:
+        i = args.index("--disable-passes")
+        if i + 1 >= len(args):
+            print("--disable-passes requires a comma-separated list of pass names")
+            return 1
+        disabled_passes = [name for name in args[i + 1].split(",") if name]
+        del args[i:i + 2]
+    map_path = None
+    if "--source-map" in args:
+        i = args.index("--source-map")
+        if i + 1 >= len(args):
+            print("--source-map requires an output path")
+            return 1
+        map_path = Path(args[i + 1])
+        del args[i:i + 2]
+    if not args:
+        print("Input file not given")
+        return 1
+    if emit_runtime and len(args) > 1 and args[1] == "-":
+        # there is no output directory to place PyRuntime.swift in
+        print("--emit-runtime cannot be combined with '-' (stdout) output")
+        return 1
+    try:
+        PyToSwiftTranspiler(disabled_passes=disabled_passes)
+    except ValueError as e:
+        print(e)
+        return 1
     inp = Path(args[0])
     if not inp.exists():
         print(f"Input file not found: {inp}")
         return 2
-    out = Path(args[1]) if len(args) > 1 else inp.with_suffix('.swift')
     src = inp.read_text(encoding='utf-8')
-    swift = transpile_source(src, native=native_mode)
-    out.write_text(swift, encoding='utf-8')
+    if len(args) > 1 and args[1] == "-":
+        # stream straight to stdout, one top-level statement at a time
+        transpiler = PyToSwiftTranspiler(workers, disabled_passes, record_origins=map_path is not None)
+        try:
+            transpiler.generate_to(src, sys.stdout, flush=True, only=only)
+        except TranspileError as e:
+            print(e, file=sys.stderr)
+            return 1
+        if map_path is not None:
+            _write_source_map(transpiler, map_path, inp.with_suffix(".swift"), inp)
+        return 0
+    out = Path(args[1]) if len(args) > 1 else inp.with_suffix('.swift')
+    # stream into a temporary file so a failed run never leaves a truncated output
+    tmp = out.with_name(out.name + ".tmp")
+    try:
+        with tmp.open('w', encoding='utf-8') as stream:
+            transpiler = PyToSwiftTranspiler(workers, disabled_passes, record_origins=map_path is not None)
+            transpiler.generate_to(src, stream, only=only)
+        os.replace(tmp, out)
+    except TranspileError as e:
+        # syntax errors, unsupported features, unknown --only names
+        print(e)
+        return 1
+    finally:
+        if tmp.exists():
+            tmp.unlink()
     print(f"Wrote: {out}")
+    if map_path is not None:
+        _write_source_map(transpiler, map_path, out, inp)
     if emit_runtime:
         # write a small runtime helper next to the output
         runtime = Path(__file__).parent / "templates" / "py_runtime.swift"
@@ -38,5 +130,14 @@ def main(argv=None):
     return 0
 
 
+def _write_source_map(transpiler, map_path, out, inp):
+    # v3 source map: Swift output lines -> Python (line, column); paths relative to the map
+    base = map_path.resolve().parent
+    source_map = transpiler.source_map(os.path.relpath(Path(out).resolve(), base),
+                                       os.path.relpath(inp.resolve(), base))
+    map_path.write_text(json.dumps(source_map), encoding='utf-8')
+    print(f"Wrote source map: {map_path}", file=sys.stderr)
+
+
 if __name__ == '__main__':
     raise SystemExit(main())
@@ -0,0 +1,250 @@
+"""API assíncrona: transpila em processos sem bloquear o event loop.
+
+    swift = await atranspile(codigo, timeout=5)
+    results = await atranspile_many(codigos, timeout=5)
+
+Cada chamada ocupa um processo worker exclusivo; chamadas além do número
+de workers esperam uma vaga (a espera pode ser cancelada sem custo). Se a
+chamada for cancelada (ex.: o cliente desconectou) ou estourar o timeout
+enquanto o worker ainda trabalha, o worker é encerrado e substituído sob
+demanda, então nenhum processo continua gastando CPU com um trabalho
+abandonado.
+"""
+import asyncio
+import atexit
+import multiprocessing
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Optional
+
+from .batch import BatchResult, BatchStats, TranspileResult, transpile_one
+from .exceptions import TranspileError, UnsupportedFeatureError
+
+
+def _worker_main(conn):
+    """Laço do processo worker: recebe códigos e devolve TranspileResult (None encerra)"""
+    while True:
+        try:
+            source = conn.recv()
+        except (EOFError, OSError):
+            return
+        if source is None:
+            return
+        conn.send(transpile_one(source))
+
+
+class _WorkerDied(Exception):
+    """O processo worker terminou (ou o Pipe quebrou) durante um trabalho"""
+
+
+class _Worker:
+    """Processo worker ligado ao pai por um Pipe"""
+
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def run(self, source: str) -> TranspileResult:
+        """Bloqueante; roda em uma thread auxiliar"""
+        try:
+            self.conn.send(source)
+            return self.conn.recv()
+        except (EOFError, OSError) as e:
+            # worker encerrado: quem lia o Pipe o fecha (evita fechar sob outra thread)
+            self.conn.close()
+            raise _WorkerDied(repr(e)) from e
+
+    def kill(self):
+        """Encerra o processo; uma thread presa em run() recebe EOF e fecha o Pipe"""
+        self.process.kill()
+        self.process.join()
+
+    def stop(self):
+        # Com fork, outros workers herdam este Pipe, então só fechá-lo não gera EOF
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.conn.close()
+        self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+
+
+class AsyncTranspiler:
+    """Pool gerenciado de processos para transpilar a partir de corrotinas.
+
+    workers limita as chamadas simultâneas (padrão os.cpu_count()).
+    mp_context escolhe o método de início dos processos; o padrão é
+    'forkserver' (ou 'spawn' onde não existe), nunca 'fork': os workers
+    nascem sob demanda, quando as threads de espera já existem, e fazer
+    fork de um processo com várias threads pode travar o filho. Os workers
+    são reutilizados; close() os encerra. Use cada instância a partir de
+    um event loop por vez.
+    """
+
+    def __init__(self, workers: Optional[int] = None, mp_context=None):
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self._context = mp_context or _default_context()
+        self._idle: List[_Worker] = []
+        self._busy = set()
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._slots_loop = None
+        # Threads que esperam a resposta dos workers (uma por worker ocupado)
+        self._waiters = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='py2swift-aio')
+        self._closed = False
+
+    async def __aenter__(self) -> 'AsyncTranspiler':
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._slots_loop is not loop:
+            self._slots = asyncio.Semaphore(self.workers)
+            self._slots_loop = loop
+        return self._slots
+
+    async def run(self, source: str, timeout: Optional[float] = None) -> TranspileResult:
+        """Transpila em um worker; erros de transpilação vêm no resultado.
+
+        Levanta asyncio.TimeoutError se timeout (segundos, contando a espera
+        por uma vaga) estourar, e CancelledError se a tarefa for cancelada.
+        """
+        if self._closed:
+            raise RuntimeError("AsyncTranspiler já foi fechado")
+        deadline = None if timeout is None else time.monotonic() + timeout
+        # a vaga adquirida é a mesma liberada, mesmo que outro loop troque self._slots
+        slots = self._get_slots()
+        acquired = False
+        try:
+            await asyncio.wait_for(slots.acquire(), timeout)
+            acquired = True
+            worker = self._idle.pop() if self._idle else _Worker(self._context)
+            self._busy.add(worker)
+            loop = asyncio.get_running_loop()
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                result = await asyncio.wait_for(loop.run_in_executor(self._waiters, worker.run, source), remaining)
+            except _WorkerDied as e:
+                # o worker morreu (ex.: falta de memória); não derruba o serviço
+                self._busy.discard(worker)
+                worker.kill()
+                return TranspileResult(error=f"Processo worker terminou inesperadamente: {e}",
+                                       error_type='WorkerDied')
+            except BaseException:
+                # cancelado ou tempo esgotado: abandona o trabalho encerrando o worker
+                self._busy.discard(worker)
+                worker.kill()
+                raise
+            self._busy.discard(worker)
+            self._idle.append(worker)
+            return result
+        finally:
+            if acquired:
+                slots.release()
+
+    async def transpile(self, source: str, timeout: Optional[float] = None) -> str:
+        """Equivalente assíncrono de transpile(): devolve o código Swift"""
+        result = await self.run(source, timeout)
+        if result.error is not None:
+            if result.error_type in _TRANSPILE_ERRORS:
+                raise _rebuild_error(result.error_type, result.error)
+            raise RuntimeError(f"{result.error_type}: {result.error}")
+        return result.output
+
+    async def transpile_many(self, sources: Iterable[str], timeout: Optional[float] = None) -> BatchResult:
+        """Equivalente assíncrono de transpile_many(); timeout vale por item.
+
+        Itens que estouram o timeout viram TranspileResult com
+        error_type 'TimeoutError'. Cancelar a corrotina cancela todos os itens.
+        """
+        sources = list(sources)
+
+        async def one(source: str) -> TranspileResult:
+            try:
+                return await self.run(source, timeout)
+            except asyncio.TimeoutError:
+                return TranspileResult(error=f"Tempo esgotado ({timeout}s)", error_type='TimeoutError')
+
+        start = time.perf_counter()
+        items = await asyncio.gather(*(one(source) for source in sources))
+        results = BatchResult(items)
+        results.stats = BatchStats(
+            items=len(results),
+            failures=sum(1 for r in results if not r.ok),
+            workers=self.workers,
+            chunksize=1,
+            executor='async-process',
+            elapsed=time.perf_counter() - start,
+            source_bytes=sum(len(s.encode('utf-8')) for s in sources),
+            output_bytes=sum(len(r.output.encode('utf-8')) for r in results if r.output is not None),
+        )
+        return results
+
+    async def close(self):
+        """Encerra os workers (os ocupados são interrompidos)"""
+        self._closed = True
+        self.shutdown()
+
+    def shutdown(self):
+        """Versão síncrona de close() (usada também ao sair do interpretador)"""
+        self._closed = True
+        for worker in self._busy:
+            worker.kill()
+        for worker in self._idle:
+            worker.stop()
+        self._busy.clear()
+        self._idle.clear()
+        self._waiters.shutdown(wait=False)
+
+
+def _default_context():
+    """forkserver onde existe (Unix), senão spawn"""
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+
+# Exceções de transpilação cruzam o Pipe pelo nome da classe e são recriadas no pai
+_TRANSPILE_ERRORS = {cls.__name__: cls for cls in (TranspileError, UnsupportedFeatureError)}
+_UNSUPPORTED_MESSAGE = re.compile(r"Recurso não suportado: (.*?)(?: \(linha (\d+)\))?", re.S)
+
+
+def _rebuild_error(error_type: str, message: str) -> TranspileError:
+    """Recria a exceção levantada no worker com a mesma classe e mensagem"""
+    cls = _TRANSPILE_ERRORS[error_type]
+    error = cls.__new__(cls)
+    Exception.__init__(error, message)
+    if cls is UnsupportedFeatureError:
+        # feature e linha fazem parte da mensagem formatada por UnsupportedFeatureError
+        match = _UNSUPPORTED_MESSAGE.fullmatch(message)
+        error.feature = match.group(1) if match else message
+        error.line = int(match.group(2)) if match and match.group(2) else None
+    return error
+
+_default: Optional[AsyncTranspiler] = None
+
+
+def _default_transpiler() -> AsyncTranspiler:
+    global _default
+    if _default is None:
+        _default = AsyncTranspiler()
+        atexit.register(_default.shutdown)
+    return _default
+
+
+async def atranspile(source: str, timeout: Optional[float] = None) -> str:
+    """Transpila sem bloquear o event loop, no pool de processos padrão"""
+    return await _default_transpiler().transpile(source, timeout)
+
+
+async def atranspile_many(sources: Iterable[str], timeout: Optional[float] = None) -> BatchResult:
+    """Transpila vários códigos sem bloquear o event loop, no pool de processos padrão"""
+    return await _default_transpiler().transpile_many(sources, timeout)
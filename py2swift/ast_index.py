@@ -0,0 +1,38 @@
+import ast
+from typing import Callable, Dict, Iterable, Iterator, Optional
+
+
+class NodeIndex:
+    """Índice de pais dos nós, preenchido na passada única do front end"""
+
+    __slots__ = ('parents',)
+
+    def __init__(self):
+        self.parents: Dict[int, ast.AST] = {}  # id(filho) -> pai
+
+    def add(self, node: ast.AST, parent: Optional[ast.AST]):
+        """Registra um nó e seu pai"""
+        if parent is not None:
+            self.parents[id(node)] = parent
+
+    def parent(self, node: ast.AST) -> Optional[ast.AST]:
+        """Retorna o pai de um nó em O(1)"""
+        return self.parents.get(id(node))
+
+
+def iter_postorder(root: ast.AST, children: Callable[[ast.AST], Iterable[ast.AST]]) -> Iterator[ast.AST]:
+    """Percorre uma subárvore em pós-ordem sem recursão.
+
+    children(nó) devolve os filhos a visitar; eles saem antes do pai, da
+    esquerda para a direita.
+    """
+    stack = [(root, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if expanded:
+            yield node
+            continue
+        stack.append((node, True))
+        kids = list(children(node))
+        for child in reversed(kids):
+            stack.append((child, False))
@@ -0,0 +1,135 @@
+import os
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional, Sequence, Union
+
+from .transpiler import PyToSwiftTranspiler
+
+# ===== RESULTADOS =====
+
+@dataclass
+class TranspileResult:
+    """Resultado de um item do lote"""
+    output: Optional[str] = None                        # código Swift (None se falhou)
+    warnings: List[str] = field(default_factory=list)
+    error: Optional[str] = None                         # mensagem do erro, se houve
+    error_type: Optional[str] = None                    # nome da classe do erro
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class BatchStats:
+    """Vazão agregada de um lote (útil para dimensionar workers)"""
+    items: int
+    failures: int
+    workers: int
+    chunksize: int
+    executor: str
+    elapsed: float          # segundos de relógio
+    source_bytes: int
+    output_bytes: int
+
+    @property
+    def items_per_second(self) -> float:
+        return self.items / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def source_bytes_per_second(self) -> float:
+        return self.source_bytes / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self) -> str:
+        return (f"{self.items} itens ({self.failures} com erro) em {self.elapsed:.3f}s: "
+                f"{self.items_per_second:.1f} itens/s, "
+                f"{self.source_bytes_per_second / 1024:.1f} KiB/s de entrada "
+                f"[{self.executor}, {self.workers} workers, chunksize {self.chunksize}]")
+
+
+class BatchResult(List[TranspileResult]):
+    """Lista de TranspileResult na ordem da entrada, com as estatísticas em .stats"""
+    stats: BatchStats
+
+
+# ===== WORKERS =====
+
+# Um transpilador por thread (e, portanto, por processo), reutilizado entre itens
+_local = threading.local()
+
+
+def transpile_one(source: str) -> TranspileResult:
+    """Transpila um código capturando o erro no resultado em vez de levantá-lo"""
+    transpiler = getattr(_local, 'transpiler', None)
+    if transpiler is None:
+        transpiler = _local.transpiler = PyToSwiftTranspiler()
+    try:
+        output = transpiler.generate(source)
+        return TranspileResult(output=output, warnings=list(transpiler.warnings))
+    except Exception as e:
+        return TranspileResult(warnings=list(transpiler.warnings), error=str(e),
+                               error_type=type(e).__name__)
+    finally:
+        transpiler.reset()
+
+
+def _transpile_chunk(sources: List[str]) -> List[TranspileResult]:
+    return [transpile_one(source) for source in sources]
+
+
+# ===== API =====
+
+def transpile_many(sources: Iterable[str], workers: Optional[int] = None,
+                   executor: Union[str, Executor] = 'process',
+                   chunksize: Optional[int] = None) -> BatchResult:
+    """Transpila vários códigos, devolvendo os resultados na ordem da entrada.
+
+    executor: 'process' (padrão; paraleliza o trabalho de CPU), 'thread'
+    ou uma instância de concurrent.futures.Executor já criada (reutilizá-la
+    entre lotes evita pagar a inicialização dos processos a cada chamada).
+    workers: padrão os.cpu_count(); com 1 worker e executor por nome, o lote
+    roda no processo atual, sem pool. chunksize: itens enviados por tarefa;
+    o padrão divide o lote em ~4 tarefas por worker para amortizar a
+    serialização sem desbalancear a carga.
+
+    Erros de itens individuais não interrompem o lote: ficam em
+    TranspileResult.error.
+    """
+    sources = list(sources)
+    if isinstance(executor, str) and executor not in ('process', 'thread'):
+        raise ValueError(f"executor deve ser 'process', 'thread' ou um Executor, não {executor!r}")
+    if workers is None:
+        workers = getattr(executor, '_max_workers', None) or os.cpu_count() or 1
+    workers = max(1, workers)
+    if chunksize is None:
+        chunksize = max(1, -(-len(sources) // (workers * 4)))
+    chunks = [sources[i:i + chunksize] for i in range(0, len(sources), chunksize)]
+
+    start = time.perf_counter()
+    if isinstance(executor, Executor):
+        executor_name = type(executor).__name__
+        chunk_results = list(executor.map(_transpile_chunk, chunks))
+    elif workers == 1 or len(chunks) <= 1:
+        executor_name = 'inline'
+        chunk_results = [_transpile_chunk(chunk) for chunk in chunks]
+    else:
+        executor_name = executor
+        pool_class = ProcessPoolExecutor if executor == 'process' else ThreadPoolExecutor
+        with pool_class(max_workers=min(workers, len(chunks))) as pool:
+            chunk_results = list(pool.map(_transpile_chunk, chunks))
+    elapsed = time.perf_counter() - start
+
+    results = BatchResult(result for chunk in chunk_results for result in chunk)
+    results.stats = BatchStats(
+        items=len(results),
+        failures=sum(1 for r in results if not r.ok),
+        workers=workers,
+        chunksize=chunksize,
+        executor=executor_name,
+        elapsed=elapsed,
+        source_bytes=sum(len(s.encode('utf-8')) for s in sources),
+        output_bytes=sum(len(r.output.encode('utf-8')) for r in results if r.output is not None),
+    )
+    return results
@@ -11,4 +11,8 @@ class UnsupportedFeatureError(TranspileError):
         msg = f"Recurso não suportado: {feature}"
         if self.line:
             msg += f" (linha {self.line})"
-        super().__init__(msg)
\ No newline at end of file
+        super().__init__(msg)
+
+class TranspilerInUseError(RuntimeError):
+    """A mesma instância de PyToSwiftTranspiler foi usada por duas chamadas ao mesmo tempo"""
+    pass
@@ -0,0 +1,503 @@
+"""Transpilação incremental: só refaz as definições que mudaram.
+
+    inc = IncrementalTranspiler()
+    swift = inc.update(codigo)           # primeira chamada: transpila tudo
+    swift = inc.update(codigo_editado)   # reaproveita o que não mudou
+    print(inc.report)
+
+O código é dividido em trechos de nível superior (uma definição, ou um
+comando solto), identificados pelo próprio texto. Para cada trecho ficam
+guardados a AST, o Swift emitido, os avisos e as origens das linhas, e
+para cada função ou classe, a sua interface inferida (assinatura e tipos
+do escopo), que é tudo o que os outros trechos leem dela.
+
+Numa atualização, os trechos novos ou alterados são analisados junto com
+o fecho das suas dependências, como na transpilação seletiva. Se a
+interface de um nome mudar, os trechos que o referenciam são refeitos
+também, em ondas. Comandos soltos são voláteis: quando um deles é refeito,
+quem usa os nomes que ele atribui também é.
+
+A saída é sempre idêntica à de transpile(). Quando a reutilização não pode
+ser garantida (primeira chamada, trechos reordenados, recursão mútua), tudo
+é refeito e o cache é reconstruído.
+"""
+import ast
+import re
+import threading
+import time
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from .exceptions import TranspilerInUseError
+from .selection import _bound_names
+from .sourcemap import Origin, build_source_map
+from .transpiler import PyToSwiftTranspiler
+
+_DEFINITIONS = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+
+# Primeiro caractere de cada linha que começa um comando na coluna 0 (ou o continua)
+_LINE_START_RE = re.compile(r'^[^ \t\f\r\n#)\]}]', re.MULTILINE)
+# Linhas na coluna 0 que continuam o comando anterior
+_CLAUSE_RE = re.compile(r'(else|elif|except|finally)\b')
+_LONE_CR_RE = re.compile(r'\r(?!\n)')
+
+# Tentativas de juntar um trecho incompleto aos seguintes antes de usar o resto do arquivo
+MAX_MERGES = 32
+
+
+class _FullRunNeeded(Exception):
+    """Interno: a reutilização não pode ser garantida nesta atualização"""
+
+
+@dataclass
+class IncrementalReport:
+    """O que a última atualização reaproveitou e o que transpilou"""
+    reused: List[str] = field(default_factory=list)      # trechos reaproveitados do cache
+    transpiled: List[str] = field(default_factory=list)  # trechos analisados e emitidos de novo
+    full: bool = False             # tudo foi refeito
+    reason: Optional[str] = None   # por que tudo foi refeito
+    waves: int = 0                 # rodadas de propagação de interfaces
+    elapsed: float = 0.0           # segundos
+
+    def __str__(self) -> str:
+        mode = f"completa ({self.reason})" if self.full else f"incremental, {self.waves} onda(s)"
+        return (f"{len(self.transpiled)} trechos transpilados, {len(self.reused)} reaproveitados "
+                f"em {self.elapsed * 1000:.1f} ms [{mode}]")
+
+
+def _scan_names(body: List[ast.stmt]) -> Tuple[Set[str], Set[str]]:
+    """(nomes das funções e classes de nível superior, nomes usados e parâmetros)"""
+    defined: Set[str] = set()
+    used: Set[str] = set()
+    stack: List[ast.AST] = list(body)
+    while stack:
+        node = stack.pop()
+        if isinstance(node, ast.Name):
+            used.add(node.id)
+            continue
+        if isinstance(node, ast.arg):
+            used.add(node.arg)
+        for field_name in node._fields:
+            value = getattr(node, field_name, None)
+            if isinstance(value, list):
+                stack.extend(item for item in value if isinstance(item, ast.AST))
+            elif isinstance(value, ast.AST) and not isinstance(value, ast.expr_context):
+                stack.append(value)
+    defined = {stmt.name for stmt in body if isinstance(stmt, _DEFINITIONS)}
+    return defined, used
+
+
+class _Unit:
+    """Trecho de nível superior e o que foi gerado para ele"""
+
+    __slots__ = ('text', 'start', 'body', 'ast_start', 'is_def', 'title', 'provides', 'requires', 'result')
+
+    def __init__(self, text: str, start: int, body: List[ast.stmt]):
+        self.text = text
+        self.start = start          # linha (a partir de 0) onde o trecho começa
+        self.body = body
+        self.ast_start = start      # linha a que as posições da AST estão ajustadas
+        self.is_def = all(isinstance(stmt, _DEFINITIONS) for stmt in body)
+        self.title = ", ".join(stmt.name for stmt in body if isinstance(stmt, _DEFINITIONS))
+        defined, used = _scan_names(body)
+        bound = set().union(*map(_bound_names, body))
+        self.provides = bound | defined
+        # Definições homônimas compartilham escopo e assinatura: uma depende da outra
+        self.requires = used | defined | (set() if self.is_def else bound)
+        # (texto, origens, avisos por etapa, helpers usados); linhas relativas ao início do trecho
+        self.result: Optional[Tuple[str, List[Origin], Tuple[list, ...], frozenset]] = None
+
+    def label(self) -> str:
+        return self.title or f"linha {self.start + 1}"
+
+    def align_positions(self):
+        """Ajusta as linhas da AST à posição atual do trecho (só quando ela é usada)"""
+        if self.ast_start != self.start:
+            for stmt in self.body:
+                ast.increment_lineno(stmt, self.start - self.ast_start)
+            self.ast_start = self.start
+
+
+class IncrementalTranspiler:
+    """Transpila versões sucessivas de um mesmo módulo reaproveitando o trabalho anterior.
+
+    Como PyToSwiftTranspiler, uma instância atende uma chamada por vez
+    (TranspilerInUseError).
+    """
+
+    def __init__(self, disabled_passes: Iterable[str] = ()):
+        self._transpiler = PyToSwiftTranspiler(disabled_passes=disabled_passes, record_origins=True,
+                                               warning_sink=self._record_warning)
+        # Linha Python de cada aviso registrado (None se veio sem nó)
+        self._warning_lines: List[Optional[int]] = []
+        self._lock = threading.Lock()
+        self.report = IncrementalReport()
+        self.reset()
+
+    def _record_warning(self, message: str, node: Optional[ast.AST]):
+        self._warning_lines.append(getattr(node, 'lineno', None) if node else None)
+
+    @property
+    def disabled_passes(self) -> frozenset:
+        return self._transpiler.disabled_passes
+
+    def reset(self):
+        """Esvazia o cache; a próxima atualização transpila tudo"""
+        self._units: List[_Unit] = []
+        self._cache: Dict[Tuple[str, int], _Unit] = {}     # (texto, ocorrência) -> trecho
+        self._interfaces: Dict[str, tuple] = {}             # nome definido -> interface inferida
+        self._full_reason: Optional[str] = None             # força a próxima atualização a ser completa
+        self._source_text: Optional[str] = None
+        self._warnings: List[str] = []
+        self._prelude_lines = 0                             # cabeçalho e helpers
+        self._line_origins: Optional[List[Origin]] = None   # montadas sob demanda
+
+    @property
+    def warnings(self) -> List[str]:
+        """Avisos da última atualização"""
+        return list(self._warnings)
+
+    @property
+    def line_origins(self) -> List[Origin]:
+        """Origem (linha, coluna) Python de cada linha Swift da última atualização"""
+        if self._line_origins is None:
+            origins: List[Origin] = [None] * self._prelude_lines
+            for unit in self._units:
+                origins.extend(None if o is None else (o[0] + unit.start, o[1]) for o in unit.result[1])
+            if self._warnings:
+                origins.extend([None] * (len(self._warnings) + 2))
+            self._line_origins = origins
+        return self._line_origins
+
+    def source_map(self, file: str = "output.swift", source: str = "input.py",
+                   include_source: bool = False) -> Dict[str, Any]:
+        """Source map v3 da última atualização (ver PyToSwiftTranspiler.source_map)"""
+        return build_source_map(self.line_origins, file, source, self._source_text, include_source)
+
+    def update(self, source: str) -> str:
+        """Transpila a nova versão do código; o resultado é idêntico ao de transpile(source)"""
+        if not self._lock.acquire(blocking=False):
+            raise TranspilerInUseError(
+                "Esta instância já está transpilando em outra chamada; use uma instância por chamada")
+        try:
+            start = time.perf_counter()
+            self.report = IncrementalReport()
+            split = self._split(source)
+            if split is None:
+                # Erro de sintaxe (levantado aqui, sem perder o cache) ou código não divisível
+                output = self._transpile_whole(source)
+            else:
+                try:
+                    output = self._update(source, *split)
+                except Exception:
+                    # Estado parcial não é confiável: refaz do zero (e levanta o erro real, se houver)
+                    self.reset()
+                    self.report = IncrementalReport()
+                    split = self._split(source)
+                    output = self._update(source, *split) if split else self._transpile_whole(source)
+            self.report.elapsed = time.perf_counter() - start
+            return output
+        finally:
+            self._lock.release()
+
+    # ===== ATUALIZAÇÃO =====
+
+    def _update(self, source: str, units: List[_Unit], cache: Dict[Tuple[str, int], _Unit]) -> str:
+        reason = self._full_reason
+        if not self._units:
+            reason = "primeira transpilação"
+        elif reason is None:
+            previous = {id(unit): i for i, unit in enumerate(self._units)}
+            positions = [previous[id(unit)] for unit in units if id(unit) in previous]
+            if any(a > b for a, b in zip(positions, positions[1:])):
+                reason = "trechos reordenados"
+
+        providers: Dict[str, List[int]] = {}
+        for i, unit in enumerate(units):
+            for name in unit.provides:
+                providers.setdefault(name, []).append(i)
+
+        if reason is None:
+            try:
+                recomputed = self._propagate(units, providers)
+            except _FullRunNeeded as e:
+                reason = str(e)
+        if reason is not None:
+            self._full_reason = None
+            self._interfaces = self._transpile(units, set(range(len(units))), providers)
+            recomputed = set(range(len(units)))
+            self.report.full = True
+            self.report.reason = reason
+
+        for i, unit in enumerate(units):
+            if unit.body:
+                (self.report.transpiled if i in recomputed else self.report.reused).append(unit.label())
+        self._units = units
+        self._cache = cache
+        self._source_text = source
+        self._line_origins = None
+        return self._assemble(units)
+
+    def _propagate(self, units: List[_Unit], providers: Dict[str, List[int]]) -> Set[int]:
+        """Refaz os trechos alterados e, em ondas, os que dependem de interfaces que mudaram"""
+        kept = {id(unit) for unit in units}
+        removed = [unit for unit in self._units if id(unit) not in kept]
+        volatile = set().union(*(unit.provides for unit in removed if not unit.is_def))
+        pending = set().union(*(unit.provides for unit in removed))
+        targets = {i for i, unit in enumerate(units) if unit.result is None}
+        interfaces = dict(self._interfaces)
+        for name in pending:
+            interfaces.pop(name, None)
+        requirers: Optional[Dict[str, List[int]]] = None
+        recomputed: Set[int] = set()
+        while targets or pending:
+            fresh = self._transpile(units, targets, providers) if targets else {}
+            recomputed |= targets
+            self.report.waves += 1
+            changed = set()
+            for name in pending.union(*(units[i].provides for i in targets)):
+                owners = providers.get(name, ())
+                if (not owners or name in volatile or name not in fresh
+                        or any(not units[i].is_def for i in owners)):
+                    changed.add(name)
+                elif fresh[name] != self._interfaces.get(name):
+                    changed.add(name)
+                if name in fresh:
+                    interfaces[name] = fresh[name]
+            pending = set()
+            if not changed:
+                break
+            if requirers is None:
+                requirers = {}
+                for i, unit in enumerate(units):
+                    for name in unit.requires:
+                        requirers.setdefault(name, []).append(i)
+            targets = {i for name in changed for i in requirers.get(name, ())} - recomputed
+        for name in list(interfaces):
+            if name not in providers:
+                del interfaces[name]
+        self._interfaces = interfaces
+        return recomputed
+
+    def _transpile(self, units: List[_Unit], targets: Set[int],
+                   providers: Dict[str, List[int]]) -> Dict[str, tuple]:
+        """Analisa os alvos junto com suas dependências e guarda o que eles geram.
+
+        Devolve a interface de cada nome definido pelos alvos.
+        """
+        full = len(targets) == len(units)
+        order = sorted(targets if full else self._closure(units, targets, providers))
+        for i in order:
+            units[i].align_positions()
+        tp = self._transpiler
+        self._warning_lines = []
+        tp.analyze(ast.Module(body=[stmt for i in order for stmt in units[i].body], type_ignores=[]))
+        if tp.type_inferencer.has_mutual_recursion():
+            if not full:
+                raise _FullRunNeeded("recursão mútua")
+            self._full_reason = "recursão mútua"
+
+        # Avisos da análise (front end e cada pass): atribuídos ao trecho pela linha do nó
+        marks = tp.warning_marks
+        starts = [units[i].start for i in order]
+        staged = {i: tuple([] for _ in range(len(marks) + 1)) for i in targets}
+        for w, message in enumerate(tp.warnings):
+            lineno = self._warning_lines[w]
+            if lineno is None:
+                if not full:
+                    raise _FullRunNeeded("aviso sem linha")
+                self._full_reason = "aviso sem linha"
+                continue
+            i = order[bisect_right(starts, lineno - 1) - 1]
+            if i in staged:
+                staged[i][bisect_right(marks, w)].append(self._relative_warning(message, lineno, units[i]))
+
+        used = {i: set() for i in targets}
+        for helper, nodes in tp.helper_requests.items():
+            for node in nodes:
+                i = order[bisect_right(starts, node.lineno - 1) - 1]
+                if i in used:
+                    used[i].add(helper)
+
+        # Emissão: comandos soltos fora dos alvos também rodam (declarações de globais)
+        for i in order:
+            unit = units[i]
+            if i not in targets and unit.is_def:
+                continue
+            mark = len(tp.warnings)
+            tp.line_origins = []
+            text = tp.emit_statements(unit.body)
+            if i not in targets:
+                continue
+            for w in range(mark, len(tp.warnings)):
+                lineno = self._warning_lines[w]
+                staged[i][-1].append(self._relative_warning(tp.warnings[w], lineno, unit))
+            origins = [None if o is None else (o[0] - unit.start, o[1]) for o in tp.line_origins]
+            unit.result = (text, origins, staged[i], frozenset(used[i]))
+
+        # Assinaturas e escopos agrupados pela definição de nível superior que os contém
+        signatures: Dict[str, list] = {}
+        for qualified, sig in tp.type_inferencer.func_signatures.items():
+            signatures.setdefault(qualified.split('.', 1)[0], []).append((qualified, frozenset(sig.items())))
+        scopes: Dict[str, list] = {}
+        for (scope, name), typ in tp.symbol_table.types.items():
+            scopes.setdefault(scope.split('.', 1)[0], []).append((scope, name, typ))
+        interfaces = {}
+        for i in targets:
+            for name in units[i].provides:
+                # Os locais de uma função só são lidos por definições homônimas (mesmo escopo)
+                shared = len(providers.get(name, ())) > 1
+                interfaces[name] = (frozenset(signatures.get(name, ())),
+                                    frozenset(scopes.get(f"func:{name}", ())) if shared else None,
+                                    frozenset(scopes.get(f"class:{name}", ())))
+        return interfaces
+
+    @staticmethod
+    def _closure(units: List[_Unit], targets: Set[int], providers: Dict[str, List[int]]) -> Set[int]:
+        """Alvos mais os trechos que definem os nomes que eles usam, transitivamente"""
+        included = set(targets)
+        pending = list(targets)
+        seen: Set[str] = set()
+        while pending:
+            for name in units[pending.pop()].requires:
+                if name in seen:
+                    continue
+                seen.add(name)
+                for i in providers.get(name, ()):
+                    if i not in included:
+                        included.add(i)
+                        pending.append(i)
+        return included
+
+    @staticmethod
+    def _relative_warning(message: str, lineno: Optional[int], unit: _Unit) -> Tuple[Optional[int], str]:
+        if lineno is None:
+            return None, message
+        return lineno - 1 - unit.start, message[len(f"Linha {lineno}: "):]
+
+    def _transpile_whole(self, source: str) -> str:
+        """Sem divisão em trechos: transpilação comum, sem cache"""
+        output = self._transpiler.generate(source)
+        self.reset()
+        self._source_text = source
+        self._warnings = list(self._transpiler.warnings)
+        self._line_origins = list(self._transpiler.line_origins)
+        self.report.full = True
+        self.report.reason = "código não dividido em trechos"
+        return output
+
+    def _assemble(self, units: List[_Unit]) -> str:
+        warned = [unit for unit in units if any(unit.result[2])]
+        stages = len(warned[0].result[2]) if warned else 0
+        self._warnings = [message if rel is None else f"Linha {rel + unit.start + 1}: {message}"
+                          for stage in range(stages) for unit in warned
+                          for rel, message in unit.result[2][stage]]
+        tp = self._transpiler
+        parts = [tp.emit_prelude(set().union(*(unit.result[3] for unit in units)))]
+        self._prelude_lines = parts[0].count('\n')
+        parts.extend(unit.result[0] for unit in units)
+        if self._warnings:
+            parts.append(tp.emit_warnings(self._warnings))
+        return "".join(parts)
+
+    # ===== DIVISÃO EM TRECHOS =====
+
+    def _split(self, source: str) -> Optional[Tuple[List[_Unit], Dict[Tuple[str, int], _Unit]]]:
+        """Trechos do código e o novo cache, reaproveitando os já conhecidos.
+
+        Devolve None se o código não puder ser dividido.
+        """
+        if '\r' in source and _LONE_CR_RE.search(source):
+            return None  # o ast conta '\r' sozinho como quebra de linha
+        if not self._cache:
+            return self._split_parsed(source)
+        bounds = self._statement_starts(source)
+        units: List[_Unit] = []
+        cache: Dict[Tuple[str, int], _Unit] = {}
+        occurrences: Dict[str, int] = {}  # textos repetidos são distinguidos pela ocorrência
+        line = 0
+        k = 0
+        while k < len(bounds) - 1:
+            for end in self._merge_candidates(k, len(bounds)):
+                text = source[bounds[k]:bounds[end]]
+                key = (text, occurrences.get(text, 0))
+                unit = self._cache.get(key)
+                if unit is None:
+                    body = self._parse(text)
+                    if body is None:
+                        continue  # incompleto (ex.: string de várias linhas): junta ao próximo
+                    for stmt in body:
+                        ast.increment_lineno(stmt, line)
+                    unit = _Unit(text, line, body)
+                else:
+                    unit.start = line
+                cache[key] = unit
+                occurrences[text] = key[1] + 1
+                units.append(unit)
+                line += text.count('\n')
+                k = end
+                break
+            else:
+                return None
+        return units, cache
+
+    @staticmethod
+    def _split_parsed(source: str) -> Optional[Tuple[List[_Unit], Dict[Tuple[str, int], _Unit]]]:
+        """Sem cache: uma única análise sintática, e os comandos são repartidos pelos trechos"""
+        try:
+            body = ast.parse(source).body
+        except (SyntaxError, RecursionError):
+            return None
+        line_offsets = [0]
+        line_offsets.extend(match.end() for match in re.finditer('\n', source))
+        groups: List[List[ast.stmt]] = [[]]
+        starts = [0]  # linha inicial de cada trecho; o primeiro começa no início do arquivo
+        last_line = None
+        for stmt in body:
+            line = min([stmt.lineno] + [d.lineno for d in getattr(stmt, 'decorator_list', ())]) - 1
+            if line != last_line and groups[-1]:
+                groups.append([])
+                starts.append(line)
+            groups[-1].append(stmt)  # comandos na mesma linha (a; b) ficam juntos
+            last_line = line
+        offsets = [line_offsets[line] for line in starts] + [len(source)]
+        units: List[_Unit] = []
+        cache: Dict[Tuple[str, int], _Unit] = {}
+        occurrences: Dict[str, int] = {}
+        for k, group in enumerate(groups):
+            text = source[offsets[k]:offsets[k + 1]]
+            unit = _Unit(text, starts[k], group)
+            n = occurrences.get(text, 0)
+            occurrences[text] = n + 1
+            cache[(text, n)] = unit
+            units.append(unit)
+        return units, cache
+
+    @staticmethod
+    def _merge_candidates(k: int, count: int) -> Iterable[int]:
+        """Fins possíveis para o trecho que começa em bounds[k], do menor ao maior"""
+        last = min(count, k + 1 + MAX_MERGES)
+        yield from range(k + 1, last)
+        if last != count:
+            yield count - 1  # último recurso: o resto do arquivo
+
+    @staticmethod
+    def _statement_starts(source: str) -> List[int]:
+        """Posições onde pode começar um comando de nível superior, mais o fim do código"""
+        bounds = [0]
+        after_decorator = False
+        for match in _LINE_START_RE.finditer(source):
+            i = match.start()
+            if i and not after_decorator and not _CLAUSE_RE.match(source, i):
+                bounds.append(i)
+            after_decorator = match.group() == '@'
+        bounds.append(len(source))
+        return bounds
+
+    @staticmethod
+    def _parse(text: str) -> Optional[List[ast.stmt]]:
+        try:
+            return ast.parse(text).body
+        except (SyntaxError, RecursionError):
+            return None
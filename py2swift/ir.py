@@ -0,0 +1,451 @@
+"""Representação intermediária (IR) tipada entre a inferência e a emissão.
+
+Os passes de otimização rodam depois da inferência e substituem comandos
+Python por nós IR, que já carregam a decisão de lowering e os tipos
+usados nela. A IR é uma sobreposição: a AST original não é alterada (ela
+pode ter vindo do chamador), e IRProgram guarda, para cada comando
+substituído, o nó IR que o emissor deve usar no lugar dele. Os nós IR
+referenciam as subexpressões originais, que continuam sendo convertidas
+pelo emissor.
+
+Alguns lowerings dependem de funções auxiliares em Swift (SWIFT_HELPERS);
+o pass as pede com IRProgram.require() e o emissor as declara logo após o
+cabeçalho, só quando usadas.
+
+Passes padrão (na ordem): 'dead_code', 'swap', 'range_for',
+'floor_division', 'power', 'membership', 'slice'. Novos passes são registrados com
+OptimizationPassManager.register().
+"""
+import ast
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from .swift_types import SwiftType, INT, DOUBLE, STRING, ANY
+
+# ===== NÓS IR =====
+
+@dataclass(eq=False)
+class IRNode:
+    """Base dos nós IR; origin é o comando Python substituído"""
+    origin: ast.stmt
+
+
+@dataclass(eq=False)
+class SwapStmt(IRNode):
+    """xs[i], xs[j] = xs[j], xs[i] -> xs.swapAt(i, j)"""
+    collection: str
+    first: ast.expr
+    second: ast.expr
+    type: SwiftType = ANY  # tipo da coleção
+
+
+@dataclass(eq=False)
+class RangeFor(IRNode):
+    """for x in range(...) -> for x in a..<b / stride(from:to:by:)"""
+    target: ast.expr
+    start: Optional[ast.expr]  # None: 0
+    stop: ast.expr
+    step: Optional[ast.expr]   # None: 1
+    body: List[ast.stmt] = field(default_factory=list)
+    type: SwiftType = INT      # tipo da variável do laço
+
+
+@dataclass(eq=False)
+class FloorDivMod(IRNode):
+    """a // b e a % b com a semântica do Python (arredonda para baixo; resto com o sinal de b).
+
+    origin é o ast.BinOp, ou o ast.AugAssign de a //= b / a %= b.
+    """
+    op: ast.operator  # ast.FloorDiv ou ast.Mod
+    left: ast.expr
+    right: ast.expr
+    type: SwiftType = INT  # INT: helpers inteiros; DOUBLE: aritmética de ponto flutuante
+
+
+@dataclass(eq=False)
+class Power(IRNode):
+    """a ** b (origin: ast.BinOp, ou ast.AugAssign de a **= b).
+
+    value: resultado constante já calculado; repeat: expoente pequeno,
+    vira multiplicações da base; senão pyIntPow (INT) ou pow (DOUBLE).
+    """
+    base: ast.expr
+    exponent: ast.expr
+    type: SwiftType = INT
+    value: Optional[int] = None
+    repeat: Optional[int] = None
+
+
+@dataclass(eq=False)
+class Membership(IRNode):
+    """x in y / x not in y pelo tipo de y (origin: o ast.Compare).
+
+    kinds tem um item por operador da comparação: 'dict' (d[x] != nil),
+    'contains' (Set/String), 'range' (limites comparados), 'equals' (lista
+    constante curta: x == a || x == b), 'switch' (lista constante longa) ou
+    None (conversão genérica). types[i] é o tipo dos elementos do 'switch'.
+    """
+    kinds: List[Optional[str]]
+    types: List[Optional[SwiftType]]
+
+
+@dataclass(eq=False)
+class SliceView(IRNode):
+    """xs[a:b] / s[a:b] (origin: o ast.Subscript).
+
+    A fatia é emitida como vista (ArraySlice/Substring, sem cópia); se ela
+    escapa (é guardada, retornada, passada adiante ou indexada), a vista é
+    materializada uma vez com Array(...)/String(...).
+    """
+    type: SwiftType = ANY  # tipo do valor fatiado
+    materialize: bool = True
+
+
+@dataclass(eq=False)
+class Removed(IRNode):
+    """Comando eliminado (não emite nada)"""
+    reason: str = ""
+
+
+class IRProgram:
+    """Nós substituídos por nós IR (por identidade do nó) e helpers necessários"""
+
+    __slots__ = ('replacements', 'helpers')
+
+    def __init__(self):
+        self.replacements: Dict[ast.AST, IRNode] = {}
+        self.helpers: Dict[str, List[ast.AST]] = {}  # helper -> nós que o usam
+
+    def replace(self, stmt: ast.AST, node: IRNode):
+        self.replacements[stmt] = node
+
+    def require(self, helper: str, node: ast.AST):
+        """Registra que node usa a função auxiliar helper (chave de SWIFT_HELPERS)"""
+        self.helpers.setdefault(helper, []).append(node)
+
+    def get(self, stmt: ast.AST) -> Optional[IRNode]:
+        return self.replacements.get(stmt)
+
+    def __len__(self) -> int:
+        return len(self.replacements)
+
+
+# ===== PASSES PADRÃO =====
+# fn(programa, transpilador, candidatos [(nó, pai, escopo)])
+
+_TERMINATORS = (ast.Return, ast.Break, ast.Continue, ast.Raise)
+_BLOCK_FIELDS = ('body', 'orelse', 'finalbody')
+
+
+def eliminate_dead_code(program: IRProgram, tp, candidates: List[tuple]):
+    """Remove os comandos que seguem return/break/continue/raise no mesmo bloco"""
+    index = tp.type_inferencer.node_index
+    for node, parent, scope in candidates:
+        block = _enclosing_block(parent, node)
+        if not block or block[-1] is node:
+            continue  # caso comum: o terminador fecha o bloco
+        if _inside_removed(program, node, index):
+            continue  # já está em código removido por um terminador anterior
+        dead = block[next(i for i, stmt in enumerate(block) if stmt is node) + 1:]
+        tp.warn(f"Código inalcançável (após {type(node).__name__.lower()}) removido", dead[0])
+        for stmt in dead:
+            program.replace(stmt, Removed(stmt, "inalcançável"))
+
+
+def _enclosing_block(parent: Optional[ast.AST], node: ast.stmt) -> Optional[List[ast.stmt]]:
+    """Lista de comandos de parent que contém node"""
+    for block_field in _BLOCK_FIELDS:
+        block = getattr(parent, block_field, None)
+        if isinstance(block, list) and any(stmt is node for stmt in block):
+            return block
+    return None
+
+
+def _inside_removed(program: IRProgram, node: ast.AST, index) -> bool:
+    while node is not None:
+        if isinstance(program.get(node), Removed):
+            return True
+        node = index.parent(node)
+    return False
+
+
+def lower_swaps(program: IRProgram, tp, candidates: List[tuple]):
+    """a[i], a[j] = a[j], a[i] em listas vira a.swapAt(i, j)"""
+    for node, parent, scope in candidates:
+        if len(node.targets) != 1 or node in program.replacements:
+            continue
+        target, value = node.targets[0], node.value
+        if not (isinstance(target, ast.Tuple) and isinstance(value, ast.Tuple)
+                and len(target.elts) == 2 and len(value.elts) == 2):
+            continue
+        (l0, l1), (r0, r1) = target.elts, value.elts
+        if not all(isinstance(x, ast.Subscript) and isinstance(x.value, ast.Name) for x in (l0, l1, r0, r1)):
+            continue
+        name = l0.value.id
+        if any(x.value.id != name for x in (l1, r0, r1)):
+            continue
+        i0, i1 = ast.dump(l0.slice), ast.dump(l1.slice)
+        if not (i0 == ast.dump(r1.slice) and i1 == ast.dump(r0.slice)):
+            continue
+        collection_type = tp.type_inferencer.expr_type(l0.value, scope) or ANY
+        if collection_type is not ANY and not collection_type.is_array:
+            continue  # swapAt só existe em coleções mutáveis indexadas por posição
+        program.replace(node, SwapStmt(node, name, l0.slice, l1.slice, collection_type))
+
+
+def lower_range_fors(program: IRProgram, tp, candidates: List[tuple]):
+    """for x in range(a, b, c) vira um laço sobre intervalo/stride, sem chamar range"""
+    for node, parent, scope in candidates:
+        if node in program.replacements:
+            continue
+        call = node.iter
+        if not (isinstance(call, ast.Call) and isinstance(call.func, ast.Name) and call.func.id == 'range'
+                and 1 <= len(call.args) <= 3 and not call.keywords
+                and not any(isinstance(a, ast.Starred) for a in call.args)):
+            continue
+        args = call.args
+        start, stop, step = (None, args[0], None) if len(args) == 1 else (args + [None])[:3]
+        loop_type = INT
+        if isinstance(node.target, ast.Name):
+            loop_type = tp.symbol_table.types.get(scope, node.target.id) or INT
+        program.replace(node, RangeFor(node, node.target, start, stop, step, node.body, loop_type))
+
+
+def lower_floor_division(program: IRProgram, tp, candidates: List[tuple]):
+    """// e % entre Int viram helpers inteiros; com um operando Double, aritmética Double"""
+    for node, parent, scope in candidates:
+        if not isinstance(node.op, (ast.FloorDiv, ast.Mod)) or node in program.replacements:
+            continue
+        left, right = (node.target, node.value) if isinstance(node, ast.AugAssign) else (node.left, node.right)
+        types = (tp.type_inferencer.expr_type(left, scope), tp.type_inferencer.expr_type(right, scope))
+        if types == (INT, INT):
+            operand_type = INT
+        elif DOUBLE in types and all(t is INT or t is DOUBLE for t in types):
+            operand_type = DOUBLE
+        else:
+            continue  # tipos desconhecidos (ou % de formatação de string): conversão genérica
+        program.replace(node, FloorDivMod(node, node.op, left, right, operand_type))
+        if isinstance(node.op, ast.Mod):
+            program.require('pyMod' if operand_type is INT else 'pyModDouble', node)
+        elif operand_type is INT:
+            program.require('pyFloorDiv', node)
+
+
+# Maior expoente constante convertido em multiplicações repetidas
+MAX_UNROLLED_POWER = 4
+# Resultados de potências constantes que cabem num Int de 64 bits viram literais
+_INT_LIMIT = 2 ** 63
+
+
+def lower_powers(program: IRProgram, tp, candidates: List[tuple]):
+    """** por tipo: constantes calculadas, expoentes pequenos multiplicados, pyIntPow entre Int, pow só com Double"""
+    for node, parent, scope in candidates:
+        if not isinstance(node.op, ast.Pow) or node in program.replacements:
+            continue
+        base, exponent = (node.target, node.value) if isinstance(node, ast.AugAssign) else (node.left, node.right)
+        base_type = tp.type_inferencer.expr_type(base, scope)
+        exponent_type = tp.type_inferencer.expr_type(exponent, scope)
+        e = _int_constant(exponent)
+        b = _int_constant(base)
+        if b is not None and e is not None and e >= 0:
+            value = b ** e if abs(b) < 2 or e < 64 else None  # |b| >= 2 e e >= 64 sempre estoura
+            if value is not None and -_INT_LIMIT <= value < _INT_LIMIT:
+                program.replace(node, Power(node, base, exponent, INT, value=value))
+                continue
+            tp.warn(f"{b} ** {e} excede o limite de Int (64 bits)", node)
+        if (e is not None and 0 <= e <= MAX_UNROLLED_POWER and _is_simple(base)
+                and base_type in (INT, DOUBLE, ANY, None)):
+            program.replace(node, Power(node, base, exponent, base_type or ANY, repeat=e))
+        elif base_type is INT and exponent_type is INT and (e is None or e >= 0):
+            program.replace(node, Power(node, base, exponent, INT))
+            program.require('pyIntPow', node)
+        elif all(t is INT or t is DOUBLE for t in (base_type, exponent_type)):
+            program.replace(node, Power(node, base, exponent, DOUBLE))  # inclui Int ** expoente negativo
+
+
+# Listas constantes com até este número de elementos viram comparações encadeadas
+MAX_CHAINED_MEMBERSHIP = 4
+
+
+def lower_membership(program: IRProgram, tp, candidates: List[tuple]):
+    """x in y por tipo: chave de dicionário, contains de Set/String, limites de range, listas constantes"""
+    for node, parent, scope in candidates:
+        if node in program.replacements or not any(isinstance(op, (ast.In, ast.NotIn)) for op in node.ops):
+            continue
+        kinds, types = [], []
+        item = node.left
+        for op, container in zip(node.ops, node.comparators):
+            kind, element_type = None, None
+            if isinstance(op, (ast.In, ast.NotIn)):
+                kind, element_type = _membership_kind(tp, item, container, scope)
+            kinds.append(kind)
+            types.append(element_type)
+            item = container
+        if any(kinds):
+            program.replace(node, Membership(node, kinds, types))
+
+
+def _membership_kind(tp, item: ast.expr, container: ast.expr, scope) -> tuple:
+    """(estratégia, tipo dos elementos) de item in container; (None, None) mantém a conversão genérica"""
+    item_type = tp.type_inferencer.expr_type(item, scope)
+    args = _range_args(container)
+    if args is not None:
+        start, stop, step = args
+        if item_type is INT and _is_simple(item) and (step is None or start is None or _is_simple(start)):
+            return 'range', None  # item e início aparecem mais de uma vez no teste
+        return None, None
+    if isinstance(container, (ast.List, ast.Tuple, ast.Set)):
+        element_type = _literal_type(container.elts)
+        if element_type is None or (container.elts and item_type not in (element_type, ANY, None)):
+            return None, None
+        if not container.elts or (len(container.elts) <= MAX_CHAINED_MEMBERSHIP and _is_simple(item)):
+            return 'equals', element_type
+        return 'switch', element_type
+    container_type = tp.type_inferencer.expr_type(container, scope)
+    if container_type is None:
+        return None, None
+    if container_type.is_dict:
+        return 'dict', None
+    if container_type.is_set or container_type is STRING:
+        return 'contains', None
+    return None, None  # listas (busca linear, como no Python) e tipos desconhecidos
+
+
+def _range_args(node: ast.expr) -> Optional[tuple]:
+    """(início, fim, passo) de range(...) com passo constante diferente de 0 (None: padrão), ou None"""
+    if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == 'range'
+            and 1 <= len(node.args) <= 3 and not node.keywords
+            and not any(isinstance(a, ast.Starred) for a in node.args)):
+        return None
+    args = node.args
+    start, stop, step = (None, args[0], None) if len(args) == 1 else (args + [None])[:3]
+    if step is not None:
+        value = _int_constant(step)
+        if not value:
+            return None
+        if value == 1:
+            step = None
+    return start, stop, step
+
+
+def _literal_type(elements: List[ast.expr]) -> Optional[SwiftType]:
+    """INT ou STRING se todos os elementos forem literais desse tipo (lista vazia: ANY), senão None"""
+    if all(_int_constant(e) is not None for e in elements):
+        return INT if elements else ANY
+    if all(isinstance(e, ast.Constant) and type(e.value) is str for e in elements):
+        return STRING
+    return None
+
+
+# Built-ins que consomem a fatia na hora (aceitam qualquer Sequence/StringProtocol)
+_VIEW_CONSUMERS = frozenset({'len', 'sum', 'min', 'max', 'sorted', 'list', 'print', 'any', 'all',
+                             'reversed', 'enumerate'})
+_STRING_VIEW_CONSUMERS = _VIEW_CONSUMERS | {'int', 'float'}
+
+
+def lower_slices(program: IRProgram, tp, candidates: List[tuple]):
+    """Fatias de listas e strings viram vistas onde não escapam; nos demais usos, uma única cópia"""
+    for node, parent, scope in candidates:
+        if (not isinstance(node.slice, ast.Slice) or not isinstance(node.ctx, ast.Load)
+                or node in program.replacements):
+            continue
+        value_type = tp.type_inferencer.expr_type(node.value, scope)
+        if value_type is not STRING and not (value_type is not None and value_type.is_array):
+            continue  # tipo desconhecido: conversão genérica (vista)
+        program.replace(node, SliceView(node, value_type, _slice_escapes(node, parent, value_type)))
+
+
+def _slice_escapes(node: ast.Subscript, parent: Optional[ast.AST], value_type: SwiftType) -> bool:
+    """Se a fatia sobrevive ao comando que a usa (ou precisa do tipo Array/String)"""
+    if isinstance(parent, (ast.For, ast.comprehension)):
+        return parent.iter is not node
+    # A vista de xs[::-1] (ReversedCollection) não é impressa como lista
+    printable = node.slice.step is None
+    if isinstance(parent, ast.FormattedValue):
+        return not printable
+    if isinstance(parent, ast.Compare):
+        if node is parent.left:
+            ops = parent.ops[:1]
+        else:
+            i = parent.comparators.index(node)
+            ops = parent.ops[i:i + 2]  # operador à esquerda e à direita do operando
+            if isinstance(ops[0], (ast.In, ast.NotIn)):
+                return False  # contêiner de in: só contains
+        # Substring se compara com String; ArraySlice não se compara com Array
+        return not (value_type is STRING and all(isinstance(op, (ast.Eq, ast.NotEq)) for op in ops))
+    if isinstance(parent, ast.Call) and isinstance(parent.func, ast.Name) and node in parent.args:
+        consumers = _STRING_VIEW_CONSUMERS if value_type is STRING else _VIEW_CONSUMERS
+        return parent.func.id not in consumers or (parent.func.id == 'print' and not printable)
+    return True
+
+
+def _int_constant(node: ast.AST) -> Optional[int]:
+    """Valor de um literal inteiro (com sinal), ou None"""
+    sign = 1
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+        sign = -1 if isinstance(node.op, ast.USub) else 1
+        node = node.operand
+    if isinstance(node, ast.Constant) and type(node.value) is int:
+        return sign * node.value
+    return None
+
+
+def _is_simple(node: ast.AST) -> bool:
+    """Expressão sem efeitos colaterais e barata de repetir (x, 2, self.x, a[i])"""
+    while isinstance(node, (ast.Attribute, ast.Subscript)):
+        if isinstance(node, ast.Subscript) and not isinstance(node.slice, (ast.Name, ast.Constant)):
+            return False
+        node = node.value
+    if isinstance(node, ast.Constant):
+        return type(node.value) in (int, float)
+    return isinstance(node, ast.Name)
+
+
+DEFAULT_PASSES = (
+    ('dead_code', _TERMINATORS, eliminate_dead_code),
+    ('swap', (ast.Assign,), lower_swaps),
+    ('range_for', (ast.For,), lower_range_fors),
+    ('floor_division', (ast.BinOp, ast.AugAssign), lower_floor_division),
+    ('power', (ast.BinOp, ast.AugAssign), lower_powers),
+    ('membership', (ast.Compare,), lower_membership),
+    ('slice', (ast.Subscript,), lower_slices),
+)
+
+
+# ===== FUNÇÕES AUXILIARES EM SWIFT =====
+# Declaradas após o cabeçalho, nesta ordem, quando algum nó IR as pede
+
+SWIFT_HELPERS: Dict[str, List[str]] = {
+    'pyFloorDiv': [
+        "func pyFloorDiv(_ a: Int, _ b: Int) -> Int {",
+        "    let q = a / b",
+        "    return (a % b != 0 && (a < 0) != (b < 0)) ? q - 1 : q",
+        "}",
+    ],
+    'pyMod': [
+        "func pyMod(_ a: Int, _ b: Int) -> Int {",
+        "    let r = a % b",
+        "    return (r != 0 && (r < 0) != (b < 0)) ? r + b : r",
+        "}",
+    ],
+    'pyIntPow': [
+        "func pyIntPow(_ base: Int, _ exponent: Int) -> Int {",
+        "    precondition(exponent >= 0, \"expoente negativo: o resultado seria Double\")",
+        "    var result = 1",
+        "    var b = base",
+        "    var e = exponent",
+        "    while e > 0 {",
+        "        if e & 1 == 1 { result *= b }",
+        "        e >>= 1",
+        "        if e > 0 { b *= b }",
+        "    }",
+        "    return result",
+        "}",
+    ],
+    'pyModDouble': [
+        "func pyMod(_ a: Double, _ b: Double) -> Double {",
+        "    let r = a.truncatingRemainder(dividingBy: b)",
+        "    return (r != 0 && (r < 0) != (b < 0)) ? r + b : r",
+        "}",
+    ],
+}
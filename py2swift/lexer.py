@@ -1,21 +1,46 @@
 import ast
-from typing import List
+from typing import Callable, List, Optional
 from .exceptions import UnsupportedFeatureError
+from .passes import AnalysisPassManager
+
+# fn(mensagem sem o prefixo de linha, nó ou None), chamada a cada aviso registrado
+WarningSink = Callable[[str, Optional[ast.AST]], None]
+
 
 class LexicalAnalyzer:
     """Analisador léxico - identifica tokens e estruturas básicas"""
     
-    def __init__(self):
+    def __init__(self, warning_sink: Optional[WarningSink] = None):
         self.warnings: List[str] = []
+        self.warning_sink = warning_sink
+    
+    def reset(self):
+        """Descarta os avisos da última análise"""
+        self.warnings = []
     
     def analyze(self, source: str) -> ast.AST:
         """Realiza análise léxica e sintática"""
+        tree = self.parse(source)
+        self.detect_unsupported_features(tree)
+        return tree
+    
+    def parse(self, source: str) -> ast.AST:
+        """Análise sintática, sem as verificações (que podem rodar no front end).
+        
+        A construção da AST pelo CPython é recursiva e limitada pelo limite de
+        recursão do interpretador, que é global ao processo e não é alterado
+        aqui (elevá-lo deixaria o parser em C estourar a pilha). Código mais
+        profundo que isso pode ser entregue a generate() já como ast.Module.
+        """
         try:
-            tree = ast.parse(source)
-            self.detect_unsupported_features(tree)
-            return tree
+            return ast.parse(source)
         except SyntaxError as e:
             raise UnsupportedFeatureError(f"Erro de sintaxe Python: {e}", None)
+        except (RecursionError, MemoryError):
+            # RecursionError: construção da AST; MemoryError: pilha própria do parser (- - - ... 1)
+            raise UnsupportedFeatureError(
+                "Expressão aninhada profundamente demais para o parser do Python "
+                "(passe a AST pronta para generate())", None)
     
     def tokenize(self, source: str) -> List[str]:
         """Identifica e classifica tokens no código-fonte."""
@@ -32,11 +57,20 @@ class LexicalAnalyzer:
 
     def detect_unsupported_features(self, tree: ast.AST):
         """Detecta estruturas Python não suportadas."""
-        for node in ast.walk(tree):
-            if isinstance(node, ast.AsyncFunctionDef):
-                self.warn("Funções assíncronas não são suportadas.", node)
-            elif isinstance(node, ast.Yield):
-                self.warn("Expressões 'yield' não são suportadas.", node)
+        passes = AnalysisPassManager()
+        self.register_passes(passes)
+        passes.run(tree)
+
+    def register_passes(self, passes: AnalysisPassManager):
+        """Registra as verificações de recursos não suportados no front end"""
+        passes.register(ast.AsyncFunctionDef, self._on_async_function)
+        passes.register(ast.Yield, self._on_yield)
+
+    def _on_async_function(self, node: ast.AsyncFunctionDef, parent, scope, func):
+        self.warn("Funções assíncronas não são suportadas.", node)
+
+    def _on_yield(self, node: ast.Yield, parent, scope, func):
+        self.warn("Expressões 'yield' não são suportadas.", node)
 
     def escape_string(self, s: str) -> str:
         """Escapa string corretamente para Swift, incluindo Unicode."""
@@ -48,7 +82,9 @@ class LexicalAnalyzer:
                  .encode('unicode_escape').decode('utf-8'))
 
     def warn(self, message: str, node: ast.AST = None):
-        """Adiciona um aviso"""
+        """Adiciona um aviso (e o repassa a warning_sink, se houver)"""
+        if self.warning_sink is not None:
+            self.warning_sink(message, node)
         if node and hasattr(node, 'lineno'):
             message = f"Linha {node.lineno}: {message}"
         self.warnings.append(message)
@@ -0,0 +1,427 @@
+"""Registro público das conversões de built-ins, métodos e imports Python para Swift.
+
+Built-ins são indexados por (nome, aridade) e métodos por (receptor, nome,
+aridade). Aridade None registra uma conversão para qualquer número de
+argumentos; ela só é usada quando não há entrada para a aridade exata.
+O receptor é o tipo Swift inferido para o objeto ('String', 'Array',
+'Dictionary', 'Set' ou o nome do tipo), 'module:<nome>' para funções de
+um módulo importado (math.sqrt) ou None para qualquer receptor. Novas
+conversões podem ser registradas com os decoradores register_builtin /
+register_method / register_import:
+
+    @register_builtin('round', 1)
+    def _round(tp, node, args):
+        return f"{args[0]}.rounded()"
+
+    @register_method('sqrt', 1, receiver='module:math')
+    def _sqrt(tp, node, obj, args):
+        return f"({args[0]}).squareRoot()"
+
+Pacotes externos publicam conversões como provedores no grupo de entry
+points "py2swift.mappings" (o objeto carregado é um módulo que registra
+ao ser importado ou uma função sem argumentos chamada uma vez). Os
+provedores só são carregados na primeira consulta, então importar o
+py2swift continua rápido; conversões registradas por eles substituem as
+embutidas.
+"""
+import ast
+import threading
+import warnings
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from .swift_types import DOUBLE, ANY, SwiftType
+
+# fn(transpilador, nó da chamada, argumentos já convertidos)
+BuiltinLowering = Callable[[object, ast.Call, List[str]], str]
+# fn(transpilador, nó da chamada, receptor já convertido, argumentos já convertidos)
+MethodLowering = Callable[[object, ast.Call, str, List[str]], str]
+# fn(transpilador, nó do import, alias) -> linha Swift a emitir
+ImportLowering = Callable[[object, ast.Import, ast.alias], str]
+
+BUILTIN_LOWERINGS: Dict[Tuple[str, Optional[int]], BuiltinLowering] = {}
+METHOD_LOWERINGS: Dict[Tuple[Optional[str], str, Optional[int]], MethodLowering] = {}
+IMPORT_LOWERINGS: Dict[str, ImportLowering] = {}
+
+# Métodos com alguma conversão específica de receptor (só eles exigem inferir o tipo do objeto)
+_RECEIVER_METHODS: Set[str] = set()
+
+ENTRY_POINT_GROUP = 'py2swift.mappings'
+
+
+def register_builtin(name: str, arity: Optional[int] = None):
+    """Registra a conversão de uma função built-in (decorador)"""
+    def decorator(fn: BuiltinLowering) -> BuiltinLowering:
+        BUILTIN_LOWERINGS[(name, arity)] = fn
+        return fn
+    return decorator
+
+
+def register_method(name: str, arity: Optional[int] = None, receiver: Optional[str] = None):
+    """Registra a conversão de um método (decorador)"""
+    def decorator(fn: MethodLowering) -> MethodLowering:
+        METHOD_LOWERINGS[(receiver, name, arity)] = fn
+        if receiver is not None:
+            _RECEIVER_METHODS.add(name)
+        return fn
+    return decorator
+
+
+def register_import(module: str):
+    """Registra a conversão de import module (decorador)"""
+    def decorator(fn: ImportLowering) -> ImportLowering:
+        IMPORT_LOWERINGS[module] = fn
+        return fn
+    return decorator
+
+
+def lookup_builtin(name: str, arity: int) -> Optional[BuiltinLowering]:
+    """Conversão para name(...) com arity argumentos, ou None"""
+    if not _providers_loaded:
+        load_providers()
+    return BUILTIN_LOWERINGS.get((name, arity)) or BUILTIN_LOWERINGS.get((name, None))
+
+
+def lookup_method(name: str, arity: int, receiver: Optional[str] = None) -> Optional[MethodLowering]:
+    """Conversão para obj.name(...) com arity argumentos, ou None.
+
+    Tenta primeiro as conversões do receptor; as genéricas (receptor None)
+    valem para qualquer tipo, mas não para funções de módulos.
+    """
+    if not _providers_loaded:
+        load_providers()
+    if receiver is not None:
+        lowering = METHOD_LOWERINGS.get((receiver, name, arity)) or METHOD_LOWERINGS.get((receiver, name, None))
+        if lowering is not None or receiver.startswith('module:'):
+            return lowering
+    return METHOD_LOWERINGS.get((None, name, arity)) or METHOD_LOWERINGS.get((None, name, None))
+
+
+def lookup_import(module: str) -> Optional[ImportLowering]:
+    """Conversão para import module, ou None"""
+    if not _providers_loaded:
+        load_providers()
+    return IMPORT_LOWERINGS.get(module)
+
+
+def has_receiver_lowerings(name: str) -> bool:
+    """Se há conversões específicas de receptor para o método name"""
+    if not _providers_loaded:
+        load_providers()
+    return name in _RECEIVER_METHODS
+
+
+def receiver_key(typ: Optional[SwiftType]) -> Optional[str]:
+    """Chave de receptor de um tipo Swift inferido (None se desconhecido)"""
+    if typ is None or typ is ANY:
+        return None
+    if typ.is_array:
+        return 'Array'
+    if typ.is_dict:
+        return 'Dictionary'
+    if typ.is_set:
+        return 'Set'
+    return typ.name
+
+
+# ===== PROVEDORES =====
+
+_pending_providers: List[Callable[[], None]] = []
+_providers_loaded = False
+_entry_points_scanned = False
+_load_lock = threading.RLock()  # reentrante: um provedor pode consultar o registro
+
+
+def register_provider(provider: Callable[[], None]):
+    """Adiciona um provedor de conversões, chamado na próxima consulta"""
+    global _providers_loaded
+    with _load_lock:
+        _pending_providers.append(provider)
+        _providers_loaded = False
+
+
+def load_providers():
+    """Carrega os provedores pendentes (entry points na primeira vez).
+
+    Chamado automaticamente pelas consultas; um provedor com erro gera um
+    RuntimeWarning e é ignorado.
+    """
+    global _providers_loaded, _entry_points_scanned
+    with _load_lock:
+        if _providers_loaded:
+            return
+        if not _entry_points_scanned:
+            _entry_points_scanned = True
+            _pending_providers[:0] = _entry_point_providers()
+        while _pending_providers:
+            provider = _pending_providers.pop(0)
+            try:
+                provider()
+            except Exception as e:
+                warnings.warn(f"Provedor de conversões {provider!r} falhou: {e!r}", RuntimeWarning)
+        _providers_loaded = True
+
+
+def _entry_point_providers() -> List[Callable[[], None]]:
+    try:
+        from importlib.metadata import entry_points
+        found = entry_points(group=ENTRY_POINT_GROUP)
+    except Exception as e:
+        warnings.warn(f"Falha ao listar entry points {ENTRY_POINT_GROUP!r}: {e!r}", RuntimeWarning)
+        return []
+    return [_EntryPointProvider(ep) for ep in sorted(found, key=lambda ep: ep.name)]
+
+
+class _EntryPointProvider:
+    """Importa o objeto do entry point; se for chamável, chama-o"""
+
+    def __init__(self, entry_point):
+        self.entry_point = entry_point
+
+    def __call__(self):
+        loaded = self.entry_point.load()
+        if callable(loaded):
+            loaded()
+
+    def __repr__(self) -> str:
+        return f"{self.entry_point.name} ({self.entry_point.value})"
+
+
+# ===== BUILT-INS =====
+
+@register_builtin('print')
+def _print(tp, node, args):
+    return f"print({', '.join(args)})"
+
+
+@register_builtin('len', 1)
+def _len(tp, node, args):
+    return f"{args[0]}.count"
+
+
+@register_builtin('sum', 1)
+def _sum(tp, node, args):
+    list_type = tp._infer_type(node.args[0])
+    is_double = (list_type.is_array or list_type.is_set) and list_type.element is DOUBLE
+    initial_value = '0.0' if is_double else '0'
+    return f"{args[0]}.reduce({initial_value}, +)"
+
+
+@register_builtin('min', 1)
+def _min_of(tp, node, args):
+    return f"{args[0]}.min() ?? 0"
+
+
+@register_builtin('max', 1)
+def _max_of(tp, node, args):
+    return f"{args[0]}.max() ?? 0"
+
+
+@register_builtin('min')
+@register_builtin('max')
+@register_builtin('abs', 1)
+@register_builtin('zip')
+def _same_name(tp, node, args):
+    return f"{node.func.id}({', '.join(args)})"
+
+
+@register_builtin('sorted', 1)
+def _sorted(tp, node, args):
+    return f"{args[0]}.sorted()"
+
+
+@register_builtin('reversed', 1)
+def _reversed(tp, node, args):
+    return f"Array({args[0]}.reversed())"
+
+
+@register_builtin('range', 1)
+def _range_to(tp, node, args):
+    return f"0..<{args[0]}"
+
+
+@register_builtin('range', 2)
+def _range_from_to(tp, node, args):
+    return f"{args[0]}..<{args[1]}"
+
+
+@register_builtin('str', 1)
+def _str(tp, node, args):
+    return f"String({args[0]})"
+
+
+@register_builtin('int', 1)
+def _int(tp, node, args):
+    return f"Int({args[0]}) ?? 0"
+
+
+@register_builtin('float', 1)
+def _float(tp, node, args):
+    return f"Double({args[0]}) ?? 0.0"
+
+
+@register_builtin('list', 0)
+def _empty_list(tp, node, args):
+    return "[]"
+
+
+@register_builtin('list')
+def _list(tp, node, args):
+    return f"Array({args[0]})"
+
+
+@register_builtin('set', 0)
+def _empty_set(tp, node, args):
+    return "Set()"
+
+
+@register_builtin('set')
+def _set(tp, node, args):
+    return f"Set({args[0]})"
+
+
+@register_builtin('dict')
+def _dict(tp, node, args):
+    return "[:]"
+
+
+@register_builtin('enumerate', 1)
+def _enumerate(tp, node, args):
+    return f"{args[0]}.enumerated()"
+
+
+@register_builtin('map', 2)
+def _map(tp, node, args):
+    return f"{args[1]}.map({args[0]})"
+
+
+@register_builtin('filter', 2)
+def _filter(tp, node, args):
+    return f"{args[1]}.filter({args[0]})"
+
+
+@register_builtin('any', 1)
+def _any(tp, node, args):
+    return f"{args[0]}.contains(where: {{ $0 }})"
+
+
+@register_builtin('all', 1)
+def _all(tp, node, args):
+    return f"{args[0]}.allSatisfy({{ $0 }})"
+
+
+# ===== IMPORTS =====
+
+@register_import('math')
+@register_import('random')
+@register_import('datetime')
+@register_import('json')
+def _foundation(tp, node, alias):
+    return "import Foundation"
+
+
+@register_import('re')
+def _regex(tp, node, alias):
+    return "import Foundation  // Use NSRegularExpression"
+
+
+# ===== MÉTODOS DE STRING =====
+
+@register_method('lower')
+def _lower(tp, node, obj, args):
+    return f"{obj}.lowercased()"
+
+
+@register_method('upper')
+def _upper(tp, node, obj, args):
+    return f"{obj}.uppercased()"
+
+
+@register_method('strip')
+def _strip(tp, node, obj, args):
+    return f"{obj}.trimmingCharacters(in: .whitespacesAndNewlines)"
+
+
+@register_method('replace', 2)
+def _replace(tp, node, obj, args):
+    return f"{obj}.replacingOccurrences(of: {args[0]}, with: {args[1]})"
+
+
+@register_method('split', 0)
+def _split_whitespace(tp, node, obj, args):
+    return f"{obj}.split(separator: \" \").map(String.init)"
+
+
+@register_method('split')
+def _split(tp, node, obj, args):
+    return f"{obj}.split(separator: {args[0]}).map(String.init)"
+
+
+@register_method('join', 1)
+def _join(tp, node, obj, args):
+    return f"{args[0]}.joined(separator: {obj})"
+
+
+@register_method('startswith', 1)
+def _startswith(tp, node, obj, args):
+    return f"{obj}.hasPrefix({args[0]})"
+
+
+@register_method('endswith', 1)
+def _endswith(tp, node, obj, args):
+    return f"{obj}.hasSuffix({args[0]})"
+
+
+# ===== MÉTODOS DE LISTA =====
+
+@register_method('append', 1)
+def _append(tp, node, obj, args):
+    return f"{obj}.append({args[0]})"
+
+
+@register_method('extend', 1)
+def _extend(tp, node, obj, args):
+    return f"{obj}.append(contentsOf: {args[0]})"
+
+
+@register_method('insert', 2)
+def _insert(tp, node, obj, args):
+    return f"{obj}.insert({args[1]}, at: {args[0]})"
+
+
+@register_method('remove', 1)
+def _remove(tp, node, obj, args):
+    return f"{obj}.removeAll(where: {{ $0 == {args[0]} }})"
+
+
+@register_method('pop', 0)
+def _pop_last(tp, node, obj, args):
+    return f"{obj}.removeLast()"
+
+
+@register_method('pop')
+def _pop(tp, node, obj, args):
+    return f"{obj}.remove(at: {args[0]})"
+
+
+# ===== MÉTODOS DE DICIONÁRIO =====
+
+@register_method('get', 1)
+@register_method('get', 2)
+def _get(tp, node, obj, args):
+    default = args[1] if len(args) > 1 else 'nil'
+    return f"({obj}[{args[0]}] ?? {default})"
+
+
+@register_method('keys')
+def _keys(tp, node, obj, args):
+    return f"Array({obj}.keys)"
+
+
+@register_method('values')
+def _values(tp, node, obj, args):
+    return f"Array({obj}.values)"
+
+
+@register_method('items')
+def _items(tp, node, obj, args):
+    return f"Array({obj})"
@@ -0,0 +1,81 @@
+"""Emissão paralela das definições de nível superior (funções e classes).
+
+Depois da inferência, o texto Swift de cada definição de nível superior
+depende apenas do estado compartilhado (assinaturas e tipos), que não muda
+durante a emissão. As definições são então distribuídas em blocos
+contíguos por um pool de processos e os resultados são costurados de volta
+na ordem do código, junto com os avisos e as origens das linhas (source
+map) de cada uma; a saída é idêntica à emissão serial.
+
+Os workers herdam o transpilador já analisado via 'fork' (sem serializar
+a AST). Sem fork (método de início 'spawn' ou 'forkserver'), cada worker
+teria de refazer a análise inteira, o que anula o ganho; nesse caso
+fork_available() é falso e o transpilador emite em série.
+"""
+import ast
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+# Estado do processo worker: (transpilador analisado, comandos de nível superior)
+_worker_state: Optional[tuple] = None
+
+
+def fork_available() -> bool:
+    """True se o método de início em uso (ou o padrão da plataforma) é 'fork'.
+
+    Não fixa o método de início global, ao contrário de get_start_method().
+    """
+    method = multiprocessing.get_start_method(allow_none=True)
+    if method is None:
+        method = multiprocessing.get_all_start_methods()[0]  # o primeiro é o padrão
+    return method == 'fork'
+
+
+def _init_worker(transpiler):
+    global _worker_state
+    transpiler.line_origins = []  # as linhas já emitidas pelo processo pai não são deste worker
+    _worker_state = (transpiler, transpiler._top_level_units(transpiler._tree))
+
+
+def _emit_block(indices: List[int]) -> List[Tuple[str, List[str], list]]:
+    """Emite os comandos indicados, devolvendo (texto, avisos novos, origens das linhas) de cada um"""
+    transpiler, units = _worker_state
+    results = []
+    for i in indices:
+        mark = len(transpiler.warnings)
+        transpiler.visit(units[i])
+        results.append((transpiler._take_lines(), transpiler.warnings[mark:], transpiler.line_origins))
+        transpiler.line_origins = []
+    return results
+
+
+class ParallelEmission:
+    """Despacha as definições de nível superior para um pool de processos (requer fork)"""
+
+    def __init__(self, transpiler, units: List[ast.stmt], workers: int, blocks_per_worker: int = 4):
+        definitions = [i for i, node in enumerate(units)
+                       if isinstance(node, (ast.FunctionDef, ast.ClassDef))]
+        block_size = max(1, -(-len(definitions) // (workers * blocks_per_worker)))
+        blocks = [definitions[i:i + block_size] for i in range(0, len(definitions), block_size)]
+
+        # Só com fork: os workers herdam a análise (ver fork_available())
+        self._executor = ProcessPoolExecutor(max_workers=min(workers, len(blocks)),
+                                             mp_context=multiprocessing.get_context('fork'),
+                                             initializer=_init_worker, initargs=(transpiler,))
+        # Submete tudo de imediato: com fork, os workers nascem agora, com o estado atual
+        futures = [self._executor.submit(_emit_block, block) for block in blocks]
+        self._slots: Dict[int, tuple] = {}
+        for future, block in zip(futures, blocks):
+            for position, index in enumerate(block):
+                self._slots[index] = (future, position)
+
+    def __contains__(self, index: int) -> bool:
+        return index in self._slots
+
+    def result(self, index: int) -> Tuple[str, List[str], list]:
+        future, position = self._slots[index]
+        return future.result()[position]
+
+    def close(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,103 @@
+import ast
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Type, Union
+
+from .ast_index import NodeIndex
+from .symbol_table import TypeEnvironment
+from . import tracing
+
+# callback(nó, pai, escopo, função envolvente)
+PassCallback = Callable[[ast.AST, Optional[ast.AST], str, Optional[ast.FunctionDef]], None]
+
+
+class AnalysisPassManager:
+    """Funde as análises que apenas percorrem a AST em uma única passada.
+
+    Cada análise registra callbacks por tipo de nó. run() visita cada nó uma
+    única vez (pré-ordem, sem recursão) e chama os callbacks com o pai, o
+    escopo (ver TypeEnvironment.child_scope) e a função envolvente.
+    O índice de pais é construído na mesma passada.
+    """
+
+    def __init__(self):
+        self._callbacks: Dict[type, List[PassCallback]] = {}
+        self.index = NodeIndex()
+
+    def register(self, node_types: Union[Type[ast.AST], Tuple[Type[ast.AST], ...]], callback: PassCallback):
+        """Registra um callback para um ou mais tipos de nó"""
+        if isinstance(node_types, type):
+            node_types = (node_types,)
+        for node_type in node_types:
+            self._callbacks.setdefault(node_type, []).append(callback)
+
+    def run(self, tree: ast.AST) -> NodeIndex:
+        """Percorre a árvore uma vez, disparando os callbacks registrados"""
+        callbacks = self._callbacks
+        index = self.index
+        stack: List[tuple] = [(tree, None, 'global', None)]
+        while stack:
+            node, parent, scope, func = stack.pop()
+            index.add(node, parent)
+            for callback in callbacks.get(type(node), ()):
+                callback(node, parent, scope, func)
+
+            if isinstance(node, ast.FunctionDef):
+                scope, func = TypeEnvironment.child_scope(scope, 'func', node.name), node
+            elif isinstance(node, ast.ClassDef):
+                scope, func = TypeEnvironment.child_scope(scope, 'class', node.name), None
+            children = list(ast.iter_child_nodes(node))
+            for child in reversed(children):
+                stack.append((child, node, scope, func))
+        return index
+
+
+# fn(programa IR, transpilador, candidatos [(nó, pai, escopo)])
+OptimizationPass = Callable[[object, object, List[tuple]], None]
+
+
+class OptimizationPassManager:
+    """Executa os passes de otimização/lowering sobre a IR, em ordem.
+
+    Cada pass declara os tipos de nó que lhe interessam; os candidatos são
+    coletados na passada única do front end (register_collectors), então
+    nenhum pass percorre a árvore de novo. Passes em ``disabled`` não
+    rodam. O tempo de cada pass fica em ``timings`` (segundos) e, com
+    tracing ativo, como fase 'opt:<nome>' (com o nº de nós candidatos).
+    """
+
+    def __init__(self, disabled: Iterable[str] = ()):
+        self._passes: List[Tuple[str, Tuple[Type[ast.AST], ...], OptimizationPass]] = []
+        self.disabled = set(disabled)
+        self._candidates: Dict[str, List[tuple]] = {}
+        self.timings: Dict[str, float] = {}
+
+    @property
+    def names(self) -> List[str]:
+        return [name for name, _, _ in self._passes]
+
+    def register(self, name: str, node_types: Tuple[Type[ast.AST], ...], fn: OptimizationPass):
+        """Adiciona um pass ao fim da sequência"""
+        self._passes.append((name, tuple(node_types), fn))
+
+    def register_collectors(self, front_end: AnalysisPassManager):
+        """Coleta, no front end, os nós que os passes habilitados vão examinar"""
+        self._candidates = {}
+        for name, node_types, _ in self._passes:
+            if name in self.disabled:
+                continue
+            found = self._candidates[name] = []  # em pré-ordem, como o front end visita
+            front_end.register(node_types, lambda node, parent, scope, func, found=found:
+                               found.append((node, parent, scope)))
+
+    def run(self, program, transpiler, after_pass: Optional[Callable[[str], None]] = None):
+        """Executa os passes habilitados; after_pass(nome) é chamado ao fim de cada um"""
+        for name, _, fn in self._passes:
+            if name in self.disabled:
+                continue
+            candidates = self._candidates.get(name, [])
+            start = time.perf_counter()
+            with tracing.phase(f"opt:{name}", candidates=len(candidates)):
+                fn(program, transpiler, candidates)
+            self.timings[name] = time.perf_counter() - start
+            if after_pass is not None:
+                after_pass(name)
@@ -0,0 +1,134 @@
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional, TextIO
+
+from .transpiler import PyToSwiftTranspiler
+
+
+class TranspilerPool:
+    """Conjunto limitado de transpiladores reutilizáveis.
+
+    Cada instância emprestada é de uso exclusivo de quem a pegou; ao ser
+    devolvida, passa por reset() e volta para a fila. Instâncias são
+    criadas sob demanda até ``size``; depois disso, borrow() espera uma
+    devolução (ou levanta TimeoutError após ``timeout`` segundos). A fila é
+    LIFO, então a instância usada mais recentemente (com caches quentes) é
+    a próxima a ser emprestada.
+
+        pool = TranspilerPool(size=4)
+        with pool.borrow() as tp:
+            swift = tp.generate(codigo)
+    """
+
+    def __init__(self, size: int = 4, factory: Callable[[], PyToSwiftTranspiler] = PyToSwiftTranspiler):
+        if size < 1:
+            raise ValueError("O tamanho do pool deve ser pelo menos 1")
+        self.size = size
+        self._factory = factory
+        self._idle: "queue.LifoQueue[PyToSwiftTranspiler]" = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self.created = 0   # instâncias criadas
+        self.borrows = 0   # empréstimos atendidos
+
+    def acquire(self, timeout: Optional[float] = None) -> PyToSwiftTranspiler:
+        """Pega uma instância (prefira borrow(); acquire exige release())"""
+        transpiler = self._checkout(timeout)
+        # Só empréstimos atendidos contam (timeouts e falhas da factory não)
+        with self._lock:
+            self.borrows += 1
+        return transpiler
+
+    def _checkout(self, timeout: Optional[float]) -> PyToSwiftTranspiler:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            create = self.created < self.size
+            if create:
+                self.created += 1
+        if create:
+            try:
+                return self._factory()
+            except BaseException:
+                with self._lock:
+                    self.created -= 1
+                raise
+        try:
+            return self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError(f"Nenhum transpilador livre após {timeout}s") from None
+
+    def release(self, transpiler: PyToSwiftTranspiler):
+        """Devolve uma instância obtida com acquire()"""
+        transpiler.reset()
+        self._idle.put(transpiler)
+
+    @contextmanager
+    def borrow(self, timeout: Optional[float] = None) -> Iterator[PyToSwiftTranspiler]:
+        """Empresta uma instância durante o bloco with"""
+        transpiler = self.acquire(timeout)
+        try:
+            yield transpiler
+        finally:
+            self.release(transpiler)
+
+    def transpile(self, source: str, timeout: Optional[float] = None) -> str:
+        """Equivalente a transpile(), usando uma instância do pool"""
+        with self.borrow(timeout) as transpiler:
+            return transpiler.generate(source)
+
+    def transpile_to(self, source: str, stream: TextIO, flush: bool = False,
+                     timeout: Optional[float] = None) -> int:
+        """Equivalente a transpile_to(), usando uma instância do pool"""
+        with self.borrow(timeout) as transpiler:
+            return transpiler.generate_to(source, stream, flush=flush)
+
+    def iter_transpile(self, source: str, timeout: Optional[float] = None) -> Iterator[str]:
+        """Como PyToSwiftTranspiler.iter_generate; a instância volta ao pool
+        quando o iterador termina ou é fechado.
+
+        A análise roda antes do retorno, então erros são levantados aqui.
+        """
+        transpiler = self.acquire(timeout)
+        try:
+            chunks = transpiler.iter_generate(source)
+        except BaseException:
+            self.release(transpiler)
+            raise
+        return _PooledChunks(self, transpiler, chunks)
+
+
+class _PooledChunks:
+    """Iterador de trechos que devolve o transpilador ao pool ao terminar.
+
+    close() (chamado por servidores WSGI ao fim da resposta) também devolve
+    a instância, mesmo que a iteração não tenha começado.
+    """
+
+    def __init__(self, pool: TranspilerPool, transpiler: PyToSwiftTranspiler, chunks: Iterator[str]):
+        self._pool = pool
+        self._transpiler = transpiler
+        self._chunks = chunks
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        if self._transpiler is None:
+            raise StopIteration
+        try:
+            return next(self._chunks)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self):
+        transpiler, self._transpiler = self._transpiler, None
+        if transpiler is not None:
+            self._chunks.close()
+            self._pool.release(transpiler)
+
+    def __del__(self):
+        self.close()
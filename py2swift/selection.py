@@ -0,0 +1,140 @@
+import ast
+from typing import Dict, Iterable, List, Set, Tuple
+
+from .exceptions import TranspileError
+
+# Nós que abrem um escopo próprio (nomes atribuídos dentro deles não são globais)
+_FUNCTION_SCOPES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)
+_COMPREHENSIONS = (ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp)
+_SCOPES = _FUNCTION_SCOPES + (ast.ClassDef,) + _COMPREHENSIONS
+
+
+def dependency_closure(statements: List[ast.stmt], names: Iterable[str]) -> List[ast.stmt]:
+    """Comandos de nível superior necessários para os nomes pedidos, em ordem.
+
+    Um comando entra no resultado se define (ou altera) algum nome
+    necessário; os nomes globais lidos por ele (chamadas, classes base,
+    globais, decoradores, imports) passam a ser necessários também. Só os
+    comandos incluídos são percorridos por inteiro, então o custo acompanha
+    o subconjunto pedido, não o arquivo todo.
+    """
+    binders: Dict[str, List[int]] = {}  # nome -> comandos que o definem ou alteram
+    for i, stmt in enumerate(statements):
+        for name in _bound_names(stmt):
+            binders.setdefault(name, []).append(i)
+
+    wanted = list(dict.fromkeys(names))
+    missing = [name for name in wanted if name not in binders]
+    if missing:
+        raise TranspileError(f"Símbolos não encontrados no nível superior: {', '.join(missing)}")
+
+    needed: Set[str] = set()
+    included: Set[int] = set()
+    pending = wanted
+    while pending:
+        name = pending.pop()
+        if name in needed:
+            continue
+        needed.add(name)
+        for i in binders.get(name, ()):
+            if i in included:
+                continue
+            included.add(i)
+            loads, _, _ = _scan([statements[i]])
+            pending.extend(n for n in loads if n not in needed)
+
+    return [statements[i] for i in sorted(included)]
+
+
+def _bound_names(stmt: ast.stmt) -> Set[str]:
+    """Nomes globais que o comando define ou altera"""
+    if isinstance(stmt, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+        return {stmt.name}
+    bound = set()
+    stack = [stmt]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, _SCOPES):
+            if not isinstance(node, (ast.Lambda,) + _COMPREHENSIONS):
+                bound.add(node.name)  # definição condicional; o corpo é outro escopo
+            continue
+        if isinstance(node, ast.Name) and isinstance(node.ctx, (ast.Store, ast.Del)):
+            bound.add(node.id)
+        elif isinstance(node, (ast.Attribute, ast.Subscript)) and isinstance(node.ctx, (ast.Store, ast.Del)):
+            base = node.value
+            while isinstance(base, (ast.Attribute, ast.Subscript)):
+                base = base.value
+            if isinstance(base, ast.Name):
+                bound.add(base.id)  # x.attr = ... / x[i] = ... altera x
+        elif isinstance(node, ast.Import):
+            bound.update(alias.asname or alias.name.split('.')[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            bound.update(alias.asname or alias.name for alias in node.names if alias.name != '*')
+        stack.extend(ast.iter_child_nodes(node))
+    return bound
+
+
+def _scan(roots: List[ast.AST]) -> Tuple[Set[str], Set[str], Set[str]]:
+    """(lidos, atribuídos, declarados global) no escopo de roots.
+
+    Escopos aninhados contribuem apenas com seus nomes livres; o cabeçalho
+    deles (decoradores, defaults, bases...) é avaliado no escopo atual.
+    """
+    loads: Set[str] = set()
+    stores: Set[str] = set()
+    declared: Set[str] = set()
+    stack = list(roots)
+    while stack:
+        node = stack.pop()
+        if isinstance(node, _SCOPES):
+            stack.extend(_scope_header(node))
+            loads |= _free_names(node)
+            if not isinstance(node, (ast.Lambda,) + _COMPREHENSIONS):
+                stores.add(node.name)
+            continue
+        if isinstance(node, ast.Name):
+            (loads if isinstance(node.ctx, ast.Load) else stores).add(node.id)
+        elif isinstance(node, (ast.Global, ast.Nonlocal)):
+            declared.update(node.names)
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            stores.update((alias.asname or alias.name).split('.')[0] for alias in node.names)
+        stack.extend(ast.iter_child_nodes(node))
+    return loads, stores, declared
+
+
+def _scope_header(node: ast.AST) -> List[ast.AST]:
+    """Partes de um nó de escopo avaliadas no escopo envolvente"""
+    if isinstance(node, _FUNCTION_SCOPES):
+        args = node.args
+        header = list(args.defaults) + [d for d in args.kw_defaults if d is not None]
+        if not isinstance(node, ast.Lambda):
+            header += node.decorator_list
+            all_args = args.posonlyargs + args.args + args.kwonlyargs + [a for a in (args.vararg, args.kwarg) if a]
+            header += [a.annotation for a in all_args if a.annotation is not None]
+            if node.returns is not None:
+                header.append(node.returns)
+        return header
+    if isinstance(node, ast.ClassDef):
+        return node.decorator_list + node.bases + [k.value for k in node.keywords]
+    return [node.generators[0].iter]
+
+
+def _free_names(node: ast.AST) -> Set[str]:
+    """Nomes lidos no corpo de um escopo que não são locais a ele"""
+    params: Set[str] = set()
+    if isinstance(node, _FUNCTION_SCOPES):
+        args = node.args
+        params = {a.arg for a in args.posonlyargs + args.args + args.kwonlyargs}
+        params.update(a.arg for a in (args.vararg, args.kwarg) if a)
+        roots = [node.body] if isinstance(node, ast.Lambda) else list(node.body)
+    elif isinstance(node, ast.ClassDef):
+        roots = list(node.body)
+    else:
+        roots = [node.key, node.value] if isinstance(node, ast.DictComp) else [node.elt]
+        for i, generator in enumerate(node.generators):
+            roots.append(generator.target)
+            roots.extend(generator.ifs)
+            if i:
+                roots.append(generator.iter)
+    loads, stores, declared = _scan(roots)
+    return loads - ((stores | params) - declared)
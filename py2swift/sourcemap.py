@@ -0,0 +1,101 @@
+"""Source maps (formato v3) das linhas Swift geradas para as linhas Python.
+
+Com record_origins=True, cada linha Swift emitida registra a posição
+(linha, coluna) do comando Python que a produziu, em
+PyToSwiftTranspiler.line_origins. Este
+módulo converte essa lista no JSON padrão de source map v3, que
+ferramentas de profiling e depuração usam para atribuir trechos do
+código Swift às linhas Python de origem.
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+
+_BASE64 = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/"
+_BASE64_VALUES = {c: i for i, c in enumerate(_BASE64)}
+
+# Origem de uma linha Swift: (linha Python a partir de 1, coluna a partir de 0), ou None
+Origin = Optional[Tuple[int, int]]
+
+
+def encode_vlq(value: int) -> str:
+    """Codifica um inteiro em Base64 VLQ (bit de sinal no bit menos significativo)"""
+    value = (-value << 1) | 1 if value < 0 else value << 1
+    digits = []
+    while True:
+        digit = value & 0x1F
+        value >>= 5
+        if value:
+            digit |= 0x20
+        digits.append(_BASE64[digit])
+        if not value:
+            return "".join(digits)
+
+
+def decode_vlq(segment: str) -> List[int]:
+    """Decodifica uma sequência de inteiros Base64 VLQ"""
+    values = []
+    value = shift = 0
+    for c in segment:
+        digit = _BASE64_VALUES[c]
+        value |= (digit & 0x1F) << shift
+        if digit & 0x20:
+            shift += 5
+            continue
+        values.append(-(value >> 1) if value & 1 else value >> 1)
+        value = shift = 0
+    return values
+
+
+def build_source_map(origins: Sequence[Origin], file: str = "output.swift", source: str = "input.py",
+                     source_text: Optional[str] = None, include_source: bool = False) -> Dict:
+    """Monta o source map v3 a partir das origens de cada linha gerada.
+
+    As colunas do ast do Python contam bytes UTF-8; com source_text, elas
+    são convertidas para caracteres nas linhas que não são ASCII. Cada
+    linha Swift com origem recebe um único segmento na coluna 0.
+    include_source embute source_text em "sourcesContent".
+    """
+    source_lines = source_text.split('\n') if source_text is not None else None
+    mappings = []
+    prev_line = prev_col = 0
+    for origin in origins:
+        if origin is None:
+            mappings.append("")
+            continue
+        line, col = origin[0] - 1, origin[1]
+        if source_lines is not None and col and 0 <= line < len(source_lines):
+            text = source_lines[line]
+            if not text.isascii():
+                col = len(text.encode('utf-8')[:col].decode('utf-8', errors='ignore'))
+        mappings.append("AA" + encode_vlq(line - prev_line) + encode_vlq(col - prev_col))
+        prev_line, prev_col = line, col
+    source_map = {
+        "version": 3,
+        "file": file,
+        "sources": [source],
+        "names": [],
+        "mappings": ";".join(mappings),
+    }
+    if include_source and source_text is not None:
+        source_map["sourcesContent"] = [source_text]
+    return source_map
+
+
+def original_positions(source_map: Dict) -> List[Origin]:
+    """Inverso de build_source_map: (linha Python, coluna) de cada linha Swift.
+
+    Usa o primeiro segmento de cada linha; linhas sem segmento dão None.
+    """
+    positions: List[Origin] = []
+    line = col = 0
+    for group in source_map["mappings"].split(";"):
+        origin = None
+        for segment in group.split(",") if group else ():
+            fields = decode_vlq(segment)
+            if len(fields) < 4:
+                continue
+            line += fields[2]
+            col += fields[3]
+            if origin is None:
+                origin = (line + 1, col)
+        positions.append(origin)
+    return positions
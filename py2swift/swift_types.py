@@ -0,0 +1,101 @@
+from typing import Dict, Optional
+
+
+class SwiftType:
+    """Tipo Swift internado (hash-consed).
+
+    Tipos estruturalmente iguais são o mesmo objeto, então comparações são
+    feitas por identidade (``t is INT``). Containers expõem os componentes
+    diretamente (element, key, value) em vez de exigir o fatiamento da string.
+    """
+
+    __slots__ = ('kind', 'name', 'element', 'key', 'value', '_text')
+
+    NAMED = 'named'
+    ARRAY = 'array'
+    DICT = 'dict'
+    SET = 'set'
+
+    _interned: Dict[tuple, 'SwiftType'] = {}
+
+    def __new__(cls, kind: str, name: Optional[str] = None, element: Optional['SwiftType'] = None,
+                key: Optional['SwiftType'] = None, value: Optional['SwiftType'] = None):
+        ident = (kind, name, element, key, value)
+        typ = cls._interned.get(ident)
+        if typ is not None:
+            return typ
+        typ = object.__new__(cls)
+        set_attr = object.__setattr__
+        set_attr(typ, 'kind', kind)
+        set_attr(typ, 'name', name)
+        set_attr(typ, 'element', element)
+        set_attr(typ, 'key', key)
+        set_attr(typ, 'value', value)
+        set_attr(typ, '_text', cls._spell(kind, name, element, key, value))
+        # setdefault: se duas threads criarem o mesmo tipo, ambas recebem o mesmo objeto
+        return cls._interned.setdefault(ident, typ)
+
+    @staticmethod
+    def _spell(kind, name, element, key, value) -> str:
+        if kind == SwiftType.ARRAY:
+            return f'[{element}]'
+        if kind == SwiftType.DICT:
+            return f'[{key}: {value}]'
+        if kind == SwiftType.SET:
+            return f'Set<{element}>'
+        return name
+
+    def __setattr__(self, attr, value):
+        raise AttributeError("SwiftType é imutável")
+
+    def __reduce__(self):
+        # Reinterna ao desserializar (ex.: em pools de processos)
+        return (SwiftType, (self.kind, self.name, self.element, self.key, self.value))
+
+    def __str__(self) -> str:
+        return self._text
+
+    def __repr__(self) -> str:
+        return f"SwiftType({self._text!r})"
+
+    @property
+    def is_array(self) -> bool:
+        return self.kind == SwiftType.ARRAY
+
+    @property
+    def is_dict(self) -> bool:
+        return self.kind == SwiftType.DICT
+
+    @property
+    def is_set(self) -> bool:
+        return self.kind == SwiftType.SET
+
+    @property
+    def is_numeric(self) -> bool:
+        return self is INT or self is DOUBLE
+
+
+def named(name: str) -> SwiftType:
+    return SwiftType(SwiftType.NAMED, name)
+
+
+def array_of(element: SwiftType) -> SwiftType:
+    return SwiftType(SwiftType.ARRAY, element=element)
+
+
+def dict_of(key: SwiftType, value: SwiftType) -> SwiftType:
+    return SwiftType(SwiftType.DICT, key=key, value=value)
+
+
+def set_of(element: SwiftType) -> SwiftType:
+    return SwiftType(SwiftType.SET, element=element)
+
+
+INT = named('Int')
+DOUBLE = named('Double')
+STRING = named('String')
+BOOL = named('Bool')
+VOID = named('Void')
+ANY = named('Any')
+RANGE = named('Range')
+
@@ -1,19 +1,98 @@
 from dataclasses import dataclass
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
+
+from .swift_types import SwiftType, ANY
 
 @dataclass
 class Symbol:
     """Representa um símbolo (variável, função, etc)"""
     name: str
-    type_hint: str = "Any"
+    type_hint: SwiftType = ANY
     is_mutable: bool = True
     scope: str = "local"
 
+class TypeEnvironment:
+    """Tipos de variáveis e parâmetros indexados por (escopo, nome).
+    
+    Os escopos usam os mesmos nomes da SymbolTable: "global" e, para cada
+    definição, a cadeia de definições envolventes ("func:f", "class:A",
+    "class:A.func:setup", "func:outer.func:inner"), de modo que métodos e
+    funções aninhadas homônimos não compartilham tipos.
+    """
+    GLOBAL = "global"
+    
+    @staticmethod
+    def child_scope(parent: str, kind: str, name: str) -> str:
+        """Escopo da definição kind ('func' ou 'class') chamada name dentro de parent"""
+        scope = f"{kind}:{name}"
+        return scope if parent == TypeEnvironment.GLOBAL else f"{parent}.{scope}"
+    
+    @staticmethod
+    def qualified_name(scope: str) -> str:
+        """Nome qualificado da definição dona do escopo: 'class:A.func:setup' -> 'A.setup'"""
+        return '.'.join(part.split(':', 1)[1] for part in scope.split('.'))
+    
+    @staticmethod
+    def is_class_scope(scope: str) -> bool:
+        return scope.rsplit('.', 1)[-1].startswith('class:')
+    
+    def __init__(self):
+        self._types: Dict[Tuple[str, str], SwiftType] = {}
+        self._parents: Dict[str, str] = {}  # escopo -> escopo envolvente visível
+    
+    def reset(self):
+        """Esquece todos os tipos e escopos (para reutilizar a instância)"""
+        self._types.clear()
+        self._parents.clear()
+    
+    def declare_scope(self, scope: str, parent: str):
+        self._parents[scope] = parent
+    
+    def parent_scope(self, scope: str) -> str:
+        return self._parents.get(scope, self.GLOBAL)
+    
+    def get(self, scope: str, name: str, default: Optional[SwiftType] = None) -> Optional[SwiftType]:
+        return self._types.get((scope, name), default)
+    
+    def set(self, scope: str, name: str, type_hint: SwiftType) -> bool:
+        """Registra o tipo; devolve True se ele mudou"""
+        key = (scope, name)
+        if self._types.get(key) is type_hint:
+            return False
+        self._types[key] = type_hint
+        return True
+    
+    def resolve(self, scope: str, name: str) -> Optional[SwiftType]:
+        """Busca no escopo dado e depois nos envolventes até o global"""
+        while True:
+            typ = self._types.get((scope, name))
+            if typ is not None or scope == self.GLOBAL:
+                return typ
+            scope = self._parents.get(scope, self.GLOBAL)
+    
+    def scope_types(self, scope: str) -> Dict[str, SwiftType]:
+        return {name: typ for (s, name), typ in self._types.items() if s == scope}
+    
+    def items(self):
+        """Pares ((escopo, nome), tipo) de todos os escopos"""
+        return self._types.items()
+
 class SymbolTable:
     """Gerencia escopos e símbolos"""
-    def __init__(self):
+    def __init__(self, types: Optional[TypeEnvironment] = None):
         self.scopes: List[Dict[str, Symbol]] = [{}]  # Global scope
         self.scope_names: List[str] = ["global"]
+        self.types = types if types is not None else TypeEnvironment()
+    
+    def reset(self):
+        """Volta ao estado inicial, apenas com o escopo global"""
+        self.scopes = [{}]
+        self.scope_names = ["global"]
+        self.types.reset()
+    
+    @property
+    def current_scope(self) -> str:
+        return self.scope_names[-1]
     
     def push_scope(self, name: str = "local"):
         self.scopes.append({})
@@ -34,5 +113,13 @@ class SymbolTable:
                 return scope[name]
         return None
     
+    def lookup_type(self, name: str) -> Optional[SwiftType]:
+        """Tipo inferido de um nome, do escopo atual para o global"""
+        for scope_name in reversed(self.scope_names):
+            typ = self.types.get(scope_name, name)
+            if typ is not None:
+                return typ
+        return None
+    
     def is_declared_in_current_scope(self, name: str) -> bool:
         return name in self.scopes[-1]
\ No newline at end of file
@@ -0,0 +1,140 @@
+"""Ganchos de instrumentação do transpilador.
+
+Sem assinantes, os pontos de instrumentação custam uma verificação de
+``enabled()`` (e nenhuma por nó visitado: o visitante cronometrado só é
+instalado quando há assinantes no início da geração). Eventos emitidos:
+
+- ``phase_start`` / ``phase_end``: fases da geração (parse, front_end, solve,
+  optimize, emit); dentro de optimize, cada pass como 'opt:<nome>'
+- ``visit``: tempo de cada visitante de comando (inclusivo: inclui os filhos)
+- ``type_decision``: tipos decididos para variáveis, parâmetros e retornos
+
+Uso:
+
+    writer = JsonTraceWriter()
+    subscribe(writer)
+    try:
+        transpile(codigo)
+    finally:
+        unsubscribe(writer)
+    writer.dump("trace.json")  # abre no chrome://tracing ou Perfetto
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, TextIO, Tuple, Union
+
+PHASE_START = 'phase_start'
+PHASE_END = 'phase_end'
+VISIT = 'visit'
+TYPE_DECISION = 'type_decision'
+
+
+class TraceEvent(NamedTuple):
+    kind: str                        # PHASE_START, PHASE_END, VISIT ou TYPE_DECISION
+    name: str                        # fase, tipo do nó ou símbolo
+    time: float                      # time.perf_counter() no início do evento
+    duration: Optional[float]        # segundos (PHASE_END e VISIT)
+    data: Dict[str, Any]
+
+
+Subscriber = Callable[[TraceEvent], None]
+
+# Tupla substituída por inteiro a cada alteração: leitores nunca veem uma lista pela metade
+_subscribers: Tuple[Subscriber, ...] = ()
+_lock = threading.Lock()
+
+
+def subscribe(subscriber: Subscriber) -> Subscriber:
+    """Registra um assinante; retorna o próprio assinante (pode ser usado como decorador)"""
+    global _subscribers
+    with _lock:
+        _subscribers = _subscribers + (subscriber,)
+    return subscriber
+
+
+def unsubscribe(subscriber: Subscriber):
+    """Remove um assinante registrado (ignora se não estiver registrado).
+
+    Compara por igualdade, então métodos ligados (ex.: lista.append) obtidos
+    de novo também são removidos.
+    """
+    global _subscribers
+    with _lock:
+        _subscribers = tuple(s for s in _subscribers if s != subscriber)
+
+
+def enabled() -> bool:
+    """Indica se há algum assinante"""
+    return bool(_subscribers)
+
+
+def emit(kind: str, name: str, start: Optional[float] = None, duration: Optional[float] = None, **data):
+    """Entrega um evento a todos os assinantes (não faz nada sem assinantes)"""
+    subscribers = _subscribers
+    if not subscribers:
+        return
+    event = TraceEvent(kind, name, time.perf_counter() if start is None else start, duration, data)
+    for subscriber in subscribers:
+        subscriber(event)
+
+
+@contextmanager
+def phase(name: str, **data) -> Iterator[None]:
+    """Delimita uma fase com eventos phase_start/phase_end"""
+    if not _subscribers:
+        yield
+        return
+    start = time.perf_counter()
+    emit(PHASE_START, name, start, **data)
+    try:
+        yield
+    finally:
+        emit(PHASE_END, name, start, time.perf_counter() - start, **data)
+
+
+class JsonTraceWriter:
+    """Assinante que acumula os eventos e os grava no formato Trace Event (JSON).
+
+    Fases e visitas viram eventos completos ("ph": "X"); decisões de tipo
+    viram eventos instantâneos ("ph": "i") com os detalhes em "args".
+    """
+
+    def __init__(self):
+        self.events: List[Dict[str, Any]] = []
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def __call__(self, event: TraceEvent):
+        if event.kind == PHASE_START:
+            return
+        record = {
+            'name': event.name,
+            'cat': event.kind,
+            'ts': round((event.time - self._origin) * 1e6, 3),
+            'pid': os.getpid(),
+            'tid': threading.get_ident(),
+            'args': event.data,
+        }
+        if event.duration is None:
+            record['ph'] = 'i'
+            record['s'] = 't'
+        else:
+            record['ph'] = 'X'
+            record['dur'] = round(event.duration * 1e6, 3)
+        with self._lock:
+            self.events.append(record)
+
+    def to_json(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'traceEvents': list(self.events), 'displayTimeUnit': 'ms'}
+
+    def dump(self, target: Union[str, TextIO]):
+        """Grava o trace em um caminho ou stream"""
+        if isinstance(target, str):
+            with open(target, 'w', encoding='utf-8') as f:
+                json.dump(self.to_json(), f, default=str)
+        else:
+            json.dump(self.to_json(), target, default=str)
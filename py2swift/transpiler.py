@@ -1,19 +1,119 @@
 import ast
-from typing import List, Optional, Dict, Any, Set, Tuple
+import re
+import threading
+import time
+from typing import List, Optional, Dict, Any, Set, Tuple, Union, Iterator, Iterable, TextIO, Callable
 
-from .exceptions import TranspileError, UnsupportedFeatureError
-from .symbol_table import SymbolTable, Symbol
+from .exceptions import TranspileError, UnsupportedFeatureError, TranspilerInUseError
+from .symbol_table import SymbolTable, Symbol, TypeEnvironment
+from .swift_types import SwiftType, INT, DOUBLE, STRING, VOID, ANY, RANGE
 from .type_inference import TypeInferencer
-from .lexer import LexicalAnalyzer
+from .lexer import LexicalAnalyzer, WarningSink
+from . import tracing
+from .passes import AnalysisPassManager, OptimizationPassManager
+from .ir import (IRProgram, SwapStmt, RangeFor, FloorDivMod, Power, Membership, SliceView, Removed,
+                 DEFAULT_PASSES, SWIFT_HELPERS, _int_constant, _is_simple)
+from .ast_index import iter_postorder
+from .lowerings import lookup_builtin, lookup_method, lookup_import, has_receiver_lowerings, receiver_key
+from .parallel import ParallelEmission, fork_available
+from .selection import dependency_closure
+from .sourcemap import Origin, build_source_map
+
+class _ExpressionTooDeep(Exception):
+    """Interno: a expressão excedeu a profundidade do caminho recursivo"""
 
 class PyToSwiftTranspiler(ast.NodeVisitor):
-    def __init__(self):
+    """Conversor de uma AST Python para código Swift.
+    
+    Uma instância guarda o estado de uma geração (linhas, indentação, tabela
+    de símbolos, inferência, avisos) e funciona como o contexto de uma
+    chamada: pode ser reutilizada em sequência, mas não por duas chamadas
+    ao mesmo tempo (TranspilerInUseError). Não há estado mutável
+    compartilhado entre instâncias, então chamadas concorrentes com
+    instâncias distintas (ex.: transpile(), que cria uma por chamada, ou
+    TranspilerPool) são seguras em várias threads.
+    """
+    # Acima desta profundidade as expressões são convertidas sem recursão
+    MAX_RECURSIVE_EXPR_DEPTH = 100
+    
+    # Marcador de subexpressão usado pelo caminho iterativo: \x00<slot>\x01
+    _EXPR_TOKEN_RE = re.compile('\x00(\\d+)\x01')
+    
+    # tipo do nó -> handler _expr_<Tipo>, montado na criação da classe
+    _EXPR_DISPATCH: Dict[type, Callable[['PyToSwiftTranspiler', ast.AST], str]] = {}
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._build_expr_dispatch()
+    
+    @classmethod
+    def _build_expr_dispatch(cls):
+        """Indexa os métodos _expr_<Tipo> pelo tipo de nó correspondente"""
+        table = {}
+        for attr in dir(cls):
+            node_type = getattr(ast, attr[len('_expr_'):], None) if attr.startswith('_expr_') else None
+            if isinstance(node_type, type) and issubclass(node_type, ast.AST):
+                table[node_type] = getattr(cls, attr)
+        cls._EXPR_DISPATCH = table
+    
+    # Com workers > 1, a emissão paralela só é usada a partir deste número de definições
+    PARALLEL_MIN_DEFINITIONS = 64
+    
+    # Passes de otimização sobre a IR, em ordem: (nome, tipos de nó examinados, função)
+    OPTIMIZATION_PASSES = DEFAULT_PASSES
+    
+    def __init__(self, workers: int = 0, disabled_passes: Iterable[str] = (), record_origins: bool = False,
+                 warning_sink: Optional[WarningSink] = None):
+        self.workers = workers  # > 1: emite as definições de nível superior em processos paralelos
+        self.record_origins = record_origins  # preenche line_origins (necessário para source_map())
+        self.disabled_passes = frozenset(disabled_passes)
+        unknown = self.disabled_passes.difference(name for name, _, _ in self.OPTIMIZATION_PASSES)
+        if unknown:
+            raise ValueError(f"Passes desconhecidos: {', '.join(sorted(unknown))} (disponíveis: "
+                             f"{', '.join(name for name, _, _ in self.OPTIMIZATION_PASSES)})")
+        self._ir = IRProgram()
+        self.pass_timings: Dict[str, float] = {}  # nome do pass -> segundos na última geração
+        self._warning_marks: List[int] = []  # nº de avisos ao fim do front end e de cada pass
+        self._tree: Optional[ast.Module] = None
         self.lines: List[str] = []
+        self.line_origins: List[Origin] = []  # linha Swift gerada -> (linha, coluna) Python, se record_origins
+        self._origin: Origin = None           # posição do comando sendo emitido
+        self._source_text: Optional[str] = None
+        self._module_aliases: Dict[str, str] = {}  # nome local -> módulo importado
         self.indent_level: int = 0
         self.current_class: Optional[str] = None
+        self._expr_depth: int = 0
+        self._expr_tokens: Dict[int, str] = {}  # id(node) -> marcador (caminho iterativo)
         self.symbol_table = SymbolTable()
-        self.type_inferencer = TypeInferencer()
-        self.lexer = LexicalAnalyzer()
+        self.type_inferencer = TypeInferencer(self.symbol_table.types)
+        self.lexer = LexicalAnalyzer(warning_sink)  # warning_sink: recebe (mensagem, nó) de cada aviso
+        self._used = False
+        self._in_use = threading.Lock()  # ocupado da análise até o fim da emissão
+    
+    def reset(self):
+        """Limpa o estado da última geração para reutilizar a instância.
+        
+        Tabelas pré-computadas (despacho de expressões, conversões, tipos
+        internados) ficam na classe/módulo e não são afetadas.
+        """
+        self._tree = None
+        self._ir = IRProgram()
+        self.pass_timings = {}
+        self._warning_marks = []
+        self.lines = []
+        self.line_origins = []
+        self._origin = None
+        self._source_text = None
+        self._module_aliases = {}
+        self.indent_level = 0
+        self.current_class = None
+        self._expr_depth = 0
+        self._expr_tokens.clear()
+        self.symbol_table.reset()
+        self.type_inferencer.reset()
+        self.lexer.reset()
+        self.__dict__.pop('visit', None)
+        self._used = False
     
     # ===== UTILITÁRIOS =====
     def indent(self) -> str:
@@ -21,6 +121,8 @@ class PyToSwiftTranspiler(ast.NodeVisitor):
     
     def emit(self, line: str = ""):
         self.lines.append(f"{self.indent()}{line}")
+        if self.record_origins:
+            self.line_origins.append(self._origin)
     
     def warn(self, message: str, node: ast.AST = None):
         self.lexer.warn(message, node)
@@ -32,33 +134,258 @@ class PyToSwiftTranspiler(ast.NodeVisitor):
     def escape_string(self, s: str) -> str:
         return self.lexer.escape_string(s)
     
+    def visit(self, node: ast.AST):
+        """Despacha o nó (ou o nó IR que o substitui); as linhas emitidas
+        por ele apontam para sua posição"""
+        lineno = getattr(node, 'lineno', None)
+        if lineno is None:
+            return ast.NodeVisitor.visit(self, node)
+        outer = self._origin
+        self._origin = (lineno, node.col_offset)
+        lowered = self._ir.replacements.get(node)
+        try:
+            return ast.NodeVisitor.visit(self, node if lowered is None else lowered)
+        finally:
+            self._origin = outer
+    
     # ===== GERAÇÃO =====
-    def generate(self, source: str) -> str:
-        """Método principal para gerar código Swift"""
-        tree = self.lexer.analyze(source)
-        self.type_inferencer.infer(tree)
+    def generate(self, source: Union[str, ast.Module], only: Optional[Iterable[str]] = None) -> str:
+        """Método principal para gerar código Swift.
         
-        # Adiciona header
+        Aceita o código-fonte ou uma AST já construída (ex.: gerada por máquina).
+        Com only, emite apenas esses nomes de nível superior e suas dependências.
+        """
+        return "".join(self.iter_generate(source, only))
+    
+    def generate_to(self, source: Union[str, ast.Module], stream: TextIO, flush: bool = False,
+                    only: Optional[Iterable[str]] = None) -> int:
+        """Gera código Swift escrevendo em stream à medida que é produzido.
+        
+        Cada comando de nível superior é escrito assim que termina de ser
+        convertido; a memória extra fica limitada ao maior comando. stream
+        pode ser qualquer objeto com write(str) (arquivo, sys.stdout,
+        socket.makefile('w'), ...). Com flush=True, stream.flush() é chamado
+        após cada trecho. Retorna o número de caracteres escritos.
+        """
+        written = 0
+        for chunk in self.iter_generate(source, only):
+            if not chunk:
+                continue
+            stream.write(chunk)
+            written += len(chunk)
+            if flush:
+                stream.flush()
+        return written
+    
+    def iter_generate(self, source: Union[str, ast.Module], only: Optional[Iterable[str]] = None) -> Iterator[str]:
+        """Gera o código Swift em trechos, um por comando de nível superior.
+        
+        A análise (sintaxe, verificações e inferência) roda imediatamente, de
+        modo que erros são levantados aqui, antes do primeiro trecho. Se a
+        instância já foi usada, reset() é chamado antes.
+        
+        only: nomes de nível superior (funções, classes, globais) a emitir,
+        junto com o fecho de suas dependências; o restante do módulo nem
+        passa pela inferência. Nomes inexistentes levantam TranspileError.
+        
+        A instância fica ocupada até o iterador ser esgotado ou fechado.
+        """
+        if isinstance(only, str):
+            only = [only]
+        elif only is not None:
+            only = list(only)
+        if not self._in_use.acquire(blocking=False):
+            raise TranspilerInUseError(
+                "Esta instância já está gerando código em outra chamada; "
+                "use uma instância por chamada (ex.: transpile() ou TranspilerPool)")
+        try:
+            tree = self._analyze(source, only)
+        except BaseException:
+            self._in_use.release()
+            raise
+        return _EmissionChunks(self._emit_chunks(tree), self._in_use)
+    
+    def source_map(self, file: str = "output.swift", source: str = "input.py",
+                   include_source: bool = False) -> Dict[str, Any]:
+        """Source map v3 da última geração (saída Swift -> código Python).
+        
+        Chame depois de consumir toda a saída; a instância precisa ter sido
+        criada com record_origins=True. file e source são os nomes gravados
+        no mapa; include_source embute o código Python nele.
+        """
+        if not self.record_origins:
+            raise ValueError("As origens das linhas não foram registradas: "
+                             "crie o transpilador com record_origins=True")
+        return build_source_map(self.line_origins, file, source, self._source_text, include_source)
+    
+    # ===== GERAÇÃO EM ETAPAS =====
+    # Para quem monta a saída por partes (IncrementalTranspiler): análise e
+    # emissão separadas, sem o controle de uso de iter_generate().
+    
+    def analyze(self, source: Union[str, ast.Module]) -> ast.Module:
+        """Só a análise (sintaxe, front end, inferência e passes); devolve a AST"""
+        return self._analyze(source)
+    
+    @property
+    def warning_marks(self) -> List[int]:
+        """Nº de avisos ao fim do front end e de cada pass da última análise"""
+        return list(self._warning_marks)
+    
+    @property
+    def helper_requests(self) -> Dict[str, List[ast.AST]]:
+        """Funções auxiliares pedidas pelos passes -> nós que as pedem"""
+        return dict(self._ir.helpers)
+    
+    def emit_prelude(self, helpers: Iterable[str]) -> str:
+        """Cabeçalho seguido das declarações dos helpers pedidos"""
+        self._emit_header()
+        self._emit_helpers(helpers)
+        return self._take_lines()
+    
+    def emit_statements(self, statements: List[ast.stmt]) -> str:
+        """Swift de comandos de nível superior já analisados"""
+        for node in self._top_level_units(ast.Module(body=statements, type_ignores=[])):
+            self.visit(node)
+        return self._take_lines()
+    
+    def emit_warnings(self, warnings: List[str]) -> str:
+        """Bloco de comentários com os avisos, ao fim da saída"""
+        self._emit_warnings(warnings)
+        return self._take_lines()
+    
+    def _analyze(self, source: Union[str, ast.Module], only: Optional[Iterable[str]] = None) -> ast.Module:
+        if self._used:
+            self.reset()
+        self._used = True
+        if isinstance(source, str):
+            self._source_text = source
+        if tracing.enabled():
+            self.visit = self._traced_visit
+        else:
+            self.__dict__.pop('visit', None)
+        if isinstance(source, ast.AST):
+            tree = source
+        else:
+            with tracing.phase('parse'):
+                tree = self.lexer.parse(source)
+        if only is not None:
+            with tracing.phase('select'):
+                tree = ast.Module(body=dependency_closure(self._top_level_units(tree), only), type_ignores=[])
+        # Front end: verificações léxicas e coleta da inferência em uma única passada
+        optimizer = OptimizationPassManager(self.disabled_passes)
+        for name, node_types, fn in self.OPTIMIZATION_PASSES:
+            optimizer.register(name, node_types, fn)
+        with tracing.phase('front_end'):
+            front_end = AnalysisPassManager()
+            self.lexer.register_passes(front_end)
+            self.type_inferencer.register_passes(front_end)
+            optimizer.register_collectors(front_end)
+            front_end.run(tree)
+        self._warning_marks = [len(self.warnings)]
+        with tracing.phase('solve'):
+            self.type_inferencer.solve(tree)
+        # Otimizações: comandos viram nós IR tipados (self._ir) antes da emissão
+        with tracing.phase('optimize'):
+            optimizer.run(self._ir, self, lambda name: self._warning_marks.append(len(self.warnings)))
+        self.pass_timings = optimizer.timings
+        for node in self._top_level_units(tree):
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    if alias.asname:
+                        self._module_aliases[alias.asname] = alias.name
+                    else:
+                        top = alias.name.split('.')[0]
+                        self._module_aliases[top] = top
+        self._tree = tree
+        return tree
+    
+    def _top_level_units(self, tree: ast.Module) -> List[ast.stmt]:
+        """Comandos emitidos no nível superior (o corpo do main guard é achatado)"""
+        units = []
+        for node in tree.body:
+            if self._is_main_guard(node):
+                units.extend(node.body)
+            else:
+                units.append(node)
+        return units
+    
+    def _start_parallel_emission(self, units: List[ast.stmt]) -> Optional['ParallelEmission']:
+        """Inicia a emissão paralela das definições, se habilitada e se compensar"""
+        if self.workers <= 1:
+            return None
+        definitions = sum(1 for node in units if isinstance(node, (ast.FunctionDef, ast.ClassDef)))
+        if definitions < self.PARALLEL_MIN_DEFINITIONS:
+            return None
+        if not fork_available():
+            # sem fork cada worker refaria a análise inteira: a emissão serial é mais rápida
+            return None
+        return ParallelEmission(self, units, self.workers)
+    
+    def _emit_chunks(self, tree: ast.Module) -> Iterator[str]:
+        with tracing.phase('emit'):
+            yield self.emit_prelude(self._ir.helpers)
+            
+            units = self._top_level_units(tree)
+            parallel = self._start_parallel_emission(units)
+            try:
+                for i, node in enumerate(units):
+                    if parallel is not None and i in parallel:
+                        text, warnings, origins = parallel.result(i)
+                        self.warnings.extend(warnings)
+                        self.line_origins.extend(origins)
+                        yield text
+                    else:
+                        self.visit(node)
+                        yield self._take_lines()
+            finally:
+                if parallel is not None:
+                    parallel.close()
+            
+            if self.warnings:
+                yield self.emit_warnings(self.warnings)
+    
+    def _emit_header(self):
         self.emit("import Foundation")
         self.emit("")
         self.emit("// Transpilado de Python para Swift")
         self.emit("// Gerado automaticamente - pode necessitar ajustes manuais")
         self.emit("")
-        
-        for node in tree.body:
-            if self._is_main_guard(node):
-                for stmt in node.body:
-                    self.visit(stmt)
-            else:
-                self.visit(node)
-        
-        if self.warnings:
-            self.emit("")
-            self.emit("// ⚠️  AVISOS DE TRANSPILAÇÃO:")
-            for w in self.warnings:
-                self.emit(f"// {w}")
-        
-        return "\n".join(self.lines) + "\n"
+    
+    def _emit_helpers(self, helpers: Iterable[str]):
+        """Declara as funções auxiliares pedidas pelos passes, na ordem de SWIFT_HELPERS"""
+        needed = set(helpers)
+        for name, lines in SWIFT_HELPERS.items():
+            if name in needed:
+                for line in lines:
+                    self.emit(line)
+                self.emit("")
+    
+    def _emit_warnings(self, warnings: List[str]):
+        self.emit("")
+        self.emit("// ⚠️  AVISOS DE TRANSPILAÇÃO:")
+        for w in warnings:
+            self.emit(f"// {w}")
+    
+    def _traced_visit(self, node: ast.AST):
+        """visit() cronometrado; instalado só quando há assinantes de tracing"""
+        start = time.perf_counter()
+        try:
+            return PyToSwiftTranspiler.visit(self, node)
+        finally:
+            tracing.emit(tracing.VISIT, node.__class__.__name__, start, time.perf_counter() - start,
+                         line=getattr(node, 'lineno', None))
+    
+    def _take_lines(self) -> str:
+        """Esvazia as linhas emitidas até agora e as devolve como um trecho"""
+        if not self.lines:
+            return ""
+        chunk = "\n".join(self.lines) + "\n"
+        self.lines.clear()
+        return chunk
+    
+    def _infer_type(self, node: ast.AST) -> SwiftType:
+        """Tipo inferido de uma expressão no escopo atual"""
+        return self.type_inferencer.expr_type(node, self.symbol_table.current_scope) or ANY
     
     def _is_main_guard(self, node: ast.AST) -> bool:
         """Verifica se é if __name__ == "__main__":"""
@@ -75,10 +402,9 @@ class PyToSwiftTranspiler(ast.NodeVisitor):
     def visit_Import(self, node: ast.Import):
         for alias in node.names:
             name = alias.name
-            if name in ('math', 'random', 'datetime', 'json'):
-                self.emit("import Foundation")
-            elif name == 're':
-                self.emit("import Foundation  // Use NSRegularExpression")
+            lowering = lookup_import(name)
+            if lowering is not None:
+                self.emit(lowering(self, node, alias))
             else:
                 self.emit(f"// import {name}  // ⚠️ Mapeamento manual necessário")
     
@@ -101,14 +427,17 @@ class PyToSwiftTranspiler(ast.NodeVisitor):
         self.indent_level += 1
         prev_class = self.current_class
         self.current_class = node.name
-        self.symbol_table.push_scope(f"class:{node.name}")
+        self.symbol_table.push_scope(
+            TypeEnvironment.child_scope(self.symbol_table.current_scope, 'class', node.name))
 
         # MELHORIA: Traduz atributos de classe
         for stmt in node.body:
             if isinstance(stmt, ast.Assign):
+                self._origin = (stmt.lineno, stmt.col_offset)
                 for target in stmt.targets:
                     if isinstance(target, ast.Name):
                         self.emit(f"static var {target.id}: {self._infer_type(stmt.value)} = {self._expr_str(stmt.value)}")
+                self._origin = (node.lineno, node.col_offset)
             elif isinstance(stmt, ast.FunctionDef):
                 self.visit(stmt)
 
@@ -119,51 +448,36 @@ class PyToSwiftTranspiler(ast.NodeVisitor):
         self.emit("")
 
     def visit_FunctionDef(self, node: ast.FunctionDef):
-        self.symbol_table.push_scope(f"func:{node.name}")
+        scope = TypeEnvironment.child_scope(self.symbol_table.current_scope, 'func', node.name)
+        self.symbol_table.push_scope(scope)
+        sig = self.type_inferencer.func_signatures.get(TypeEnvironment.qualified_name(scope), {})
 
         args = []
         for arg in node.args.args:
             if arg.arg == 'self':
                 continue
-            sig = self.type_inferencer.func_signatures.get(node.name, {})
 
-            arg_type = sig.get(arg.arg, 'Any')
+            arg_type = sig.get(arg.arg, ANY)
 
-            if arg_type == 'Any':
+            if arg_type is ANY:
                 if arg.arg in ('n', 'num', 'number', 'count', 'index', 'i', 'j', 'k'):
-                    arg_type = 'Int'
+                    arg_type = INT
                 elif arg.arg in ('x', 'y', 'value', 'val', 'amount'):
-                    arg_type = 'Double'
+                    arg_type = DOUBLE
+                if arg_type is not ANY and tracing.enabled():
+                    tracing.emit(tracing.TYPE_DECISION, arg.arg, scope=self.symbol_table.current_scope,
+                                 type=str(arg_type), source='name_heuristic')
 
             args.append(f"_{arg.arg}: {arg_type}")
 
         arglist = ', '.join(args)
 
-        sig = self.type_inferencer.func_signatures.get(node.name, {})
-        return_type = sig.get('return', 'Void')
-
-        # CORREÇÃO SIMPLIFICADA: Para funções com nome sugestivo de inteiros, força Int
-        if return_type == 'Double' and self._looks_like_int_function(node):
-            return_type = 'Int'
+        return_type = sig.get('return', VOID)
+        if tracing.enabled():
+            tracing.emit(tracing.TYPE_DECISION, node.name, scope=self.symbol_table.current_scope,
+                         type=f"({arglist}) -> {return_type}", source='emit')
 
-        # CORREÇÃO: Se a função opera apenas com inteiros, força Int
-        # Adiciona logs para depuração
-        import logging
-        logging.debug(f"Analisando tipo de retorno para a função '{node.name}'. Tipo inferido: {return_type}")
-
-        if return_type == 'Double' and self._looks_like_int_function(node):
-            logging.debug(f"Função '{node.name}' parece operar com inteiros. Alterando tipo de retorno para 'Int'.")
-            return_type = 'Int'
-
-        if return_type in ['Any', 'Double']:
-            try:
-                if self._function_uses_only_ints(node):
-                    logging.debug(f"Função '{node.name}' usa apenas inteiros. Alterando tipo de retorno para 'Int'.")
-                    return_type = 'Int'
-            except Exception as e:
-                logging.exception(f"Erro ao verificar se a função '{node.name}' usa apenas inteiros: {e}")
-
-        ret_annotation = f" -> {return_type}" if return_type != 'Void' else ""
+        ret_annotation = f" -> {return_type}" if return_type is not VOID else ""
 
         # MELHORIA: Suporte para métodos de classe
         if any(isinstance(decorator, ast.Name) and decorator.id == 'classmethod' for decorator in node.decorator_list):
@@ -225,11 +539,6 @@ class PyToSwiftTranspiler(ast.NodeVisitor):
             self.warn("Desempacotamento de tupla com valor não-tupla pode não funcionar")
             return
         
-        if len(target.elts) == 2 and len(value.elts) == 2:
-            swap_detected = self._try_emit_swap(target.elts, value.elts)
-            if swap_detected:
-                return
-        
         for left, right in zip(target.elts, value.elts):
             left_str = self._expr_str(left)
             right_str = self._expr_str(right)
@@ -239,43 +548,15 @@ class PyToSwiftTranspiler(ast.NodeVisitor):
             else:
                 self.emit(f"{left_str} = {right_str}")
     
-    def _try_emit_swap(self, left_elts: List[ast.AST], right_elts: List[ast.AST]) -> bool:
-        """Tenta detectar e emitir padrão de swap"""
-        try:
-            L0, L1 = left_elts
-            R0, R1 = right_elts
-            
-            if not all(isinstance(x, ast.Subscript) for x in [L0, L1, R0, R1]):
-                return False
-            
-            if not (isinstance(L0.value, ast.Name) and isinstance(L1.value, ast.Name)):
-                return False
-            
-            if L0.value.id != L1.value.id:
-                return False
-            
-            i0 = self._expr_str(L0.slice)
-            i1 = self._expr_str(L1.slice)
-            r0 = self._expr_str(R0.slice)
-            r1 = self._expr_str(R1.slice)
-            
-            if i0 == r1 and i1 == r0:
-                self.emit(f"{L0.value.id}.swapAt({i0}, {i1})")
-                return True
-        except:
-            pass
-        
-        return False
-    
     def _emit_assignment(self, name: str, value: str, node: Optional[ast.Assign]):
         """Emite atribuição com declaração apropriada"""
         if not self.symbol_table.is_declared_in_current_scope(name):
-            inferred_type = self.type_inferencer.var_types.get(name, 'Any')
+            inferred_type = self.symbol_table.types.get(self.symbol_table.current_scope, name) or ANY
             
             is_constant = (node and isinstance(node.value, ast.Constant))
             decl = 'let' if is_constant else 'var'
             
-            if inferred_type != 'Any':
+            if inferred_type is not ANY:
                 self.emit(f"{decl} {name}: {inferred_type} = {value}")
             else:
                 self.emit(f"{decl} {name} = {value}")
@@ -287,8 +568,11 @@ class PyToSwiftTranspiler(ast.NodeVisitor):
     def visit_AugAssign(self, node: ast.AugAssign):
         """Atribuição composta (+=, -=, etc)"""
         target = self._expr_str(node.target)
-        op = self._augop_symbol(node.op)
         value = self._expr_str(node.value)
+        if isinstance(node.op, ast.FloorDiv):
+            self.emit(f"{target} = Int(Double({target}) / Double({value}))")
+            return
+        op = self._augop_symbol(node.op)
         self.emit(f"{target} {op}= {value}")
     
     # ===== VISITANTES - CONTROLE DE FLUXO =====
@@ -342,10 +626,6 @@ class PyToSwiftTranspiler(ast.NodeVisitor):
         """Transpila loops for"""
         target = self._expr_str(node.target)
         
-        if self._is_range_call(node.iter):
-            self._emit_range_for(target, node.iter, node.body)
-            return
-        
         if isinstance(node.iter, ast.List):
             elements = ', '.join(self._expr_str(e) for e in node.iter.elts)
             self.emit(f"for {target} in [{elements}] {{")
@@ -361,37 +641,6 @@ class PyToSwiftTranspiler(ast.NodeVisitor):
         if node.orelse:
             self.warn("for-else não tem equivalente direto em Swift", node)
     
-    def _is_range_call(self, node: ast.AST) -> bool:
-        """Verifica se é uma chamada range()"""
-        return (isinstance(node, ast.Call) and
-                isinstance(node.func, ast.Name) and
-                node.func.id == 'range')
-    
-    def _emit_range_for(self, target: str, range_call: ast.Call, body: List[ast.stmt]):
-        """Emite for com range otimizado"""
-        args = range_call.args
-        
-        if len(args) == 1:
-            stop = self._expr_str(args[0])
-            self.emit(f"for {target} in 0..<{stop} {{")
-        elif len(args) == 2:
-            start = self._expr_str(args[0])
-            stop = self._expr_str(args[1])
-            self.emit(f"for {target} in {start}..<{stop} {{")
-        elif len(args) == 3:
-            start = self._expr_str(args[0])
-            stop = self._expr_str(args[1])
-            step = self._expr_str(args[2])
-            self.emit(f"for {target} in stride(from: {start}, to: {stop}, by: {step}) {{")
-        else:
-            self.emit(f"for {target} in {self._expr_str(range_call)} {{")
-        
-        self.indent_level += 1
-        for stmt in body:
-            self.visit(stmt)
-        self.indent_level -= 1
-        self.emit("}")
-    
     def visit_While(self, node: ast.While):
         """Transpila loops while"""
         cond = self._expr_str(node.test)
@@ -421,6 +670,41 @@ class PyToSwiftTranspiler(ast.NodeVisitor):
     def visit_Pass(self, node: ast.Pass):
         self.emit("// pass")
     
+    # ===== VISITANTES - IR =====
+    
+    def visit_SwapStmt(self, node: SwapStmt):
+        self.emit(f"{node.collection}.swapAt({self._expr_str(node.first)}, {self._expr_str(node.second)})")
+    
+    def visit_RangeFor(self, node: RangeFor):
+        """for sobre intervalo (a..<b) ou stride, sem chamar range()"""
+        target = self._expr_str(node.target)
+        start = "0" if node.start is None else self._expr_str(node.start)
+        stop = self._expr_str(node.stop)
+        if node.step is None:
+            self.emit(f"for {target} in {start}..<{stop} {{")
+        else:
+            self.emit(f"for {target} in stride(from: {start}, to: {stop}, by: {self._expr_str(node.step)}) {{")
+        
+        self.indent_level += 1
+        for stmt in node.body:
+            self.visit(stmt)
+        self.indent_level -= 1
+        self.emit("}")
+        
+        if node.origin.orelse:
+            self.warn("for-else não tem equivalente direto em Swift", node.origin)
+    
+    def visit_FloorDivMod(self, node: FloorDivMod):
+        """a //= b / a %= b"""
+        self.emit(f"{self._expr_str(node.left)} = {self._floor_div_mod_str(node)}")
+    
+    def visit_Power(self, node: Power):
+        """a **= b"""
+        self.emit(f"{self._expr_str(node.base)} = {self._power_str(node)}")
+    
+    def visit_Removed(self, node: Removed):
+        pass
+    
     # ===== VISITANTES - EXPRESSÕES E TRY/EXCEPT =====
     
     def visit_Expr(self, node: ast.Expr):
@@ -516,13 +800,103 @@ class PyToSwiftTranspiler(ast.NodeVisitor):
         if node is None:
             return 'nil'
         
-        method = getattr(self, f"_expr_{node.__class__.__name__}", None)
+        token = self._expr_tokens.get(id(node))
+        if token is not None:
+            return token
+        
+        if self._expr_depth:
+            return self._expr_str_nested(node)
+        
+        # Expressão raiz: tenta o caminho recursivo e recorre ao iterativo se for profunda demais
+        warning_count = len(self.warnings)
+        try:
+            return self._expr_str_nested(node)
+        except _ExpressionTooDeep:
+            del self.warnings[warning_count:]
+            return self._expr_str_iterative(node)
+    
+    def _expr_str_nested(self, node: ast.AST) -> str:
+        if self._expr_depth >= self.MAX_RECURSIVE_EXPR_DEPTH:
+            raise _ExpressionTooDeep()
+        self._expr_depth += 1
+        try:
+            return self._dispatch_expr(node)
+        finally:
+            self._expr_depth -= 1
+    
+    def _dispatch_expr(self, node: ast.AST) -> str:
+        method = self._EXPR_DISPATCH.get(type(node))
         if method:
-            return method(node)
+            return method(self, node)
         
         self.warn(f"Expressão não suportada: {node.__class__.__name__}", node)
         return '/* expressão não suportada */'
     
+    def _expr_str_iterative(self, root: ast.AST) -> str:
+        """Converte expressões muito profundas sem recursão.
+        
+        Os filhos são convertidos antes dos pais (pós-ordem) e cada handler
+        recebe marcadores curtos no lugar das strings dos filhos. O texto
+        final é montado uma única vez, em tempo linear no tamanho da saída.
+        """
+        saved_tokens, self._expr_tokens = self._expr_tokens, {}
+        templates: List[List[str]] = []
+        try:
+            for node in iter_postorder(root, self._expr_children):
+                if id(node) in self._expr_tokens:
+                    continue
+                template = self._dispatch_expr(node)
+                self._expr_tokens[id(node)] = f"\x00{len(templates)}\x01"
+                templates.append(self._EXPR_TOKEN_RE.split(template))
+        finally:
+            self._expr_tokens = saved_tokens
+        
+        out: List[str] = []
+        stack = [(templates[-1], 0)]
+        while stack:
+            parts, i = stack.pop()
+            while i < len(parts):
+                if i % 2 == 0:
+                    out.append(parts[i])
+                    i += 1
+                else:
+                    stack.append((parts, i + 1))
+                    parts, i = templates[int(parts[i])], 0
+        return ''.join(out)
+    
+    @staticmethod
+    def _expr_children(node: ast.AST) -> List[ast.AST]:
+        """Filhos que o handler de node sempre converte (caminho iterativo)"""
+        if isinstance(node, ast.BinOp):
+            return [node.left, node.right]
+        if isinstance(node, ast.UnaryOp):
+            return [node.operand]
+        if isinstance(node, ast.BoolOp):
+            return node.values
+        if isinstance(node, ast.Compare):
+            return [node.left] + node.comparators
+        if isinstance(node, ast.IfExp):
+            return [node.test, node.body, node.orelse]
+        if isinstance(node, ast.Call):
+            if isinstance(node.func, ast.Name):
+                return node.args
+            if isinstance(node.func, ast.Attribute):
+                return [node.func.value] + node.args
+            return [node.func] + node.args
+        if isinstance(node, ast.Attribute):
+            return [node.value]
+        if isinstance(node, ast.Subscript):
+            if isinstance(node.slice, ast.Slice):
+                return [node.value]
+            return [node.value, node.slice]
+        if isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+            return node.elts
+        if isinstance(node, ast.Dict):
+            return [k for k in node.keys if k is not None] + node.values
+        if isinstance(node, ast.JoinedStr):
+            return [v.value for v in node.values if isinstance(v, ast.FormattedValue)]
+        return []
+    
     def _expr_Name(self, node: ast.Name) -> str:
         if node.id == 'True':
             return 'true'
@@ -566,6 +940,11 @@ class PyToSwiftTranspiler(ast.NodeVisitor):
     
     def _expr_BinOp(self, node: ast.BinOp) -> str:
         """Operações binárias"""
+        lowered = self._ir.replacements.get(node)
+        if isinstance(lowered, FloorDivMod):
+            return self._floor_div_mod_str(lowered)
+        if isinstance(lowered, Power):
+            return self._power_str(lowered)
         left = self._expr_str(node.left)
         right = self._expr_str(node.right)
         op = self._binop_symbol(node.op)
@@ -580,6 +959,38 @@ class PyToSwiftTranspiler(ast.NodeVisitor):
         
         return f"({left} {op} {right})"
     
+    def _floor_div_mod_str(self, node: FloorDivMod) -> str:
+        left = self._expr_str(node.left)
+        right = self._expr_str(node.right)
+        if node.type is INT:
+            helper = 'pyFloorDiv' if isinstance(node.op, ast.FloorDiv) else 'pyMod'
+            return f"{helper}({left}, {right})"
+        # Double: operandos Int são convertidos (literais já são aceitos como Double)
+        left, right = (self._as_double(operand, text) for operand, text in ((node.left, left), (node.right, right)))
+        if isinstance(node.op, ast.FloorDiv):
+            return f"({left} / {right}).rounded(.down)"
+        return f"pyMod({left}, {right})"
+    
+    def _power_str(self, node: Power) -> str:
+        if node.value is not None:
+            return str(node.value) if node.value >= 0 else f"({node.value})"
+        base = self._expr_str(node.base)
+        if node.repeat is not None:
+            if node.repeat == 0:
+                return "1.0" if node.type is DOUBLE else "1"
+            return base if node.repeat == 1 else "(" + " * ".join([base] * node.repeat) + ")"
+        exponent = self._expr_str(node.exponent)
+        if node.type is INT:
+            return f"pyIntPow({base}, {exponent})"
+        return f"pow({self._as_double(node.base, base)}, {self._as_double(node.exponent, exponent)})"
+    
+    def _as_double(self, node: ast.AST, text: str) -> str:
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+            node = node.operand
+        if self._infer_type(node) is DOUBLE or isinstance(node, ast.Constant):
+            return text
+        return f"Double({text})"
+    
     def _expr_UnaryOp(self, node: ast.UnaryOp) -> str:
         operand = self._expr_str(node.operand)
         
@@ -599,25 +1010,63 @@ class PyToSwiftTranspiler(ast.NodeVisitor):
     
     def _expr_Compare(self, node: ast.Compare) -> str:
         parts = []
+        lowered = self._ir.replacements.get(node)
+        kinds = lowered.kinds if isinstance(lowered, Membership) else [None] * len(node.ops)
+        item = node.left
         left = self._expr_str(node.left)
         
-        for op, comparator in zip(node.ops, node.comparators):
-            right = self._expr_str(comparator)
-            symbol = self._cmpop_symbol(op)
+        for i, (op, comparator) in enumerate(zip(node.ops, node.comparators)):
+            kind = kinds[i]
+            # range(...) e listas constantes não são construídos quando o teste foi convertido
+            right = self._expr_str(comparator) if kind not in ('range', 'equals', 'switch') \
+                or i + 1 < len(node.ops) else None
             
             # Tratamento de 'in'/'not in'
             if type(op) in (ast.In, ast.NotIn):
-                 if symbol == 'in':
-                     parts.append(f"{right}.contains({left})")
-                 else:
-                     parts.append(f"!({right}.contains({left}))")
+                negate = isinstance(op, ast.NotIn)
+                if kind is None:
+                    test = f"{right}.contains({left})"
+                    parts.append(f"!({test})" if negate else test)
+                else:
+                    parts.append(self._membership_str(kind, lowered.types[i], item, left, comparator, right, negate))
             else:
-                parts.append(f"{left} {symbol} {right}")
+                parts.append(f"{left} {self._cmpop_symbol(op)} {right}")
             
-            left = right
+            item, left = comparator, right
         
         return ' && '.join(parts) if len(parts) > 1 else parts[0]
     
+    def _membership_str(self, kind: str, element_type, item: ast.expr, left: str,
+                        container: ast.expr, right: Optional[str], negate: bool) -> str:
+        """Teste de pertinência já escolhido pelo pass 'membership' (ver ir.Membership)"""
+        if kind == 'dict':
+            return f"{right}[{left}] {'==' if negate else '!='} nil"
+        if kind == 'contains':
+            return f"!({right}.contains({left}))" if negate else f"{right}.contains({left})"
+        if kind == 'equals':
+            if not container.elts:
+                return 'true' if negate else 'false'
+            joiner, symbol = (' && ', '!=') if negate else (' || ', '==')
+            return '(' + joiner.join(f"{left} {symbol} {self._expr_str(e)}" for e in container.elts) + ')'
+        if kind == 'switch':
+            cases = ', '.join(self._expr_str(e) for e in container.elts)
+            test = (f"{{ (v: {element_type}) -> Bool in switch v {{ case {cases}: return true; "
+                    f"default: return false }} }}({left})")
+            return f"!{test}" if negate else test
+        # 'range': limites (e passo constante) comparados direto, sem criar o intervalo
+        args = [self._expr_str(a) for a in container.args]
+        start, stop, step = ('0', args[0], None) if len(args) == 1 else (args + [None])[:3]
+        step_value = _int_constant(container.args[2]) if step is not None else 1
+        if step_value > 0:
+            checks = [f"{start} <= {left}", f"{left} < {stop}"]
+            if step_value != 1:
+                checks.append(f"({left} - {start}) % {step_value} == 0")
+        else:
+            checks = [f"{stop} < {left}", f"{left} <= {start}"]
+            checks.append(f"({start} - {left}) % {-step_value} == 0")
+        test = '(' + ' && '.join(checks) + ')'
+        return f"!{test}" if negate else test
+    
     def _expr_Call(self, node: ast.Call) -> str:
         if isinstance(node.func, ast.Name):
             return self._handle_builtin_call(node)
@@ -632,162 +1081,104 @@ class PyToSwiftTranspiler(ast.NodeVisitor):
     def _handle_builtin_call(self, node: ast.Call) -> str:
         fname = node.func.id
         args = [self._expr_str(a) for a in node.args]
-        
-        if fname == 'print':
-            return f"print({', '.join(args)})"
-        
-        if fname == 'len' and len(args) == 1:
-            return f"{args[0]}.count"
-        
-        if fname == 'sum' and len(args) == 1:
-            list_type = self.type_inferencer._infer_expr_type(node.args[0])
-            initial_value = '0.0' if list_type and 'Double' in list_type else '0'
-            return f"{args[0]}.reduce({initial_value}, +)"
-        
-        if fname == 'min' and len(args) >= 1:
-            if len(args) == 1:
-                return f"{args[0]}.min() ?? 0"
-            return f"min({', '.join(args)})"
-        
-        if fname == 'max' and len(args) >= 1:
-            if len(args) == 1:
-                return f"{args[0]}.max() ?? 0"
-            return f"max({', '.join(args)})"
-        
-        if fname == 'abs' and len(args) == 1:
-            return f"abs({args[0]})"
-        
-        if fname == 'sorted' and len(args) == 1:
-            return f"{args[0]}.sorted()"
-        
-        if fname == 'reversed' and len(args) == 1:
-            return f"Array({args[0]}.reversed())"
-        
-        if fname == 'range':
-            if len(args) == 1:
-                return f"0..<{args[0]}"
-            elif len(args) == 2:
-                return f"{args[0]}..<{args[1]}"
-        
-        if fname == 'str' and len(args) == 1:
-            return f"String({args[0]})"
-        
-        if fname == 'int' and len(args) == 1:
-            return f"Int({args[0]}) ?? 0" 
-        
-        if fname == 'float' and len(args) == 1:
-            return f"Double({args[0]}) ?? 0.0"
-        
-        if fname == 'list':
-            if len(args) == 0:
-                return "[]"
-            return f"Array({args[0]})"
-        
-        if fname == 'dict':
-            return "[:]"
-        
-        if fname == 'enumerate' and len(args) == 1:
-            return f"{args[0]}.enumerated()"
-        
-        if fname == 'zip' and len(args) >= 2:
-            return f"zip({', '.join(args)})"
-        
-        if fname == 'map' and len(args) == 2:
-            return f"{args[1]}.map({args[0]})"
-        
-        if fname == 'filter' and len(args) == 2:
-            return f"{args[1]}.filter({args[0]})"
-        
-        if fname == 'any' and len(args) == 1:
-            return f"{args[0]}.contains(where: {{ $0 }})"
-        
-        if fname == 'all' and len(args) == 1:
-            return f"{args[0]}.allSatisfy({{ $0 }})"
-
+        lowering = lookup_builtin(fname, len(args))
+        if lowering is not None:
+            return lowering(self, node, args)
         return f"{fname}({', '.join(args)})"
     
     def _handle_method_call(self, node: ast.Call) -> str:
         obj = self._expr_str(node.func.value)
         method = node.func.attr
         args = [self._expr_str(a) for a in node.args]
-        
-        # String methods
-        if method == 'lower':
-            return f"{obj}.lowercased()"
-        if method == 'upper':
-            return f"{obj}.uppercased()"
-        if method == 'strip':
-            return f"{obj}.trimmingCharacters(in: .whitespacesAndNewlines)"
-        if method == 'replace' and len(args) == 2:
-            return f"{obj}.replacingOccurrences(of: {args[0]}, with: {args[1]})"
-        if method == 'split':
-            if len(args) == 0:
-                return f"{obj}.split(separator: \" \").map(String.init)"
-            return f"{obj}.split(separator: {args[0]}).map(String.init)"
-        if method == 'join' and len(args) == 1:
-            return f"{args[0]}.joined(separator: {obj})"
-        if method == 'startswith' and len(args) == 1:
-            return f"{obj}.hasPrefix({args[0]})"
-        if method == 'endswith' and len(args) == 1:
-            return f"{obj}.hasSuffix({args[0]})"
-        
-        # List methods
-        if method == 'append' and len(args) == 1:
-            return f"{obj}.append({args[0]})"
-        if method == 'extend' and len(args) == 1:
-            return f"{obj}.append(contentsOf: {args[0]})"
-        if method == 'insert' and len(args) == 2:
-            return f"{obj}.insert({args[1]}, at: {args[0]})"
-        if method == 'remove' and len(args) == 1:
-            return f"{obj}.removeAll(where: {{ $0 == {args[0]} }})" 
-        if method == 'pop':
-            if len(args) == 0:
-                return f"{obj}.removeLast()"
-            return f"{obj}.remove(at: {args[0]})"
-        
-        # Dict methods
-        if method == 'get' and len(args) >= 1:
-            default = args[1] if len(args) > 1 else 'nil'
-            return f"({obj}[{args[0]}] ?? {default})"
-        if method == 'keys':
-            return f"Array({obj}.keys)"
-        if method == 'values':
-            return f"Array({obj}.values)"
-        if method == 'items':
-            return f"Array({obj})"
-        
+        lowering = lookup_method(method, len(args), self._receiver_key(node.func.value, method))
+        if lowering is not None:
+            return lowering(self, node, obj, args)
         return f"{obj}.{method}({', '.join(args)})"
     
+    def _receiver_key(self, receiver: ast.AST, method: str) -> Optional[str]:
+        """Chave do receptor para o registro de conversões (ver lowerings)"""
+        if isinstance(receiver, ast.Name) and receiver.id in self._module_aliases \
+                and self.symbol_table.lookup_type(receiver.id) is None:
+            return f"module:{self._module_aliases[receiver.id]}"
+        if has_receiver_lowerings(method):
+            return receiver_key(self._infer_type(receiver))
+        return None
+    
     def _expr_List(self, node: ast.List) -> str:
         elements = ', '.join(self._expr_str(e) for e in node.elts)
         return f"[{elements}]"
     
     def _expr_ListComp(self, node: ast.ListComp) -> str:
-        if not node.generators:
-            return "[]"
-        
-        gen = node.generators[0]
+        """Compreensão de lista em uma única passada, sem arrays intermediários.
         
-        if len(node.generators) > 1:
-            self.warn("Compreensão de lista com múltiplos for não suportada", node)
+        Um gerador sem filtro vira map (capacidade exata). Com filtros ou
+        vários geradores, se o tipo dos elementos é conhecido, vira um laço
+        numa closure invocada na hora (reserveCapacity quando há um só
+        gerador); senão, uma cadeia lazy materializada uma vez com Array().
+        """
+        if not node.generators:
             return "[]"
         
-        iter_expr = self._expr_str(gen.iter)
-        target = self._expr_str(gen.target)
+        targets = [self._expr_str(gen.target) for gen in node.generators]
+        iters = [self._expr_str(gen.iter) for gen in node.generators]
+        conds = [[self._expr_str(c) for c in gen.ifs] for gen in node.generators]
         elt_expr = self._expr_str(node.elt)
-        
-        if target in elt_expr:
-            elt_expr = elt_expr.replace(target, "$0")
-        
-        if gen.ifs:
-            cond = self._expr_str(gen.ifs[0])
-            if target in cond:
-                cond = cond.replace(target, "$0")
-            return f"{iter_expr}.filter{{ {cond} }}.map{{ {elt_expr} }}"
-        
-        if elt_expr == target or elt_expr == "$0":
-            return iter_expr  
-        return f"{iter_expr}.map{{ {elt_expr} }}"
+        is_target = elt_expr == targets[-1]  # [x for x in ...]: sem map
+        
+        if len(node.generators) == 1 and not conds[0]:
+            if is_target:
+                return f"Array({iters[0]})"
+            return f"{self._postfix_operand(iters[0])}.map {{ {targets[0]} in {elt_expr} }}"
+        
+        element_type = self._comprehension_element_type(node)
+        if element_type is not None:
+            setup = f"var __result: [{element_type}] = []; "
+            if len(node.generators) == 1:
+                # Um único gerador: os filtros só descartam, então o tamanho da fonte é o teto
+                if not isinstance(node.generators[0].iter, ast.Name):
+                    setup += f"let __source = {iters[0]}; "
+                    iters[0] = "__source"
+                setup += f"__result.reserveCapacity({iters[0]}.underestimatedCount); "
+            loop = f"__result.append({elt_expr})"
+            for target, iter_expr, gen_conds in reversed(list(zip(targets, iters, conds))):
+                where = f" where {' && '.join(gen_conds)}" if gen_conds else ""
+                loop = f"for {target} in {iter_expr}{where} {{ {loop} }}"
+            return f"{{ () -> [{element_type}] in {setup}{loop}; return __result }}()"
+        
+        if len(node.generators) == 1 and is_target:
+            return f"{self._postfix_operand(iters[0])}.filter {{ {targets[0]} in {' && '.join(conds[0])} }}"
+        
+        # Cadeia lazy montada de dentro para fora: filtros e map do último gerador, flatMap dos anteriores
+        chain = None if is_target else f"map {{ {targets[-1]} in {elt_expr} }}"
+        for i in reversed(range(len(node.generators))):
+            if i < len(node.generators) - 1:
+                inner = self._postfix_operand(iters[i + 1])
+                chain = f"flatMap {{ {targets[i]} in {inner}.lazy.{chain} }}" if chain \
+                    else f"flatMap {{ {targets[i]} in {inner} }}"
+            if conds[i]:
+                where = f"filter {{ {targets[i]} in {' && '.join(conds[i])} }}"
+                chain = f"{where}.{chain}" if chain else where
+        return f"Array({self._postfix_operand(iters[0])}.lazy.{chain})"
+    
+    def _comprehension_element_type(self, node: ast.ListComp) -> Optional[SwiftType]:
+        """Tipo dos elementos de uma compreensão quando ele não depende das variáveis dela, ou None"""
+        bound = {n.id for gen in node.generators for n in ast.walk(gen.target) if isinstance(n, ast.Name)}
+        if isinstance(node.elt, ast.Name) and node.elt.id in bound:
+            if len(node.generators) != 1 or not isinstance(node.generators[0].target, ast.Name):
+                return None
+            iter_type = self._infer_type(node.generators[0].iter)
+            element_type = INT if iter_type is RANGE else iter_type.element
+        elif isinstance(node.elt, ast.Call) or not any(
+                isinstance(n, ast.Name) and n.id in bound for n in ast.walk(node.elt)):
+            element_type = self._infer_type(node.elt)  # chamadas têm o tipo de retorno, qualquer que seja o argumento
+        else:
+            return None
+        return None if element_type is None or element_type in (ANY, VOID) else element_type
+    
+    @staticmethod
+    def _postfix_operand(text: str) -> str:
+        """Protege expressões com operadores (ex.: 0..<n) usadas como operando ou antes de um acesso a membro"""
+        return f"({text})" if ' ' in text or '..<' in text else text
     
     def _expr_Dict(self, node: ast.Dict) -> str:
         if not node.keys:
@@ -805,39 +1196,69 @@ class PyToSwiftTranspiler(ast.NodeVisitor):
         value = self._expr_str(node.value)
         
         if isinstance(node.slice, ast.Slice):
-            return self._handle_slice(value, node.slice)
+            lowered = self._ir.replacements.get(node)
+            if not isinstance(lowered, SliceView):
+                # Tipo desconhecido: só a inversão é copiada
+                view = self._handle_slice(value, node.slice, value_node=node.value)
+                return f"Array({view})" if view.endswith('.reversed()') else view
+            view = self._handle_slice(value, node.slice, lowered.type is STRING, node.value)
+            if not lowered.materialize or view == value or view.startswith('/*'):
+                return view
+            return f"{'String' if lowered.type is STRING else 'Array'}({view})"
         
         index = self._expr_str(node.slice)
         return f"{value}[{index}]"
     
-    def _handle_slice(self, value: str, slice_node: ast.Slice) -> str:
+    def _handle_slice(self, value: str, slice_node: ast.Slice, is_string: bool = False,
+                      value_node: Optional[ast.expr] = None) -> str:
+        """Vista da fatia (ArraySlice/Substring); quem a guarda materializa (ver ir.SliceView)"""
         if slice_node.step:
-            if isinstance(slice_node.step, ast.Constant) and slice_node.step.value == -1:
+            if _int_constant(slice_node.step) == -1:
                 if slice_node.lower is None and slice_node.upper is None:
-                    return f"Array({value}.reversed())" 
+                    return f"{self._postfix_operand(value)}.reversed()"
                 else:
                     self.warn("Slice com step -1 e bounds não totalmente suportado", slice_node)
-                    return f"Array({value}.reversed())"
+                    return f"{self._postfix_operand(value)}.reversed()"
             else:
                 self.warn("Slice com step diferente de -1 não suportado. Use um loop `stride` manual.", slice_node)
                 return f"/* Slice com step não suportado */"
         
         lower_present = slice_node.lower is not None
         upper_present = slice_node.upper is not None
-
+        
         if not lower_present and not upper_present:
             return value
+        value = self._postfix_operand(value)
+        
+        # Limites constantes negativos contam a partir do fim; prefix/dropFirst não estouram, como no Python
+        lower_value = _int_constant(slice_node.lower) if lower_present else None
+        upper_value = _int_constant(slice_node.upper) if upper_present else None
         
         if not lower_present:
-            upper = self._expr_str(slice_node.upper)
-            return f"{value}[..<{upper}]"
+            if upper_value is not None and upper_value < 0:
+                return f"{value}.dropLast({-upper_value})"
+            return f"{value}.prefix({self._expr_str(slice_node.upper)})"
         
         if not upper_present:
-            lower = self._expr_str(slice_node.lower)
-            return f"{value}[{lower}...]"
+            if lower_value is not None and lower_value < 0:
+                return f"{value}.suffix({-lower_value})"
+            return f"{value}.dropFirst({self._expr_str(slice_node.lower)})"
         
         lower = self._expr_str(slice_node.lower)
         upper = self._expr_str(slice_node.upper)
+        if upper_value is not None and upper_value < 0:
+            head = f"suffix({-lower_value})" if lower_value is not None and lower_value < 0 else f"dropFirst({lower})"
+            return f"{value}.{head}.dropLast({-upper_value})"
+        if lower_value is not None and lower_value < 0:
+            # Python: de max(n - k, 0) até min(fim, n); prefix e dropFirst limitam do mesmo jeito
+            if value_node is not None and not _is_simple(value_node):
+                self.warn("Fatia com início negativo e fim não negativo avalia o valor duas vezes", slice_node)
+            return f"{value}.prefix({upper}).dropFirst(max(0, {value}.count - {-lower_value}))"
+        if is_string and (lower_value is None or lower_value >= 0):
+            # String não é indexada por Int
+            if lower_value is not None and upper_value is not None:
+                return f"{value}.dropFirst({lower}).prefix({max(upper_value - lower_value, 0)})"
+            return f"{value}.dropFirst({lower}).prefix(max(0, {upper} - {self._postfix_operand(lower)}))"
         return f"{value}[{lower}..<{upper}]"
     
     def _expr_Tuple(self, node: ast.Tuple) -> str:
@@ -887,6 +1308,8 @@ class PyToSwiftTranspiler(ast.NodeVisitor):
             ast.GtE: '>=',
             ast.Is: '===',
             ast.IsNot: '!==',
+            ast.In: 'in',
+            ast.NotIn: 'not in',
         }
         symbol = mapping.get(type(op), '/*cmp*/')
         return symbol
@@ -898,10 +1321,66 @@ class PyToSwiftTranspiler(ast.NodeVisitor):
     def generic_visit(self, node: ast.AST):
         self.warn(f"Nó não tratado: {node.__class__.__name__}", node)
 
+PyToSwiftTranspiler._build_expr_dispatch()
+
+class _EmissionChunks:
+    """Iterador dos trechos gerados; libera a instância ao terminar.
+    
+    close() (ou a coleta do objeto) também libera, mesmo que a iteração não
+    tenha começado.
+    """
+    
+    def __init__(self, chunks: Iterator[str], in_use: threading.Lock):
+        self._chunks = chunks
+        self._in_use = in_use
+    
+    def __iter__(self):
+        return self
+    
+    def __next__(self) -> str:
+        if self._in_use is None:
+            raise StopIteration
+        try:
+            return next(self._chunks)
+        except BaseException:
+            self.close()
+            raise
+    
+    def close(self):
+        in_use, self._in_use = self._in_use, None
+        if in_use is not None:
+            self._chunks.close()
+            in_use.release()
+    
+    def __del__(self):
+        self.close()
+
 # ===== FUNÇÃO DE CONVENIÊNCIA =====
-def transpile(source: str) -> str:
+def transpile(source: str, workers: int = 0, only: Optional[Iterable[str]] = None) -> str:
     """
     Transpila código Python para Swift.
+    
+    workers > 1 emite as definições de nível superior em processos paralelos
+    (só compensa em módulos com muitas definições; a saída é idêntica).
+    only restringe a saída a esses nomes de nível superior e suas dependências.
+    """
+    transpiler = PyToSwiftTranspiler(workers)
+    return transpiler.generate(source, only)
+
+def transpile_to(source: str, stream: TextIO, flush: bool = False, workers: int = 0,
+                 only: Optional[Iterable[str]] = None) -> int:
+    """
+    Transpila código Python para Swift escrevendo a saída em stream.
+    """
+    transpiler = PyToSwiftTranspiler(workers)
+    return transpiler.generate_to(source, stream, flush=flush, only=only)
+
+def transpile_with_source_map(source: str, file: str = "output.swift", source_name: str = "input.py",
+                              workers: int = 0, only: Optional[Iterable[str]] = None
+                              ) -> Tuple[str, Dict[str, Any]]:
+    """
+    Transpila código Python para Swift, devolvendo (código Swift, source map v3).
     """
-    transpiler = PyToSwiftTranspiler()
-    return transpiler.generate(source)
\ No newline at end of file
+    transpiler = PyToSwiftTranspiler(workers, record_origins=True)
+    output = transpiler.generate(source, only)
+    return output, transpiler.source_map(file, source_name)
\ No newline at end of file
@@ -1,47 +1,365 @@
 import ast
-from typing import Dict, Optional, Set, List, Any
+from typing import Dict, Iterable, Optional, Set, List, Any
+
+from . import tracing
+from .ast_index import NodeIndex, iter_postorder
+from .passes import AnalysisPassManager
+from .symbol_table import TypeEnvironment
+from .swift_types import (SwiftType, INT, DOUBLE, STRING, BOOL, VOID, ANY, RANGE,
+                          named, array_of, dict_of, set_of)
 
 class TypeInferencer(ast.NodeVisitor):
     """Realiza inferência de tipos em múltiplos passes"""
     
-    def __init__(self):
-        self.func_signatures: Dict[str, Dict[str, str]] = {}  # func -> {param: type, 'return': type}
-        self.var_types: Dict[str, str] = {}  # var -> type
-        self.function_return_types: Dict[str, str] = {}  # func -> return_type
+    # Limite de visitas por função dentro de um componente recursivo
+    MAX_SCC_ITERATIONS = 8
+    
+    # Tipos de retorno dos built-ins mais comuns
+    BUILTIN_RETURNS: Dict[str, SwiftType] = {
+        'int': INT,
+        'float': DOUBLE,
+        'str': STRING,
+        'bool': BOOL,
+        'len': INT,
+        'sum': INT,
+        'min': ANY,
+        'max': ANY,
+        'abs': ANY,
+        'print': VOID,
+        'range': RANGE,
+        'list': array_of(ANY),
+        'dict': dict_of(STRING, ANY),
+    }
+    
+    ANNOTATION_TYPES: Dict[str, SwiftType] = {
+        'int': INT,
+        'float': DOUBLE,
+        'str': STRING,
+        'bool': BOOL,
+        'list': array_of(ANY),
+        'dict': dict_of(STRING, ANY),
+        'None': VOID,
+    }
+    
+    def __init__(self, type_env: Optional[TypeEnvironment] = None):
+        # nome qualificado ('f', 'A.setup', 'outer.inner') -> {param: type, 'return': type}
+        self.func_signatures: Dict[str, Dict[str, SwiftType]] = {}
+        self.type_env = type_env if type_env is not None else TypeEnvironment()  # (escopo, nome) -> type
+        self._scope: str = TypeEnvironment.GLOBAL  # escopo das expressões sendo inferidas
+        self.call_graph: Dict[str, List[str]] = {}  # func -> funções chamadas (conhecidas)
+        self._func_nodes: Dict[str, List[ast.FunctionDef]] = {}  # nome qualificado -> definições
+        self._func_scopes: Dict[int, str] = {}  # id(def) -> escopo da função
+        self._signature_scopes: Dict[str, str] = {}  # nome qualificado -> escopo da função
+        self._defined_functions: Dict[tuple, str] = {}  # (escopo da definição, nome) -> nome qualificado
+        self._clear_collected()
+        self._expr_type_cache: Dict[tuple, tuple] = {}  # (id(node), escopo) -> (node, tipo, dependências)
+        # Dependência -> chaves do cache que a consultaram. Dependências:
+        # ('var', escopo, nome) para cada escopo visitado ao resolver um nome
+        # e ('return', função) para chamadas de funções conhecidas.
+        self._cache_dependents: Dict[tuple, List[tuple]] = {}
+        self._dependency_stack: List[Set[tuple]] = []  # dependências das expressões em cálculo
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cache_invalidations = 0
+        self.cache_evictions = 0
+    
+    def reset(self):
+        """Limpa todo o estado da última inferência, mantendo as tabelas da classe"""
+        self.func_signatures = {}
+        self.type_env.reset()
+        self._scope = TypeEnvironment.GLOBAL
+        self.call_graph = {}
+        self._func_nodes.clear()
+        self._func_scopes.clear()
+        self._signature_scopes.clear()
+        self._defined_functions.clear()
+        self._clear_collected()
+        self._expr_type_cache.clear()
+        self._cache_dependents.clear()
+        self._dependency_stack.clear()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cache_invalidations = 0
+        self.cache_evictions = 0
+    
+    @property
+    def var_types(self) -> Dict[str, SwiftType]:
+        """Tipos das variáveis globais do módulo"""
+        return self.type_env.scope_types(TypeEnvironment.GLOBAL)
+    
+    def expr_type(self, node: ast.AST, scope: str = TypeEnvironment.GLOBAL) -> Optional[SwiftType]:
+        """Tipo de uma expressão avaliada no escopo indicado"""
+        prev_scope, self._scope = self._scope, scope
+        try:
+            return self._infer_expr_type(node)
+        finally:
+            self._scope = prev_scope
         
     def infer(self, tree: ast.AST):
         """Executa inferência em múltiplos passes"""
-        # Pass 1: Coleta assinaturas de funções
-        self._collect_function_signatures(tree)
-        # Pass 2: Infere tipos de variáveis e retornos
-        self._infer_types(tree)
-    
-    def _collect_function_signatures(self, tree: ast.AST):
-        """Coleta informações básicas das funções"""
-        for node in ast.walk(tree):
-            if isinstance(node, ast.FunctionDef):
-                sig = {'return': 'Void'}
-                
-                # Coleta tipos de argumentos
-                for arg in node.args.args:
-                    if arg.arg == 'self':
-                        continue
-                    # Usa annotation se disponível
-                    if arg.annotation:
-                        sig[arg.arg] = self._annotation_to_swift(arg.annotation)
-                    else:
-                        sig[arg.arg] = 'Any'
-                
-                self.func_signatures[node.name] = sig
+        front_end = AnalysisPassManager()
+        self.register_passes(front_end)
+        front_end.run(tree)
+        self.solve(tree)
+    
+    # ===== COLETA (PASSADA ÚNICA) =====
+    
+    def register_passes(self, passes: AnalysisPassManager):
+        """Registra a coleta de assinaturas, atribuições, retornos e chamadas no front end"""
+        self._clear_collected()
+        self.node_index = passes.index
+        passes.register(ast.ClassDef, self._on_class)
+        passes.register(ast.FunctionDef, self._on_function)
+        passes.register(ast.Assign, self._on_assign)
+        passes.register(ast.Return, self._on_return)
+        passes.register(ast.Call, self._on_call)
+        passes.register(ast.Name, self._on_name)
+    
+    def _clear_collected(self):
+        self.node_index = NodeIndex()  # pais, preenchido pelo front end
+        self._assigns: List[tuple] = []  # (Assign, escopo) em ordem de código
+        self._func_assigns: Dict[int, List[ast.Assign]] = {}  # id(func) -> atribuições próprias
+        self._func_returns: Dict[int, List[ast.Return]] = {}  # id(func) -> retornos com valor
+        self._func_calls: Dict[int, List[tuple]] = {}  # id(func) -> (nome chamado, escopo da chamada)
+        self._name_uses: Dict[tuple, List[ast.Name]] = {}  # (id(func), nome) -> usos
+    
+    def _on_class(self, node: ast.ClassDef, parent, scope: str, func):
+        self.type_env.declare_scope(TypeEnvironment.child_scope(scope, 'class', node.name), scope)
+    
+    def _on_function(self, node: ast.FunctionDef, parent, scope: str, func):
+        """Coleta informações básicas das funções e a hierarquia de escopos"""
+        func_scope = TypeEnvironment.child_scope(scope, 'func', node.name)
+        qualified = TypeEnvironment.qualified_name(func_scope)
+        self._func_nodes.setdefault(qualified, []).append(node)
+        self._func_scopes[id(node)] = func_scope
+        self._signature_scopes[qualified] = func_scope
+        self._defined_functions[(scope, node.name)] = qualified
+        # Corpo de classe não é visível dentro dos métodos
+        if TypeEnvironment.is_class_scope(scope):
+            scope = self.type_env.parent_scope(scope)
+        self.type_env.declare_scope(func_scope, scope)
+        sig = {'return': VOID}
+        
+        # Coleta tipos de argumentos
+        for arg in node.args.args:
+            if arg.arg == 'self':
+                continue
+            # Usa annotation se disponível
+            if arg.annotation:
+                sig[arg.arg] = self._annotation_to_swift(arg.annotation)
+            else:
+                sig[arg.arg] = ANY
+        
+        self.func_signatures[qualified] = sig
+        for param, param_type in sig.items():
+            if param != 'return':
+                self.type_env.set(func_scope, param, param_type)
+    
+    def _on_assign(self, node: ast.Assign, parent, scope: str, func):
+        self._assigns.append((node, scope))
+        if func is not None:
+            self._func_assigns.setdefault(id(func), []).append(node)
+    
+    def _on_return(self, node: ast.Return, parent, scope: str, func):
+        if func is not None and node.value:
+            self._func_returns.setdefault(id(func), []).append(node)
+    
+    def _on_call(self, node: ast.Call, parent, scope: str, func):
+        if func is not None and isinstance(node.func, ast.Name):
+            self._func_calls.setdefault(id(func), []).append((node.func.id, scope))
+    
+    def _on_name(self, node: ast.Name, parent, scope: str, func):
+        if func is not None:
+            self._name_uses.setdefault((id(func), node.id), []).append(node)
     
-    def _infer_types(self, tree: ast.AST):
-        """Infere tipos de variáveis e retornos de função"""
-        # Primeiro, infere tipos básicos
-        for node in ast.walk(tree):
+    def _function_scope(self, node: ast.FunctionDef) -> str:
+        return self._func_scopes[id(node)]
+    
+    def _resolve_function(self, name: str, scope: str) -> Optional[str]:
+        """Nome qualificado da função que name designa em scope (regras de escopo do Python)"""
+        while True:
+            qualified = self._defined_functions.get((scope, name))
+            if qualified is not None or scope == TypeEnvironment.GLOBAL:
+                return qualified
+            scope = self.type_env.parent_scope(scope)
+    
+    def solve(self, tree: ast.AST):
+        """Resolve os tipos a partir do que foi coletado pelo front end"""
+        self.invalidate_cache()
+        self._build_call_graph()
+        # Globais do módulo ficam visíveis dentro das funções
+        self._scope = TypeEnvironment.GLOBAL
+        for node in getattr(tree, 'body', []):
             if isinstance(node, ast.Assign):
                 self._infer_assignment(node)
-            elif isinstance(node, ast.FunctionDef):
-                self._infer_function_types(node)
+        # Resolve assinaturas (ponto fixo por componente do grafo de chamadas)
+        self._solve_signatures()
+        # Infere tipos de variáveis
+        self._infer_types()
+    
+    # ===== SOLVER DE ASSINATURAS =====
+    
+    def _build_call_graph(self):
+        """Liga cada função às funções conhecidas que ela chama"""
+        for name, nodes in self._func_nodes.items():
+            callees: Dict[str, None] = {}  # preserva a ordem da primeira chamada
+            for func in nodes:
+                for callee, scope in self._func_calls.get(id(func), ()):
+                    qualified = self._resolve_function(callee, scope)
+                    if qualified is not None:
+                        callees[qualified] = None
+            self.call_graph[name] = list(callees)
+    
+    def has_mutual_recursion(self) -> bool:
+        """Se o grafo de chamadas da última análise tem funções mutuamente recursivas"""
+        return any(len(component) > 1 for component in self._strongly_connected_components())
+    
+    def _strongly_connected_components(self) -> List[List[str]]:
+        """Tarjan iterativo: devolve os componentes com os chamados antes dos chamadores"""
+        order: Dict[str, int] = {}
+        lowlink: Dict[str, int] = {}
+        stack: List[str] = []
+        on_stack: Set[str] = set()
+        components: List[List[str]] = []
+        
+        for root in self.call_graph:
+            if root in order:
+                continue
+            order[root] = lowlink[root] = len(order)
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(self.call_graph[root]))]
+            while work:
+                name, callees = work[-1]
+                for callee in callees:
+                    if callee not in order:
+                        order[callee] = lowlink[callee] = len(order)
+                        stack.append(callee)
+                        on_stack.add(callee)
+                        work.append((callee, iter(self.call_graph[callee])))
+                        break
+                    if callee in on_stack:
+                        lowlink[name] = min(lowlink[name], order[callee])
+                else:
+                    work.pop()
+                    if work:
+                        caller = work[-1][0]
+                        lowlink[caller] = min(lowlink[caller], lowlink[name])
+                    if lowlink[name] == order[name]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component.append(member)
+                            if member == name:
+                                break
+                        components.append(component[::-1])
+        return components
+    
+    def _solve_signatures(self):
+        """Resolve as assinaturas em ordem topológica reversa do grafo de chamadas.
+        
+        Cada componente fortemente conexo é iterado até o ponto fixo; só as
+        funções cujas dependências mudaram voltam para a fila.
+        """
+        for component in self._strongly_connected_components():
+            members = set(component)
+            recursive = len(component) > 1 or component[0] in self.call_graph[component[0]]
+            if recursive:
+                # Retorno ainda desconhecido: chamadas recursivas não contaminam o tipo
+                for name in component:
+                    self._set_signature_type(name, 'return', None)
+            
+            worklist = list(component)
+            queued = set(worklist)
+            budget = self.MAX_SCC_ITERATIONS * len(component)
+            while worklist and budget:
+                budget -= 1
+                name = worklist.pop(0)
+                queued.discard(name)
+                before = dict(self.func_signatures[name])
+                for node in self._func_nodes[name]:
+                    self._infer_function_types(node)
+                after = self.func_signatures[name]
+                if after == before:
+                    continue
+                # O retorno é inferido antes dos parâmetros: só um parâmetro novo pede outra visita
+                params_changed = any(after.get(key) is not before.get(key)
+                                     for key in after.keys() | before.keys() if key != 'return')
+                dependents = ([name] if params_changed else []) + [caller for caller in component
+                                                                   if name in self.call_graph[caller]]
+                for dependent in dependents:
+                    if dependent in members and dependent not in queued:
+                        worklist.append(dependent)
+                        queued.add(dependent)
+            
+            for name in component:
+                if self.func_signatures[name].get('return') is None:
+                    self._set_signature_type(name, 'return', ANY)
+    
+    # ===== CACHE DE TIPOS DE EXPRESSÕES =====
+    
+    def invalidate_cache(self):
+        """Descarta todos os tipos memorizados"""
+        if self._expr_type_cache:
+            self._expr_type_cache.clear()
+            self.cache_invalidations += 1
+        self._cache_dependents.clear()
+    
+    def _invalidate_dependents(self, dependency: tuple):
+        """Descarta só os tipos que consultaram a dependência (e as expressões que os contêm)"""
+        keys = self._cache_dependents.pop(dependency, None)
+        if not keys:
+            return
+        cache = self._expr_type_cache
+        evicted = 0
+        for key in keys:
+            if cache.pop(key, None) is not None:
+                evicted += 1
+        if evicted:
+            self.cache_invalidations += 1
+            self.cache_evictions += evicted
+    
+    def cache_stats(self) -> Dict[str, float]:
+        """Contadores do cache de tipos de expressões"""
+        lookups = self.cache_hits + self.cache_misses
+        return {
+            'hits': self.cache_hits,
+            'misses': self.cache_misses,
+            'invalidations': self.cache_invalidations,
+            'evictions': self.cache_evictions,
+            'size': len(self._expr_type_cache),
+            'hit_rate': self.cache_hits / lookups if lookups else 0.0,
+        }
+    
+    def _set_var_type(self, name: str, typ: SwiftType):
+        """Registra o tipo de uma variável no escopo atual"""
+        if self.type_env.set(self._scope, name, typ):
+            self._invalidate_dependents(('var', self._scope, name))
+            if tracing.enabled():
+                tracing.emit(tracing.TYPE_DECISION, name, scope=self._scope, type=str(typ), source='inference')
+    
+    def _set_signature_type(self, func_name: str, key: str, typ: Optional[SwiftType]):
+        """Atualiza um parâmetro (ou 'return') da assinatura, invalidando o cache se mudar"""
+        sig = self.func_signatures[func_name]
+        if sig.get(key) is not typ:
+            sig[key] = typ
+            scope = self._signature_scopes[func_name]
+            if key != 'return':
+                self.type_env.set(scope, key, typ)
+                self._invalidate_dependents(('var', scope, key))
+            else:
+                self._invalidate_dependents(('return', func_name))
+            if tracing.enabled():
+                tracing.emit(tracing.TYPE_DECISION, key, scope=scope,
+                             type=str(typ), source='signature')
+    
+    def _infer_types(self):
+        """Infere tipos de variáveis"""
+        for node, scope in self._assigns:
+            self._scope = scope
+            self._infer_assignment(node)
+        self._scope = TypeEnvironment.GLOBAL
     
     def _infer_assignment(self, node: ast.Assign):
         """Infere tipos de variáveis através de atribuições"""
@@ -49,153 +367,230 @@ class TypeInferencer(ast.NodeVisitor):
         if typ:
             for target in node.targets:
                 if isinstance(target, ast.Name):
-                    self.var_types[target.id] = typ
+                    self._set_var_type(target.id, typ)
     
     def _infer_function_types(self, node: ast.FunctionDef):
         """Infere tipos de retorno e parâmetros de função"""
+        prev_scope, self._scope = self._scope, self._function_scope(node)
+        try:
+            self._infer_function_signature(node)
+        finally:
+            self._scope = prev_scope
+    
+    def _infer_function_signature(self, node: ast.FunctionDef):
+        # Variáveis locais primeiro: os retornos costumam depender delas
+        for stmt in self._func_assigns.get(id(node), ()):
+            self._infer_assignment(stmt)
         return_type = self._infer_return_type(node)
         
         # Atualiza assinatura da função
-        if node.name in self.func_signatures:
-            self.func_signatures[node.name]['return'] = return_type
+        qualified = TypeEnvironment.qualified_name(self._function_scope(node))
+        sig = self.func_signatures.get(qualified)
+        if sig is not None:
+            self._set_signature_type(qualified, 'return', return_type)
             
             # Infere tipos de parâmetros baseados no uso
             for arg in node.args.args:
                 if arg.arg == 'self':
                     continue
-                if arg.arg not in self.func_signatures[node.name] or self.func_signatures[node.name][arg.arg] == 'Any':
+                if arg.arg not in sig or sig[arg.arg] is ANY:
                     param_type = self._infer_parameter_type(node, arg.arg)
                     if param_type:
-                        self.func_signatures[node.name][arg.arg] = param_type
+                        self._set_signature_type(qualified, arg.arg, param_type)
     
-    def _infer_parameter_type(self, func: ast.FunctionDef, param_name: str) -> Optional[str]:
+    def _infer_parameter_type(self, func: ast.FunctionDef, param_name: str) -> Optional[SwiftType]:
         """Infere tipo de parâmetro baseado no uso dentro da função"""
         param_types = set()
         
-        for node in ast.walk(func):
-            # Procura por usos do parâmetro em operações
-            if isinstance(node, ast.Name) and node.id == param_name:
-                # Verifica o contexto do uso
-                parent = self._get_parent_context(func, node)
-                if parent:
-                    if isinstance(parent, ast.BinOp):
-                        # Operações matemáticas sugerem Int ou Double
-                        if isinstance(parent.op, (ast.Add, ast.Sub, ast.Mult, ast.Div)):
-                            left_type = self._infer_expr_type(parent.left) if hasattr(parent, 'left') else None
-                            right_type = self._infer_expr_type(parent.right) if hasattr(parent, 'right') else None
-                            
-                            if left_type == 'Double' or right_type == 'Double':
-                                param_types.add('Double')
-                            else:
-                                param_types.add('Int')
-                    
-                    elif isinstance(parent, ast.Compare):
-                        # Comparações com números
-                        for comparator in parent.comparators:
-                            comp_type = self._infer_expr_type(comparator)
-                            if comp_type in ('Int', 'Double'):
-                                param_types.add(comp_type)
+        # Procura por usos do parâmetro em operações
+        for node in self._name_uses.get((id(func), param_name), ()):
+            # Verifica o contexto do uso
+            parent = self.node_index.parent(node)
+            if parent:
+                if isinstance(parent, ast.BinOp):
+                    # Operações matemáticas sugerem Int ou Double
+                    if isinstance(parent.op, (ast.Add, ast.Sub, ast.Mult, ast.Div)):
+                        left_type = self._infer_expr_type(parent.left) if hasattr(parent, 'left') else None
+                        right_type = self._infer_expr_type(parent.right) if hasattr(parent, 'right') else None
+                        
+                        if left_type is DOUBLE or right_type is DOUBLE:
+                            param_types.add(DOUBLE)
+                        else:
+                            param_types.add(INT)
+                
+                elif isinstance(parent, ast.Compare):
+                    # Comparações com números
+                    for comparator in parent.comparators:
+                        comp_type = self._infer_expr_type(comparator)
+                        if comp_type is INT or comp_type is DOUBLE:
+                            param_types.add(comp_type)
         
         if param_types:
             # Prefere tipos mais específicos
-            if 'Int' in param_types and 'Double' not in param_types:
-                return 'Int'
-            elif 'Double' in param_types:
-                return 'Double'
+            if INT in param_types and DOUBLE not in param_types:
+                return INT
+            elif DOUBLE in param_types:
+                return DOUBLE
             return param_types.pop()
         
         return None
     
-    def _get_parent_context(self, tree: ast.AST, target: ast.AST) -> Optional[ast.AST]:
-        """Encontra o contexto pai de um nó"""
-        for parent in ast.walk(tree):
-            for child in ast.iter_child_nodes(parent):
-                if child is target:
-                    return parent
-        return None
-    
-    def _infer_return_type(self, func: ast.FunctionDef) -> str:
-        """Infere tipo de retorno analisando statements return"""
+    def _infer_return_type(self, func: ast.FunctionDef) -> Optional[SwiftType]:
+        """Infere tipo de retorno analisando statements return.
+        
+        Devolve None quando há retornos com valor mas nenhum tipo pôde ser
+        resolvido ainda (ex.: dependem de uma chamada recursiva).
+        """
         return_types = set()
+        has_value = False
         
-        for node in ast.walk(func):
-            if isinstance(node, ast.Return) and node.value:
-                rt = self._infer_expr_type(node.value)
-                if rt:
-                    return_types.add(rt)
+        for node in self._func_returns.get(id(func), ()):
+            has_value = True
+            rt = self._infer_expr_type(node.value)
+            if rt:
+                return_types.add(rt)
         
         if not return_types:
-            return 'Void'
+            return None if has_value else VOID
         if len(return_types) == 1:
             return return_types.pop()
         
         # Para múltiplos tipos de retorno, tenta encontrar um tipo comum
-        if return_types == {'Int', 'Double'}:
-            return 'Double'  # Promove para Double se misturar Int e Double
+        if return_types == {INT, DOUBLE}:
+            return DOUBLE  # Promove para Double se misturar Int e Double
         
         # CORREÇÃO: Se todos os retornos são inteiros ou operações com inteiros, retorna Int
         if self._all_returns_are_int(func):
-            return 'Int'
+            return INT
         
-        return 'Any'
+        return ANY
     
     def _all_returns_are_int(self, func: ast.FunctionDef) -> bool:
         """Verifica se todos os retornos da função são inteiros"""
-        for node in ast.walk(func):
-            if isinstance(node, ast.Return) and node.value:
-                if not self._is_int_expression(node.value):
-                    return False
+        for node in self._func_returns.get(id(func), ()):
+            if not self._is_int_expression(node.value):
+                return False
         return True
     
     def _is_int_expression(self, node: ast.AST) -> bool:
-        """Verifica se uma expressão resulta em Int"""
-        expr_type = self._infer_expr_type(node)
-        if expr_type == 'Int':
-            return True
-        
-        # Verificação mais detalhada para expressões complexas
-        if isinstance(node, ast.Constant):
-            return isinstance(node.value, int)
-        
-        elif isinstance(node, ast.BinOp):
-            if isinstance(node.op, (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Mod)):
-                return (self._is_int_expression(node.left) and 
-                        self._is_int_expression(node.right))
-        
-        elif isinstance(node, ast.Call):
-            if isinstance(node.func, ast.Name):
+        """Verifica se uma expressão resulta em Int (pilha explícita, sem recursão)"""
+        pending = [node]
+        while pending:
+            node = pending.pop()
+            expr_type = self._infer_expr_type(node)
+            if expr_type is INT:
+                continue
+            
+            # Verificação mais detalhada para expressões complexas
+            if isinstance(node, ast.Constant):
+                if not isinstance(node.value, int):
+                    return False
+            
+            elif isinstance(node, ast.BinOp):
+                if not isinstance(node.op, (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Mod)):
+                    return False
+                pending.append(node.right)
+                pending.append(node.left)
+            
+            elif isinstance(node, ast.Call):
                 # Para chamadas recursivas, verifica se a função retorna Int
-                func_name = node.func.id
-                if func_name in self.func_signatures:
-                    return self.func_signatures[func_name].get('return') == 'Int'
-            return False
+                if not isinstance(node.func, ast.Name):
+                    return False
+                qualified = self._resolve_function(node.func.id, self._scope)
+                sig = self.func_signatures.get(qualified) if qualified is not None else None
+                if sig is None or sig.get('return') is not INT:
+                    return False
+            
+            elif isinstance(node, ast.Name):
+                # Variável ou parâmetro visível no escopo atual
+                if self.type_env.resolve(self._scope, node.id) is not INT:
+                    return False
+            
+            else:
+                return False
         
-        elif isinstance(node, ast.Name):
-            # Verifica se a variável é Int
-            if node.id in self.var_types:
-                return self.var_types[node.id] == 'Int'
-            # Verifica se é parâmetro da função
-            for func_sig in self.func_signatures.values():
-                if node.id in func_sig:
-                    return func_sig[node.id] == 'Int'
-            return False
+        return True
+    
+    def _infer_expr_type(self, node: ast.AST) -> Optional[SwiftType]:
+        """Infere tipo de uma expressão, memorizando o resultado por nó.
         
-        return False
+        Subexpressões ainda não inferidas são resolvidas antes, em pós-ordem e
+        sem recursão, de modo que _compute_expr_type só encontra acertos no
+        cache mesmo em cadeias com milhares de níveis.
+        """
+        key = (id(node), self._scope)
+        entry = self._expr_type_cache.get(key)
+        if entry is not None and entry[0] is node:
+            self.cache_hits += 1
+            if self._dependency_stack:
+                self._dependency_stack[-1].update(entry[2])
+            return entry[1]
+        typ = None
+        deps: Set[tuple] = set()
+        for pending in iter_postorder(node, self._uncached_type_children):
+            self.cache_misses += 1
+            deps = set()
+            self._dependency_stack.append(deps)
+            try:
+                typ = self._compute_expr_type(pending)
+            finally:
+                self._dependency_stack.pop()
+            pending_key = (id(pending), self._scope)
+            self._expr_type_cache[pending_key] = (pending, typ, deps)
+            for dependency in deps:
+                self._cache_dependents.setdefault(dependency, []).append(pending_key)
+        if self._dependency_stack:
+            self._dependency_stack[-1].update(deps)  # deps da raiz já incluem as dos filhos
+        return typ
+    
+    def _resolve_name(self, name: str) -> Optional[SwiftType]:
+        """type_env.resolve registrando cada escopo visitado como dependência"""
+        deps = self._dependency_stack[-1] if self._dependency_stack else None
+        env = self.type_env
+        scope = self._scope
+        while True:
+            if deps is not None:
+                deps.add(('var', scope, name))
+            typ = env.get(scope, name)
+            if typ is not None or scope == env.GLOBAL:
+                return typ
+            scope = env.parent_scope(scope)
     
-    def _infer_expr_type(self, node: ast.AST) -> Optional[str]:
+    def _uncached_type_children(self, node: ast.AST) -> List[ast.AST]:
+        """Subexpressões cujo tipo _compute_expr_type(node) vai consultar"""
+        if isinstance(node, ast.BinOp):
+            children = [node.left, node.right]
+        elif isinstance(node, ast.UnaryOp):
+            children = [node.operand]
+        elif isinstance(node, (ast.List, ast.Set)):
+            children = node.elts
+        elif isinstance(node, ast.Dict):
+            children = [k for k in node.keys if k is not None] + node.values
+        elif isinstance(node, ast.Subscript):
+            children = [node.value]
+        elif (isinstance(node, ast.Call) and isinstance(node.func, ast.Name)
+              and node.func.id in ('sum', 'set') and len(node.args) == 1):
+            children = node.args
+        else:
+            return []
+        cache = self._expr_type_cache
+        scope = self._scope
+        return [child for child in children if (id(child), scope) not in cache]
+    
+    def _compute_expr_type(self, node: ast.AST) -> Optional[SwiftType]:
         """Infere tipo de uma expressão com mais precisão"""
         if isinstance(node, ast.Constant):
             v = node.value
             if isinstance(v, bool):
-                return 'Bool'
+                return BOOL
             if isinstance(v, int):
-                return 'Int'
+                return INT
             if isinstance(v, float):
-                return 'Double'
+                return DOUBLE
             if isinstance(v, str):
-                return 'String'
+                return STRING
             if v is None:
-                return 'Void'
+                return VOID
         
         elif isinstance(node, ast.List):
             if node.elts:
@@ -207,8 +602,12 @@ class TypeInferencer(ast.NodeVisitor):
                         elem_types.add(elem_type)
                 
                 if len(elem_types) == 1:
-                    return f'[{elem_types.pop()}]'
-            return '[Any]'
+                    return array_of(elem_types.pop())
+            return array_of(ANY)
+        
+        elif isinstance(node, ast.Set):
+            # Set<Any> não existe em Swift (Any não é Hashable): só elementos de um tipo conhecido
+            return self._set_of(self._infer_expr_type(elem) for elem in node.elts)
         
         elif isinstance(node, ast.Dict):
             if node.keys and node.values:
@@ -226,130 +625,134 @@ class TypeInferencer(ast.NodeVisitor):
                         val_types.add(val_type)
                 
                 if len(key_types) == 1 and len(val_types) == 1:
-                    return f'[{key_types.pop()}: {val_types.pop()}]'
-            return '[String: Any]'
+                    return dict_of(key_types.pop(), val_types.pop())
+            return dict_of(STRING, ANY)
         
         elif isinstance(node, ast.BinOp):
             left_type = self._infer_expr_type(node.left)
             right_type = self._infer_expr_type(node.right)
             
             # CORREÇÃO: Para operações matemáticas com inteiros, mantém como Int
-            if left_type == 'Int' and right_type == 'Int':
+            if left_type is INT and right_type is INT:
                 if isinstance(node.op, (ast.Add, ast.Sub, ast.Mult, ast.Mod)):
-                    return 'Int'
+                    return INT
                 elif isinstance(node.op, ast.Div):
                     # Divisão de inteiros pode resultar em Double
-                    return 'Double'
+                    return DOUBLE
+                elif isinstance(node.op, ast.Pow) and isinstance(node.right, ast.UnaryOp) \
+                        and isinstance(node.right.op, ast.USub):
+                    return DOUBLE  # 2 ** -1 == 0.5
             
             if left_type and right_type:
                 # Operações matemáticas
-                if isinstance(node.op, (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Mod)):
-                    if left_type == 'Double' or right_type == 'Double':
-                        return 'Double'
-                    elif left_type == 'Int' and right_type == 'Int':
-                        return 'Int'  # Já tratado acima, mas mantido para clareza
-                    elif left_type == 'String' or right_type == 'String':
-                        return 'String'
+                if isinstance(node.op, (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Mod, ast.FloorDiv, ast.Pow)):
+                    if left_type is DOUBLE or right_type is DOUBLE:
+                        return DOUBLE
+                    elif left_type is INT and right_type is INT:
+                        return INT  # Já tratado acima, mas mantido para clareza
+                    elif left_type is STRING or right_type is STRING:
+                        return STRING
                 
                 # Operações de comparação sempre retornam Bool
                 elif isinstance(node.op, (ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE)):
-                    return 'Bool'
+                    return BOOL
             
             return left_type or right_type
         
         elif isinstance(node, ast.UnaryOp):
             operand_type = self._infer_expr_type(node.operand)
-            if isinstance(node.op, ast.Not) and operand_type == 'Bool':
-                return 'Bool'
+            if isinstance(node.op, ast.Not) and operand_type is BOOL:
+                return BOOL
             return operand_type
         
         elif isinstance(node, ast.BoolOp):
             # Operações lógicas sempre retornam Bool
-            return 'Bool'
+            return BOOL
         
         elif isinstance(node, ast.Compare):
             # Comparações sempre retornam Bool
-            return 'Bool'
+            return BOOL
         
         elif isinstance(node, ast.Name):
-            # Verifica se é uma variável conhecida
-            if node.id in self.var_types:
-                return self.var_types[node.id]
-            
-            # Verifica se é um parâmetro de função
-            for func_sig in self.func_signatures.values():
-                if node.id in func_sig and func_sig[node.id] != 'Any':
-                    return func_sig[node.id]
+            # Variável ou parâmetro visível no escopo atual (O(1) por escopo)
+            typ = self._resolve_name(node.id)
+            if typ is not None and typ is not ANY:
+                return typ
             
             # Constantes built-in
             if node.id in ('True', 'False'):
-                return 'Bool'
+                return BOOL
             if node.id == 'None':
-                return 'Void'
+                return VOID
         
         elif isinstance(node, ast.Call):
             if isinstance(node.func, ast.Name):
                 func_name = node.func.id
                 
                 # Verifica assinatura conhecida
-                if func_name in self.func_signatures:
-                    return self.func_signatures[func_name].get('return', 'Any')
-                
+                qualified = self._resolve_function(func_name, self._scope)
+                if qualified is not None:
+                    if self._dependency_stack:
+                        self._dependency_stack[-1].add(('return', qualified))
+                    return self.func_signatures[qualified].get('return', ANY)
+
+                if func_name == 'sum' and len(node.args) == 1:
+                    container_type = self._infer_expr_type(node.args[0])
+                    if container_type is not None and container_type.is_array and container_type.element is DOUBLE:
+                        return DOUBLE
+
+                if func_name == 'set' and len(node.args) == 1:
+                    container_type = self._infer_expr_type(node.args[0])
+                    if container_type is not None and (container_type.is_array or container_type.is_set):
+                        return self._set_of([container_type.element]) or ANY
+
                 # Mapeamento de built-ins comuns
-                builtin_returns = {
-                    'int': 'Int',
-                    'float': 'Double', 
-                    'str': 'String',
-                    'bool': 'Bool',
-                    'len': 'Int',
-                    'sum': 'Int',
-                    'min': 'Any',
-                    'max': 'Any',
-                    'abs': 'Any',
-                    'print': 'Void',
-                    'range': 'Range',
-                    'list': '[Any]',
-                    'dict': '[String: Any]',
-                }
-                return builtin_returns.get(func_name, 'Any')
+                return self.BUILTIN_RETURNS.get(func_name, ANY)
             
             elif isinstance(node.func, ast.Attribute):
                 # Para métodos, retorna Any por padrão
-                return 'Any'
+                return ANY
         
         elif isinstance(node, ast.Subscript):
             container_type = self._infer_expr_type(node.value)
-            if container_type and container_type.startswith('['):
-                # Para arrays, retorna o tipo do elemento
-                if container_type.endswith(']'):
-                    return container_type[1:-1]  # Extrai o tipo interno
-            return 'Any'
+            if container_type is not None:
+                if container_type.is_array:
+                    # Fatias preservam o tipo do array; índices devolvem o elemento
+                    if isinstance(node.slice, ast.Slice):
+                        return container_type
+                    return container_type.element
+                if container_type.is_dict:
+                    return container_type.value
+                if container_type is STRING and isinstance(node.slice, ast.Slice):
+                    return STRING
+            return ANY
         
         return None
     
-    def _annotation_to_swift(self, node: ast.AST) -> str:
+    @staticmethod
+    def _set_of(element_types: Iterable[Optional[SwiftType]]) -> Optional[SwiftType]:
+        """Set<T> se todos os elementos têm o mesmo tipo conhecido T, senão None"""
+        types = set(element_types)
+        if len(types) != 1:
+            return None
+        element = types.pop()
+        return None if element is None or element is ANY else set_of(element)
+    
+    def _annotation_to_swift(self, node: ast.AST) -> SwiftType:
         """Converte annotation Python para tipo Swift"""
         if isinstance(node, ast.Name):
-            mapping = {
-                'int': 'Int',
-                'float': 'Double', 
-                'str': 'String',
-                'bool': 'Bool',
-                'list': '[Any]',
-                'dict': '[String: Any]',
-                'None': 'Void',
-            }
-            return mapping.get(node.id, node.id)
+            typ = self.ANNOTATION_TYPES.get(node.id)
+            return typ if typ is not None else named(node.id)
         
         elif isinstance(node, ast.Subscript):
             if isinstance(node.value, ast.Name):
                 if node.value.id == 'List':
                     elem = self._annotation_to_swift(node.slice)
-                    return f'[{elem}]'
+                    return array_of(elem)
                 elif node.value.id == 'Dict':
                     if isinstance(node.slice, ast.Tuple) and len(node.slice.elts) == 2:
                         k = self._annotation_to_swift(node.slice.elts[0])
                         v = self._annotation_to_swift(node.slice.elts[1])
-                        return f'[{k}: {v}]'
+                        return dict_of(k, v)
         
-        return 'Any'
\ No newline at end of file
+        return ANY
\ No newline at end of file
@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+from py2swift import AsyncTranspiler, TranspileError, UnsupportedFeatureError, atranspile, transpile
+
+
+def _local_error(source):
+    with pytest.raises(TranspileError) as info:
+        transpile(source)
+    return info.value
+
+
+def test_atranspile_raises_unsupported_feature_error():
+    source = "def f(:\n    pass\n"
+    expected = _local_error(source)
+    with pytest.raises(UnsupportedFeatureError) as info:
+        asyncio.run(atranspile(source, timeout=30))
+    assert str(info.value) == str(expected)
+    assert info.value.feature == expected.feature
+    assert info.value.line == expected.line
+
+
+def test_error_class_and_fields_survive_the_process_boundary():
+    source = "x = " + "(" * 10_000 + "1" + ")" * 10_000 + "\n"
+    expected = _local_error(source)
+
+    async def main():
+        async with AsyncTranspiler(workers=1) as at:
+            with pytest.raises(TranspileError) as info:
+                await at.transpile(source)
+            # o worker continua utilizável depois do erro
+            return info.value, await at.transpile("print(1)\n")
+
+    error, output = asyncio.run(main())
+    assert type(error) is type(expected)
+    assert (str(error), error.feature, error.line) == (str(expected), expected.feature, expected.line)
+    assert output == transpile("print(1)\n")
+
+
+def test_slots_are_released_across_event_loops():
+    at = AsyncTranspiler(workers=1)
+    try:
+        for _ in range(3):
+            # cada asyncio.run usa um loop novo; a vaga de um não pode vazar para o outro
+            assert asyncio.run(at.transpile("print(2)\n", timeout=30)) == transpile("print(2)\n")
+        with pytest.raises(asyncio.TimeoutError):
+            async def blocked():
+                slots = at._get_slots()
+                await slots.acquire()
+                try:
+                    await at.run("print(3)\n", timeout=0.05)
+                finally:
+                    slots.release()
+            asyncio.run(blocked())
+        assert asyncio.run(at.transpile("print(4)\n", timeout=30)) == transpile("print(4)\n")
+    finally:
+        at.shutdown()
+
+
+def test_default_workers_are_not_forked_from_the_threaded_parent():
+    async def main():
+        async with AsyncTranspiler(workers=2) as at:
+            # as threads de espera já existem quando o segundo worker nasce
+            outputs = await asyncio.gather(at.transpile("print(5)\n"), at.transpile("print(6)\n"))
+            return at._context.get_start_method(), outputs
+
+    method, outputs = asyncio.run(main())
+    assert method in ('forkserver', 'spawn')
+    assert outputs == [transpile("print(5)\n"), transpile("print(6)\n")]
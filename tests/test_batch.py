@@ -0,0 +1,60 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from py2swift import transpile, transpile_many
+
+SOURCES = [f"def f{i}(a: int):\n    return a * {i}\n\nprint(f{i}({i}))\n" for i in range(12)]
+BROKEN = "def f(:\n    pass\n"
+
+
+def _expected(source):
+    return transpile(source)
+
+
+@pytest.mark.parametrize('executor', ['process', 'thread'])
+def test_results_keep_the_input_order(executor):
+    results = transpile_many(SOURCES, workers=3, executor=executor, chunksize=2)
+    assert [r.output for r in results] == [_expected(s) for s in SOURCES]
+    assert results.stats.executor == executor
+    assert results.stats.workers == 3 and results.stats.chunksize == 2
+
+
+def test_one_failing_item_does_not_stop_the_batch():
+    sources = SOURCES[:3] + [BROKEN] + SOURCES[3:5]
+    results = transpile_many(sources, workers=2, executor='thread', chunksize=1)
+    assert [r.ok for r in results] == [True, True, True, False, True, True]
+    failed = results[3]
+    assert failed.output is None
+    assert failed.error_type == 'UnsupportedFeatureError'
+    assert "Erro de sintaxe Python" in failed.error
+    assert results[4].output == _expected(SOURCES[3])
+
+
+def test_aggregated_stats():
+    sources = SOURCES[:4] + [BROKEN]
+    results = transpile_many(sources, workers=1)
+    stats = results.stats
+    assert stats.items == 5 and stats.failures == 1
+    assert stats.executor == 'inline'  # 1 worker: sem pool
+    assert stats.source_bytes == sum(len(s.encode('utf-8')) for s in sources)
+    assert stats.output_bytes == sum(len(r.output.encode('utf-8')) for r in results if r.ok)
+    assert stats.elapsed > 0 and stats.items_per_second == pytest.approx(5 / stats.elapsed)
+    assert "5 itens (1 com erro)" in str(stats)
+
+
+def test_workers_and_default_chunksize():
+    results = transpile_many(SOURCES, workers=2, executor='thread')
+    assert results.stats.workers == 2
+    assert results.stats.chunksize == 2  # ~4 tarefas por worker: ceil(12 / 8)
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        shared = transpile_many(SOURCES, executor=pool)
+    assert shared.stats.workers == 3  # herdado do executor
+    assert shared.stats.executor == 'ThreadPoolExecutor'
+    assert [r.output for r in shared] == [r.output for r in results]
+
+
+def test_empty_batch_and_invalid_executor():
+    assert list(transpile_many([])) == [] and transpile_many([]).stats.items == 0
+    with pytest.raises(ValueError):
+        transpile_many(SOURCES, executor='gpu')
@@ -0,0 +1,18 @@
+from py2swift.__main__ import main
+
+
+def test_stdout_mode_rejects_emit_runtime(tmp_path, capsys):
+    src = tmp_path / "prog.py"
+    src.write_text("x = 1\n", encoding="utf-8")
+    assert main([str(src), "-", "--emit-runtime"]) == 1
+    out = capsys.readouterr().out
+    assert "--emit-runtime" in out
+    assert "var x" not in out and "let x" not in out
+    assert not (tmp_path / "PyRuntime.swift").exists()
+
+
+def test_stdout_mode_streams_without_emit_runtime(tmp_path, capsys):
+    src = tmp_path / "prog.py"
+    src.write_text("x = 1\nprint(x)\n", encoding="utf-8")
+    assert main([str(src), "-"]) == 0
+    assert "print(x)" in capsys.readouterr().out
@@ -0,0 +1,85 @@
+import re
+
+from py2swift import transpile
+
+SQ = "def sq(n: int) -> int:\n    return n * n\n\n"
+
+
+def _value(source: str) -> str:
+    """Expressão Swift atribuída na última linha do programa"""
+    line = transpile(source).rstrip("\n").split("\n")[-1]
+    return line.split(" = ", 1)[1]
+
+
+def _single_pass(swift: str) -> bool:
+    """Nenhum filter/map ansioso seguido de outro (cada um alocaria um array)"""
+    return not re.search(r"(?<!lazy)\.(filter|map) \{[^{}]*\}\.(filter|map)", swift)
+
+
+# ===== UM GERADOR =====
+def test_plain_generator_maps_once():
+    assert _value("xs = [1, 2, 3]\nys = [x * 2 for x in xs]\n") == "xs.map { x in (x * 2) }"
+    assert _value("xs = [1, 2, 3]\nys = [x for x in xs]\n") == "Array(xs)"
+    assert _value(SQ + "ys = [sq(i) for i in range(10)]\n") == "(0..<10).map { i in sq(i) }"
+
+
+def test_filter_with_known_type_is_a_closure_loop_with_reserve_capacity():
+    value = _value("xs = [1, 2, 3]\nys = [x for x in xs if x > 1]\n")
+    assert value == ("{ () -> [Int] in var __result: [Int] = []; "
+                     "__result.reserveCapacity(xs.underestimatedCount); "
+                     "for x in xs where x > 1 { __result.append(x) }; return __result }()")
+
+
+def test_closure_loop_evaluates_a_computed_source_once():
+    value = _value(SQ + "ys = [sq(i) for i in range(10) if i % 2 == 0]\n")
+    assert "let __source = 0..<10; __result.reserveCapacity(__source.underestimatedCount); " in value
+    assert "for i in __source where (i % 2) == 0 { __result.append(sq(i)) }" in value
+
+
+def test_filter_with_unknown_type_is_a_lazy_chain():
+    value = _value("xs = [1, 2, 3]\nys = [x * 2 for x in xs if x > 1 if x < 3]\n")
+    assert value == "Array(xs.lazy.filter { x in x > 1 && x < 3 }.map { x in (x * 2) })"
+    assert _single_pass(value)
+
+
+# ===== VÁRIOS GERADORES =====
+def test_nested_generators_with_known_type_become_nested_loops():
+    value = _value(SQ + "ys = [sq(j) for i in range(3) for j in range(i) if j > 0]\n")
+    assert value == ("{ () -> [Int] in var __result: [Int] = []; "
+                     "for i in 0..<3 { for j in 0..<i where j > 0 { __result.append(sq(j)) } }; "
+                     "return __result }()")
+    # Sem um gerador único não há teto conhecido para o tamanho
+    assert "reserveCapacity" not in value
+
+
+def test_nested_generators_with_unknown_type_become_a_lazy_flat_map():
+    value = _value("ys = [i * j for i in range(3) for j in range(i) if j % 2 == 0]\n")
+    assert value == ("Array((0..<3).lazy.flatMap { i in (0..<i).lazy"
+                     ".filter { j in (j % 2) == 0 }.map { j in (i * j) } })")
+    value = _value("def g(z):\n    return z\n\nys = [(a, b) for a in g(1) if a for b in g(2)]\n")
+    assert value == "Array(g(1).lazy.filter { a in a }.flatMap { a in g(2).lazy.map { b in (a, b) } })"
+    assert _single_pass(value)
+
+
+def test_inner_comprehension_is_converted_inside_the_outer_one():
+    value = _value("ys = [[j for j in range(i)] for i in range(3)]\n")
+    assert value == "(0..<3).map { i in Array(0..<i) }"
+
+
+# ===== VINCULAÇÃO =====
+def test_targets_are_bound_by_name_not_by_text_replacement():
+    # x aparece dentro de xsum e de max_x: nenhum deles pode ser alterado
+    value = _value("xs = [1, 2, 3]\nxsum = 5\nmax_x = 2\nys = [x + xsum for x in xs if x != max_x]\n")
+    assert value == "Array(xs.lazy.filter { x in x != max_x }.map { x in (x + xsum) })"
+    assert "$0" not in value
+
+
+def test_tuple_targets_are_destructured():
+    assert _value("pairs = [(1, 2), (3, 4)]\nys = [a + b for a, b in pairs]\n") == \
+        "pairs.map { (a, b) in (a + b) }"
+
+
+def test_multiple_generators_are_converted_without_warnings():
+    out = transpile("xs = [1, 2]\nys = [x * y for x in xs for y in xs]\n")
+    assert "var ys = Array(xs.lazy.flatMap { x in xs.lazy.map { y in (x * y) } })" in out
+    assert "AVISOS" not in out
@@ -0,0 +1,94 @@
+"""Expressões muito profundas (código gerado por máquina) de ponta a ponta"""
+import ast
+import subprocess
+import sys
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+from py2swift import PyToSwiftTranspiler, UnsupportedFeatureError, transpile
+
+DEPTH = 100_000
+
+
+def _at(node: ast.AST, line: int) -> ast.AST:
+    node.lineno = node.end_lineno = line
+    node.col_offset = node.end_col_offset = 0
+    return node
+
+
+def _deep_module(depth: int, right: bool) -> ast.Module:
+    """a = 1; x = a + 0 + 1 + ... montado direto como AST (sem limite do parser)"""
+    expr = _at(ast.Name('a', ast.Load()), 2)
+    for i in range(depth):
+        constant = _at(ast.Constant(i), 2)
+        pair = (constant, expr) if right else (expr, constant)
+        expr = _at(ast.BinOp(pair[0], ast.Add(), pair[1]), 2)
+    init = _at(ast.Assign([_at(ast.Name('a', ast.Store()), 1)], _at(ast.Constant(1), 1)), 1)
+    return ast.Module(body=[init, _at(ast.Assign([_at(ast.Name('x', ast.Store()), 2)], expr), 2)],
+                      type_ignores=[])
+
+
+def test_long_sum_from_source():
+    swift = transpile("a = 1\nx = " + " + ".join(["a"] * 2_000) + "\n")
+    assert "x: Int = " in swift
+    assert swift.count(" + ") == 1_999
+
+
+_DEEPER_THAN_THE_PARSER = """
+import sys, threading
+from py2swift import transpile, UnsupportedFeatureError
+source = "a = 1\\nx = " + " + ".join(["a"] * 200_000) + "\\n"
+limit = sys.getrecursionlimit()
+def run():
+    try:
+        transpile(source)
+    except UnsupportedFeatureError as e:
+        print("erro:", e.feature)
+    assert sys.getrecursionlimit() == limit
+run()
+worker = threading.Thread(target=run)
+worker.start()
+worker.join()
+"""
+
+
+def test_source_deeper_than_the_parser_fails_cleanly():
+    """O dobro da profundidade dos testes com AST: erro limpo, sem derrubar o processo"""
+    done = subprocess.run([sys.executable, "-c", _DEEPER_THAN_THE_PARSER], capture_output=True, text=True,
+                          cwd=str(Path(__file__).resolve().parents[1]), timeout=120)
+    assert done.returncode == 0, done.stderr
+    assert done.stdout.count("erro: Expressão aninhada profundamente demais") == 2
+
+
+def test_parse_does_not_change_the_recursion_limit():
+    limit = sys.getrecursionlimit()
+    with pytest.raises(UnsupportedFeatureError):
+        transpile("x = " + " + ".join(["a"] * 50_000))
+    assert sys.getrecursionlimit() == limit
+
+
+@pytest.mark.parametrize('right', [False, True], ids=['esquerda', 'direita'])
+def test_deep_generated_ast(right):
+    swift = PyToSwiftTranspiler().generate(_deep_module(DEPTH, right))
+    assert "x: Int = " in swift
+    assert swift.count(" + ") == DEPTH
+
+
+def test_memory_grows_linearly_with_depth():
+    peaks = []
+    for depth in (5_000, 20_000):
+        module = _deep_module(depth, right=True)
+        tracemalloc.start()
+        try:
+            PyToSwiftTranspiler().generate(module)
+            peaks.append(tracemalloc.get_traced_memory()[1])
+        finally:
+            tracemalloc.stop()
+    assert peaks[1] / peaks[0] < 6, peaks  # 4x a profundidade; quadrático daria ~16x
+
+
+def test_nesting_beyond_the_c_parser_is_unsupported():
+    with pytest.raises(UnsupportedFeatureError):
+        transpile("x = " + "-" * 20_000 + "1")
@@ -0,0 +1,151 @@
+import pytest
+
+from py2swift import (IncrementalTranspiler, PyToSwiftTranspiler, UnsupportedFeatureError, transpile,
+                      transpile_with_source_map)
+
+BASE = ('def square(x: int) -> int:\n'
+        '    return x * x\n'
+        '\n'
+        'def total(n: int) -> int:\n'
+        '    s = 0\n'
+        '    for i in range(n):\n'
+        '        s += square(i)\n'
+        '    return s\n'
+        '\n'
+        'def greet(name: str) -> str:\n'
+        '    return "hi " + name\n'
+        '\n'
+        'LIMIT = 10\n'
+        'print(total(LIMIT))\n')
+
+ALL = ['square', 'total', 'greet', 'linha 13', 'linha 14']
+
+MUTUAL = ('\n'
+          'def even(n: int) -> bool:\n'
+          '    return n == 0 or odd(n - 1)\n'
+          '\n'
+          'def odd(n: int) -> bool:\n'
+          '    return n != 0 and even(n - 1)\n')
+
+
+def _update(inc: IncrementalTranspiler, source: str) -> str:
+    output = inc.update(source)
+    assert output == transpile(source)
+    assert inc.warnings == _warnings(source)
+    return output
+
+
+def _warnings(source: str) -> list:
+    tp = PyToSwiftTranspiler()
+    tp.generate(source)
+    return tp.warnings
+
+
+@pytest.fixture
+def inc():
+    inc = IncrementalTranspiler()
+    _update(inc, BASE)
+    assert inc.report.full and inc.report.reason == "primeira transpilação"
+    assert inc.report.transpiled == ALL and inc.report.reused == []
+    return inc
+
+
+# ===== EDIÇÕES =====
+def test_unchanged_source_reuses_everything(inc):
+    _update(inc, BASE)
+    assert inc.report.transpiled == [] and inc.report.reused == ALL
+    assert not inc.report.full
+
+
+def test_body_change_redoes_only_that_function(inc):
+    _update(inc, BASE.replace("return x * x", "return x * x + 1"))
+    assert inc.report.transpiled == ['square']
+    assert inc.report.reused == ['total', 'greet', 'linha 13', 'linha 14']
+    assert not inc.report.full and inc.report.waves == 1
+
+
+def test_signature_change_propagates_to_callers(inc):
+    source = BASE.replace("def square(x: int) -> int:", "def square(x: float) -> float:")
+    swift = _update(inc, source)
+    assert "func square(_x: Double) -> Double" in swift
+    # total chama square: a interface mudou, então ele é refeito na segunda onda
+    assert inc.report.transpiled == ['square', 'total']
+    assert inc.report.reused == ['greet', 'linha 13', 'linha 14']
+    assert inc.report.waves == 2
+
+
+def test_global_retype_redoes_its_users(inc):
+    swift = _update(inc, BASE.replace("LIMIT = 10", "LIMIT = 10.5"))
+    assert "10.5" in swift
+    assert inc.report.transpiled == ['linha 13', 'linha 14']
+    assert inc.report.reused == ['square', 'total', 'greet']
+
+
+def test_removing_and_readding_a_function(inc):
+    without = BASE.replace('def greet(name: str) -> str:\n    return "hi " + name\n\n', '')
+    swift = _update(inc, without)
+    assert "greet" not in swift
+    assert inc.report.transpiled == []
+    # Os comandos soltos subiram três linhas; o texto é o mesmo, então nada é refeito
+    assert inc.report.reused == ['square', 'total', 'linha 10', 'linha 11']
+    _update(inc, BASE)
+    assert inc.report.transpiled == ['greet']
+    assert inc.report.reused == ['square', 'total', 'linha 13', 'linha 14']
+
+
+def test_reordering_forces_a_full_run(inc):
+    square, total, greet, rest = BASE.split('\n\n')
+    _update(inc, '\n\n'.join([greet, square, total, rest]))
+    assert inc.report.full and inc.report.reason == "trechos reordenados"
+    assert inc.report.transpiled == ['greet', 'square', 'total', 'linha 13', 'linha 14']
+    assert inc.report.reused == []
+
+
+def test_mutual_recursion_is_always_transpiled_whole(inc):
+    # A análise parcial encontra a recursão mútua e tudo é refeito, nesta e nas próximas
+    _update(inc, BASE + MUTUAL)
+    assert inc.report.full and inc.report.reason == "recursão mútua"
+    assert inc.report.transpiled == ALL + ['even', 'odd'] and inc.report.reused == []
+    _update(inc, BASE.replace("return x * x", "return x + x") + MUTUAL)
+    assert inc.report.full and inc.report.reason == "recursão mútua"
+    assert inc.report.transpiled == ALL + ['even', 'odd'] and inc.report.reused == []
+    # Sem a recursão mútua, a atualização seguinte ainda é completa e volta a encher o cache
+    _update(inc, BASE)
+    assert inc.report.full and inc.report.reason == "recursão mútua"
+    _update(inc, BASE)
+    assert not inc.report.full and inc.report.reused == ALL
+
+
+def test_syntax_error_keeps_the_cache(inc):
+    with pytest.raises(UnsupportedFeatureError, match="Erro de sintaxe"):
+        inc.update(BASE.replace("return s\n", "return s +\n"))
+    assert inc.report.transpiled == [] and inc.report.reused == []
+    _update(inc, BASE.replace("return x * x", "return x * x + 1"))
+    assert inc.report.transpiled == ['square']
+    assert not inc.report.full
+
+
+def test_warnings_are_renumbered_with_their_unit(inc):
+    source = BASE.replace("    return s\n", "    return s\n    print(s)\n")
+    _update(inc, source)
+    assert any(w.startswith("Linha 9:") for w in inc.warnings)
+    # Uma linha a mais no topo: o aviso reaproveitado acompanha o trecho
+    _update(inc, "import math\n" + source)
+    assert any(w.startswith("Linha 10:") for w in inc.warnings)
+    assert 'total' in inc.report.reused
+
+
+# ===== SOURCE MAP E AVISOS DA ANÁLISE =====
+def test_source_map_matches_full_transpilation(inc):
+    source = BASE.replace("return x * x", "return x * x + 1")
+    _update(inc, source)
+    assert inc.source_map() == transpile_with_source_map(source)[1]
+
+
+def test_warning_sink_receives_each_warning_with_its_node():
+    received = []
+    tp = PyToSwiftTranspiler(warning_sink=lambda message, node: received.append((message, node)))
+    tp.generate(BASE.replace("    return s\n", "    return s\n    print(s)\n"))
+    assert [f"Linha {node.lineno}: {message}" for message, node in received] == tp.warnings
+    # O incremental usa o sink em vez de substituir lexer.warn
+    assert 'warn' not in vars(IncrementalTranspiler()._transpiler.lexer)
@@ -0,0 +1,286 @@
+import ast
+import math
+import re
+
+from py2swift import transpile
+from py2swift.ir import SWIFT_HELPERS, FloorDivMod, Membership, Power
+from py2swift.swift_types import DOUBLE, INT, STRING, set_of
+from py2swift.transpiler import PyToSwiftTranspiler
+from py2swift.type_inference import TypeInferencer
+
+
+def _membership_kinds(source: str):
+    """Estratégia escolhida pelo pass 'membership' para cada teste in/not in"""
+    tp = PyToSwiftTranspiler()
+    tp.generate(source)
+    return [node.kinds for node in tp._ir.replacements.values() if isinstance(node, Membership)]
+
+
+# ===== PERTINÊNCIA =====
+
+def test_set_literals_and_set_calls_are_inferred_as_sets():
+    inferencer = TypeInferencer()
+    inferencer.infer(ast.parse("a = {1, 2}\n"
+                               "b = set([1.5, 2.5])\n"
+                               "c = set(a)\n"
+                               "d = {'x', 'y'}\n"
+                               "e = {1, 'x'}\n"
+                               "f = set()\n"))
+    types = {name: inferencer.type_env.get('global', name) for name in 'abcdef'}
+    assert types['a'] is set_of(INT)
+    assert types['b'] is set_of(DOUBLE)
+    assert types['c'] is set_of(INT)
+    assert types['d'] is set_of(STRING)
+    # sem um tipo de elemento conhecido não há Set<T> válido
+    assert types['e'] is None or not types['e'].is_set
+    assert types['f'] is None or not types['f'].is_set
+
+
+def test_membership_in_sets_lowers_to_contains():
+    source = ("s = {1, 2, 3}\n"
+              "t = set([4, 5])\n"
+              "x = 2\n"
+              "print(x in s, x not in t)\n")
+    assert _membership_kinds(source) == [['contains'], ['contains']]
+    out = transpile(source)
+    assert "var s: Set<Int> = Set([1, 2, 3])" in out
+    assert "var t: Set<Int> = Set([4, 5])" in out
+    assert "print(s.contains(x), !(t.contains(x)))" in out
+
+
+def test_membership_in_lists_keeps_the_generic_lowering():
+    assert _membership_kinds("xs = [1, 2]\nx = 1\nprint(x in xs)\n") == []
+
+
+# ===== FATIAS =====
+
+def _slice_semantics(values, lower, upper):
+    """Simula em Python o código Swift de xs[-k:u]: prefix(u).dropFirst(max(0, count - k))"""
+    return values[:upper][max(0, len(values) - (-lower)):]
+
+
+def test_negative_lower_with_non_negative_upper():
+    out = transpile("s = 'hello world'\n"
+                    "words = ['a', 'b', 'c']\n"
+                    "n = 2\n"
+                    "print(s[-3:5], words[-2:5], words[-2:n])\n"
+                    "a = s[-3:5]\n"
+                    "b = words[-2:5]\n")
+    assert "-(3)..<" not in out and "-(2)..<" not in out
+    assert "s.prefix(5).dropFirst(max(0, s.count - 3))" in out
+    assert "words.prefix(5).dropFirst(max(0, words.count - 2))" in out
+    assert "words.prefix(n).dropFirst(max(0, words.count - 2))" in out
+    assert "var a: String = String(s.prefix(5).dropFirst(max(0, s.count - 3)))" in out
+    assert "var b: [String] = Array(words.prefix(5).dropFirst(max(0, words.count - 2)))" in out
+
+
+def test_negative_lower_lowering_matches_python():
+    for length in range(8):
+        values = list(range(length))
+        for lower in range(-9, 0):
+            for upper in range(10):
+                assert _slice_semantics(values, lower, upper) == values[lower:upper]
+
+
+def test_other_mixed_sign_slices_are_unchanged():
+    out = transpile("s = 'hello'\nprint(s[1:-1], s[-3:-1], s[-2:])\n")
+    assert "s.dropFirst(1).dropLast(1)" in out
+    assert "s.suffix(3).dropLast(1)" in out
+    assert "s.suffix(2)" in out
+
+
+def test_negative_lower_on_a_call_warns_about_double_evaluation():
+    tp = PyToSwiftTranspiler()
+    out = tp.generate("def g():\n    return [1, 2, 3]\n\nc = g()[-2:1]\n")
+    assert "g().prefix(1).dropFirst(max(0, g().count - 2))" in out
+    assert any("avalia o valor duas vezes" in w for w in tp.warnings)
+
+
+# ===== DIVISÃO INTEIRA E MÓDULO =====
+
+def _run_helper(name: str, a, b):
+    """Executa em Python o texto Swift do helper (/ e % truncam, como em Swift)"""
+    def tdiv(x, y):
+        q = abs(x) // abs(y)
+        return q if (x < 0) == (y < 0) else -q
+
+    def trem(x, y):
+        return x - tdiv(x, y) * y
+
+    env = {'a': a, 'b': b, 'tdiv': tdiv, 'trem': trem, 'fmod': math.fmod}
+    for line in SWIFT_HELPERS[name][1:-1]:
+        line = line.strip()
+        line = line.replace("a.truncatingRemainder(dividingBy: b)", "fmod(a, b)")
+        line = re.sub(r"\b(\w+) / (\w+)\b", r"tdiv(\1, \2)", line)
+        line = re.sub(r"\b(\w+) % (\w+)\b", r"trem(\1, \2)", line)
+        line = line.replace("&&", "and")
+        ternary = re.fullmatch(r"return \((.*)\) \? (.*) : (.*)", line)
+        if ternary:
+            condition, then, otherwise = ternary.groups()
+            return eval(f"({then}) if ({condition}) else ({otherwise})", env)
+        name_, value = re.fullmatch(r"let (\w+) = (.*)", line).groups()
+        env[name_] = eval(value, env)
+    raise AssertionError("helper sem return")
+
+
+def test_int_helpers_match_python_with_negative_operands():
+    for a in range(-12, 13):
+        for b in (-5, -3, -2, -1, 1, 2, 3, 5):
+            assert _run_helper('pyFloorDiv', a, b) == a // b
+            assert _run_helper('pyMod', a, b) == a % b
+
+
+def test_double_mod_helper_matches_python_with_negative_operands():
+    for a in (-7.5, -3.0, -0.5, 0.0, 0.5, 3.0, 7.5):
+        for b in (-2.5, -2.0, 2.0, 2.5):
+            assert _run_helper('pyModDouble', a, b) == a % b
+
+
+def test_floor_division_lowering_by_operand_type():
+    out = transpile("def f(a: int, b: int, x: float):\n"
+                    "    q = a // b\n"
+                    "    r = a % b\n"
+                    "    d = x // 2\n"
+                    "    m = x % 2.5\n"
+                    "    n = a % x\n"
+                    "    a //= 2\n"
+                    "    x %= 2.0\n"
+                    "    return q\n")
+    assert "pyFloorDiv(a, b)" in out and "pyMod(a, b)" in out
+    assert "(x / 2).rounded(.down)" in out
+    assert "pyMod(x, 2.5)" in out
+    # Int com Double: o operando Int é convertido
+    assert "pyMod(Double(a), x)" in out
+    assert "a = pyFloorDiv(a, 2)" in out and "x = pyMod(x, 2.0)" in out
+
+
+def test_negative_literal_operands_use_the_helpers():
+    out = transpile("c = -7 // 2\nd = 7 % -3\n")
+    assert "pyFloorDiv(-(7), 2)" in out
+    assert "pyMod(7, -(3))" in out
+
+
+def test_unknown_operand_types_keep_the_generic_conversion():
+    tp = PyToSwiftTranspiler()
+    out = tp.generate("def g(z):\n    return z\n\nw = g(3) // 2\nk = g(3) % 2\ns = '%d' % 3\n")
+    assert "Int(Double(g(3)) / Double(2))" in out
+    assert "(g(3) % 2)" in out and '("%d" % 3)' in out
+    assert not any(isinstance(node, FloorDivMod) for node in tp._ir.replacements.values())
+    assert "pyFloorDiv" not in out and "pyMod" not in out
+
+
+def test_helpers_are_emitted_only_when_used():
+    def declared(out):
+        return [line for line in out.split("\n") if line.startswith("func py")]
+
+    assert declared(transpile("x = 7 // 2\n")) == ["func pyFloorDiv(_ a: Int, _ b: Int) -> Int {"]
+    assert declared(transpile("x = 7 % 2\n")) == ["func pyMod(_ a: Int, _ b: Int) -> Int {"]
+    assert declared(transpile("x = 7.5 % 2\n")) == ["func pyMod(_ a: Double, _ b: Double) -> Double {"]
+    # Double // não precisa de helper
+    assert declared(transpile("x = 7.5 // 2\n")) == []
+    assert declared(transpile("x = 7 + 2\n")) == []
+    # Vários usos: uma declaração cada, na ordem de SWIFT_HELPERS
+    out = transpile("x = 7 % 2\ny = 8 // 3\nz = x % y\n")
+    assert declared(out) == ["func pyFloorDiv(_ a: Int, _ b: Int) -> Int {",
+                             "func pyMod(_ a: Int, _ b: Int) -> Int {"]
+
+
+# ===== POTÊNCIAS =====
+
+def _run_int_pow(base: int, exponent: int) -> int:
+    """Simula em Python o laço do pyIntPow (exponenciação por quadrados)"""
+    result, b, e = 1, base, exponent
+    while e > 0:
+        if e & 1 == 1:
+            result *= b
+        e >>= 1
+        if e > 0:
+            b *= b
+    return result
+
+
+def test_constant_powers_are_folded():
+    tp = PyToSwiftTranspiler()
+    out = tp.generate("a = 2 ** 10\nb = (-3) ** 3\nc = 1 ** 1000\nd = (-1) ** 999\ne = 2 ** 62\n")
+    assert "var a: Int = 1024" in out
+    assert "var b: Int = (-27)" in out
+    assert "var c: Int = 1" in out
+    assert "var d: Int = (-1)" in out
+    assert f"var e: Int = {2 ** 62}" in out
+    assert "pyIntPow" not in out and "pow(" not in out
+    assert tp.warnings == []
+
+
+def test_constant_overflow_warns_and_keeps_the_helper():
+    tp = PyToSwiftTranspiler()
+    out = tp.generate("a = 2 ** 63\nb = 10 ** 100\nc = (-2) ** 63\n")
+    assert "pyIntPow(2, 63)" in out and "pyIntPow(10, 100)" in out
+    assert tp.warnings == ["Linha 1: 2 ** 63 excede o limite de Int (64 bits)",
+                           "Linha 2: 10 ** 100 excede o limite de Int (64 bits)"]
+    # -2 ** 63 é exatamente Int.min
+    assert f"({-2 ** 63})" in out
+
+
+def test_small_exponents_are_unrolled_up_to_four():
+    out = transpile("def f(a: int, x: float):\n"
+                    "    u0 = a ** 0\n"
+                    "    u1 = a ** 1\n"
+                    "    u2 = x ** 2\n"
+                    "    u3 = a ** 3\n"
+                    "    u4 = a ** 4\n"
+                    "    u5 = a ** 5\n"
+                    "    d0 = x ** 0\n"
+                    "    a **= 3\n"
+                    "    return a\n")
+    assert "var u0: Int = 1" in out
+    assert "var u1: Int = a" in out
+    assert "var u2: Double = (x * x)" in out
+    assert "(a * a * a)" in out
+    assert "var u4: Int = (a * a * a * a)" in out
+    assert "var u5: Int = pyIntPow(a, 5)" in out
+    assert "var d0: Double = 1.0" in out
+    assert "a = (a * a * a)" in out
+
+
+def test_only_simple_bases_are_unrolled():
+    out = transpile("def g(n: int) -> int:\n    return n\n\ny = g(2) ** 2\n")
+    # Repetir a chamada avaliaria g duas vezes
+    assert "pyIntPow(g(2), 2)" in out
+
+
+def test_int_power_uses_pyIntPow():
+    out = transpile("def f(a: int, b: int):\n    p = a ** b\n    a **= b\n    return p\n")
+    assert "var p: Int = pyIntPow(a, b)" in out
+    assert "a = pyIntPow(a, b)" in out
+    assert out.count("func pyIntPow(") == 1
+    # O laço simulado por _run_int_pow é o do helper
+    assert [line.strip() for line in SWIFT_HELPERS['pyIntPow'][5:10]] == [
+        "while e > 0 {", "if e & 1 == 1 { result *= b }", "e >>= 1", "if e > 0 { b *= b }", "}"]
+    for base in range(-5, 6):
+        for exponent in range(0, 12):
+            assert _run_int_pow(base, exponent) == base ** exponent
+
+
+def test_double_operands_use_pow():
+    out = transpile("def f(a: int, b: int, x: float):\n"
+                    "    d = x ** b\n"
+                    "    h = a ** 0.5\n"
+                    "    return d\n")
+    assert "var d: Double = pow(x, Double(b))" in out
+    assert "var h: Double = pow(Double(a), 0.5)" in out
+    assert "pyIntPow" not in out
+
+
+def test_negative_exponents_produce_double():
+    out = transpile("def f(a: int):\n    n = a ** -2\n    return n\n\nm = 2 ** -1\n")
+    assert "var n: Double = pow(Double(a), -(2))" in out
+    assert "pow(2, -(1))" in out
+    assert "pyIntPow" not in out
+
+
+def test_unknown_operands_keep_the_generic_conversion():
+    tp = PyToSwiftTranspiler()
+    out = tp.generate("def g(z):\n    return z\n\nw = g(3) ** g(2)\n")
+    assert "pow(g(3), g(2))" in out
+    assert not any(isinstance(node, Power) for node in tp._ir.replacements.values())
+    assert "pyIntPow" not in out
@@ -0,0 +1,175 @@
+import warnings
+
+import pytest
+
+from py2swift import lowerings, transpile
+from py2swift.lowerings import (lookup_builtin, lookup_import, lookup_method, register_builtin,
+                                register_import, register_method, register_provider)
+
+
+@pytest.fixture(autouse=True)
+def registry():
+    """Restaura o registro (e o estado dos provedores) depois de cada teste"""
+    tables = (lowerings.BUILTIN_LOWERINGS, lowerings.METHOD_LOWERINGS,
+              lowerings.IMPORT_LOWERINGS, lowerings._RECEIVER_METHODS)
+    saved = [table.copy() for table in tables]
+    pending = list(lowerings._pending_providers)
+    flags = (lowerings._providers_loaded, lowerings._entry_points_scanned)
+    lowerings.load_providers()
+    yield
+    for table, copy in zip(tables, saved):
+        table.clear()
+        table.update(copy)
+    lowerings._pending_providers[:] = pending
+    lowerings._providers_loaded, lowerings._entry_points_scanned = flags
+
+
+def _body(swift: str) -> list:
+    """Linhas após o cabeçalho"""
+    return swift.split("\n")[5:]
+
+
+# ===== REGISTRO =====
+def test_custom_builtin_is_used_by_the_transpiler():
+    @register_builtin('clamp', 3)
+    def _clamp(tp, node, args):
+        return f"min(max({args[0]}, {args[1]}), {args[2]})"
+
+    swift = transpile("y = clamp(5, 0, 3)\n")
+    assert "min(max(5, 0), 3)" in swift
+    # Outra aridade não tem conversão: a chamada passa como está
+    assert "clamp(5, 0)" in transpile("y = clamp(5, 0)\n")
+
+
+def test_custom_method_and_import():
+    @register_method('title', 0, receiver='String')
+    def _title(tp, node, obj, args):
+        return f"{obj}.capitalized"
+
+    @register_import('numpy')
+    def _numpy(tp, node, alias):
+        return "import Accelerate"
+
+    swift = transpile('import numpy\ns = "ab"\nt = s.title()\n')
+    assert "import Accelerate" in _body(swift)
+    assert "s.capitalized" in swift
+    assert lowerings.has_receiver_lowerings('title')
+
+
+# ===== PRIORIDADE =====
+def test_exact_arity_wins_over_any_arity():
+    exact = register_builtin('pick', 2)(lambda tp, node, args: "exact")
+    anything = register_builtin('pick')(lambda tp, node, args: "any")
+    assert lookup_builtin('pick', 2) is exact
+    assert lookup_builtin('pick', 1) is anything
+    assert lookup_builtin('pick', 5) is anything
+    assert lookup_builtin('nothing_registered', 1) is None
+
+
+def test_receiver_specific_wins_over_generic():
+    generic = register_method('shout')(lambda tp, node, obj, args: "generic")
+    for_string = register_method('shout', 0, receiver='String')(lambda tp, node, obj, args: "string")
+    assert lookup_method('shout', 0, 'String') is for_string
+    # Com outra aridade não há conversão de String: vale a genérica
+    assert lookup_method('shout', 1, 'String') is generic
+    assert lookup_method('shout', 0, 'Array') is generic
+    assert lookup_method('shout', 0) is generic
+
+
+def test_module_functions_do_not_fall_back_to_generic_methods():
+    register_method('shout')(lambda tp, node, obj, args: "generic")
+    assert lookup_method('shout', 0, 'module:math') is None
+    sqrt = register_method('sqrt', 1, receiver='module:math')(
+        lambda tp, node, obj, args: f"({args[0]}).squareRoot()")
+    assert lookup_method('sqrt', 1, 'module:math') is sqrt
+    assert "(2.0).squareRoot()" in transpile("import math\nx = math.sqrt(2.0)\n")
+
+
+def test_registering_again_overrides_builtin():
+    original = lookup_builtin('len', 1)
+    assert "xs.count" in transpile("xs = [1, 2]\nn = len(xs)\n")
+
+    @register_builtin('len', 1)
+    def _len(tp, node, args):
+        return f"{args[0]}.endIndex"
+
+    assert lookup_builtin('len', 1) is _len is not original
+    assert "xs.endIndex" in transpile("xs = [1, 2]\nn = len(xs)\n")
+
+
+# ===== PROVEDORES =====
+class _FakeEntryPoint:
+    def __init__(self, name, loaded):
+        self.name = name
+        self.value = f"fake.{name}:provide"
+        self._loaded = loaded
+        self.loads = 0
+
+    def load(self):
+        self.loads += 1
+        return self._loaded
+
+
+def _mock_entry_points(monkeypatch, eps):
+    import importlib.metadata
+    groups = []
+
+    def entry_points(group):
+        groups.append(group)
+        return eps
+
+    monkeypatch.setattr(importlib.metadata, 'entry_points', entry_points)
+    lowerings._entry_points_scanned = False
+    lowerings._providers_loaded = False
+    return groups
+
+
+def test_entry_point_provider_is_loaded_lazily_and_once(monkeypatch):
+    calls = []
+
+    def provide():
+        calls.append(True)
+        register_builtin('cube', 1)(lambda tp, node, args: f"({args[0]} * {args[0]} * {args[0]})")
+
+    ep = _FakeEntryPoint('cube', provide)
+    groups = _mock_entry_points(monkeypatch, [ep])
+    assert calls == []
+    assert "(3 * 3 * 3)" in transpile("y = cube(3)\n")
+    assert groups == [lowerings.ENTRY_POINT_GROUP]
+    assert calls == [True]
+    transpile("y = cube(4)\n")
+    assert ep.loads == 1 and calls == [True]
+
+
+def test_entry_point_provider_overrides_builtins_in_name_order(monkeypatch):
+    def first():
+        register_builtin('len', 1)(lambda tp, node, args: "first")
+
+    def second():
+        register_builtin('len', 1)(lambda tp, node, args: "second")
+
+    # Carregados em ordem de nome: o último a registrar prevalece
+    _mock_entry_points(monkeypatch, [_FakeEntryPoint('b_second', second), _FakeEntryPoint('a_first', first)])
+    assert lookup_builtin('len', 1)(None, None, ["xs"]) == "second"
+
+
+def test_failing_provider_warns_and_is_skipped(monkeypatch):
+    def broken():
+        raise ImportError("no module named fake")
+
+    good = _FakeEntryPoint('good', lambda: register_import('fakemod')(lambda tp, node, alias: "import Fake"))
+    _mock_entry_points(monkeypatch, [_FakeEntryPoint('broken', broken), good])
+    with pytest.warns(RuntimeWarning, match="broken"):
+        assert lookup_import('fakemod') is not None
+
+
+def test_register_provider_runs_on_next_lookup():
+    calls = []
+    register_provider(lambda: calls.append(True))
+    assert calls == []
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        lookup_builtin('print', 1)
+    assert calls == [True]
+    lookup_builtin('print', 1)
+    assert calls == [True]
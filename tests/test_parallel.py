@@ -0,0 +1,65 @@
+import multiprocessing
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import py2swift.transpiler as transpiler_module
+from py2swift.transpiler import PyToSwiftTranspiler
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def _module(definitions):
+    return "\n".join(f"def f{i}(a: int, b: int):\n"
+                     f"    x = a // b + a % b ** 3\n"
+                     f"    return x + f{max(i - 1, 0)}(a, b)\n"
+                     for i in range(definitions)) + "\nprint(f3(7, 2))\n"
+
+
+@pytest.fixture
+def few_definitions(monkeypatch):
+    monkeypatch.setattr(PyToSwiftTranspiler, 'PARALLEL_MIN_DEFINITIONS', 4)
+    return _module(40)
+
+
+@pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(), reason="requer fork")
+def test_parallel_emission_matches_serial(monkeypatch, few_definitions):
+    monkeypatch.setattr(transpiler_module, 'fork_available', lambda: True)
+    started = []
+    real = transpiler_module.ParallelEmission
+
+    def tracked(*args, **kwargs):
+        started.append(True)
+        return real(*args, **kwargs)
+
+    monkeypatch.setattr(transpiler_module, 'ParallelEmission', tracked)
+    serial = PyToSwiftTranspiler(record_origins=True)
+    expected = serial.generate(few_definitions)
+    tp = PyToSwiftTranspiler(workers=3, record_origins=True)
+    assert tp.generate(few_definitions) == expected
+    assert started == [True]
+    assert tp.warnings == serial.warnings
+    assert tp.line_origins == serial.line_origins
+
+
+def test_without_fork_emission_is_serial(monkeypatch, few_definitions):
+    monkeypatch.setattr(transpiler_module, 'fork_available', lambda: False)
+
+    def no_pool(*args, **kwargs):
+        raise AssertionError("emissão paralela iniciada sem fork")
+
+    monkeypatch.setattr(transpiler_module, 'ParallelEmission', no_pool)
+    expected = PyToSwiftTranspiler().generate(few_definitions)
+    assert PyToSwiftTranspiler(workers=3).generate(few_definitions) == expected
+
+
+def test_fork_check_does_not_pin_the_start_method():
+    code = ("import multiprocessing\n"
+            "from py2swift.parallel import fork_available\n"
+            "fork_available()\n"
+            "print(multiprocessing.get_start_method(allow_none=True))\n")
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                         cwd=str(REPO_ROOT))
+    assert out.stdout.strip() == "None"
@@ -0,0 +1,110 @@
+import ast
+
+import pytest
+
+from py2swift import PyToSwiftTranspiler, tracing
+from py2swift.__main__ import main
+from py2swift.ir import DEFAULT_PASSES
+from py2swift.passes import AnalysisPassManager, OptimizationPassManager
+
+PASS_NAMES = [name for name, _, _ in DEFAULT_PASSES]
+
+PROGRAM = ("def f(a: int, b: int) -> int:\n"
+           "    xs = [a, b]\n"
+           "    xs[0], xs[1] = xs[1], xs[0]\n"
+           "    for i in range(3):\n"
+           "        a //= 2\n"
+           "    if a in [1, 2]:\n"
+           "        return a ** 2\n"
+           "    return b % 3\n"
+           "    print(a)\n")
+
+# Nós candidatos de cada pass em PROGRAM
+CANDIDATES = {'dead_code': 2, 'swap': 2, 'range_for': 1, 'floor_division': 3,
+              'power': 3, 'membership': 1, 'slice': 4}
+
+
+def _traced(tp: PyToSwiftTranspiler, source: str = PROGRAM):
+    events = []
+    tracing.subscribe(events.append)
+    try:
+        swift = tp.generate(source)
+    finally:
+        tracing.unsubscribe(events.append)
+    return swift, events
+
+
+# ===== EVENTOS E TEMPOS =====
+def test_passes_are_traced_in_order_inside_optimize():
+    swift, events = _traced(PyToSwiftTranspiler())
+    names = [e.name for e in events if e.kind in (tracing.PHASE_START, tracing.PHASE_END)]
+    inner = names[names.index('optimize') + 1:len(names) - 1 - names[::-1].index('optimize')]
+    expected = []
+    for name in PASS_NAMES:
+        expected += [f"opt:{name}", f"opt:{name}"]
+    assert inner == expected
+    starts = [e for e in events if e.kind == tracing.PHASE_START and e.name.startswith('opt:')]
+    ends = [e for e in events if e.kind == tracing.PHASE_END and e.name.startswith('opt:')]
+    assert {e.name[4:]: e.data['candidates'] for e in starts} == CANDIDATES
+    assert [e.data for e in ends] == [e.data for e in starts]
+    assert all(e.duration >= 0 for e in ends)
+    assert "xs.swapAt(0, 1)" in swift
+
+
+def test_timings_cover_the_enabled_passes():
+    tp = PyToSwiftTranspiler()
+    tp.generate(PROGRAM)
+    assert list(tp.pass_timings) == PASS_NAMES
+    assert all(t >= 0 for t in tp.pass_timings.values())
+    tp.reset()
+    assert tp.pass_timings == {}
+
+
+# ===== PASSES DESABILITADOS =====
+def test_disabled_passes_do_not_run():
+    tp = PyToSwiftTranspiler(disabled_passes=['swap', 'power'])
+    swift, events = _traced(tp)
+    traced = [e.name for e in events if e.kind == tracing.PHASE_START and e.name.startswith('opt:')]
+    assert traced == [f"opt:{name}" for name in PASS_NAMES if name not in ('swap', 'power')]
+    assert 'swap' not in tp.pass_timings and 'power' not in tp.pass_timings
+    assert "swapAt" not in swift
+    assert "pyIntPow" not in swift and "(a * a)" not in swift
+    # Os demais continuam valendo
+    assert "pyFloorDiv(a, 2)" in swift
+
+
+def test_unknown_pass_names_are_rejected():
+    with pytest.raises(ValueError, match="Passes desconhecidos: bogus, nope"):
+        PyToSwiftTranspiler(disabled_passes=['swap', 'nope', 'bogus'])
+
+
+def test_cli_disable_passes(tmp_path, capsys):
+    src = tmp_path / "prog.py"
+    src.write_text(PROGRAM, encoding="utf-8")
+    assert main([str(src), "-", "--disable-passes", "swap"]) == 0
+    assert "swapAt" not in capsys.readouterr().out
+    assert main([str(src), "-", "--disable-passes", "swap,bogus"]) == 1
+    out = capsys.readouterr().out
+    assert "Passes desconhecidos: bogus" in out and "func f" not in out
+
+
+# ===== GERENCIADOR =====
+def test_manager_collects_candidates_in_preorder_and_reports_each_pass():
+    tree = ast.parse("x = 1 + 2 * 3\ny = x - 1\n")
+    seen = {}
+    manager = OptimizationPassManager(disabled=['names'])
+    manager.register('binops', (ast.BinOp,),
+                     lambda program, tp, candidates: seen.setdefault('binops', candidates))
+    manager.register('names', (ast.Name,), lambda program, tp, candidates: seen.setdefault('names', candidates))
+    assert manager.names == ['binops', 'names']
+    front_end = AnalysisPassManager()
+    manager.register_collectors(front_end)
+    front_end.run(tree)
+    finished = []
+    manager.run(None, None, finished.append)
+    assert finished == ['binops']
+    assert 'names' not in seen and list(manager.timings) == ['binops']
+    ops = [type(node.op).__name__ for node, parent, scope in seen['binops']]
+    assert ops == ['Add', 'Mult', 'Sub']
+    # O pai de 2 * 3 é a soma
+    assert seen['binops'][1][1] is seen['binops'][0][0]
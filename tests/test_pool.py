@@ -0,0 +1,65 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from py2swift import TranspileError, TranspilerPool, transpile
+
+SOURCES = [
+    "x = 1\nprint(x + 2)\n",
+    "def add(a, b):\n    return a + b\n\nprint(add(1, 2))\n",
+    "def total(xs):\n    s = 0\n    for v in xs:\n        s += v\n    return s\n\nprint(total([1, 2, 3]))\n",
+    "class A:\n    def __init__(self, n):\n        self.n = n\n\n    def twice(self):\n        return self.n * 2\n\nprint(A(3).twice())\n",
+    "words = ['a', 'b']\nprint(', '.join(w.upper() for w in words))\n",
+    "def f(n):\n    if n <= 1:\n        return 1\n    return n * f(n - 1)\n\nprint(f(5), 7 // 2, 2 ** 8)\n",
+    "d = {'k': 1}\nprint(d.get('k', 0), 'k' in d)\n",
+    "s = 'hello'\nprint(s[1:3], s[::-1], len(s))\n",
+]
+BROKEN = "def f(:\n    pass\n"
+
+
+def _outcome(call, source):
+    try:
+        return call(source)
+    except TranspileError as e:
+        return (type(e), str(e))
+
+
+def test_shared_pool_matches_serial_under_contention():
+    expected = {source: _outcome(transpile, source) for source in SOURCES + [BROKEN]}
+    pool = TranspilerPool(size=3)
+    jobs = (SOURCES + [BROKEN]) * 40
+    start = threading.Barrier(16)
+
+    def worker(chunk):
+        start.wait()
+        results = [(source, _outcome(pool.transpile, source)) for source in chunk]
+        # Streaming também empresta e devolve instâncias
+        results += [(source, "".join(pool.iter_transpile(source))) for source in SOURCES]
+        return results
+
+    chunks = [jobs[i::16] for i in range(16)]
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        results = [r for part in executor.map(worker, chunks) for r in part]
+
+    assert len(results) == len(jobs) + 16 * len(SOURCES)
+    for source, output in results:
+        assert output == expected[source]
+    assert pool.created <= 3
+    assert pool.borrows == len(results)
+
+
+def test_borrows_count_only_successful_checkouts():
+    pool = TranspilerPool(size=1)
+    with pool.borrow():
+        with pytest.raises(TimeoutError):
+            pool.acquire(timeout=0.01)
+    assert pool.borrows == 1
+
+    def failing_factory():
+        raise RuntimeError("sem instância")
+
+    failing = TranspilerPool(size=1, factory=failing_factory)
+    with pytest.raises(RuntimeError):
+        failing.acquire()
+    assert failing.borrows == 0 and failing.created == 0
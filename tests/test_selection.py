@@ -0,0 +1,90 @@
+import ast
+
+import pytest
+
+from py2swift import TranspileError, transpile
+from py2swift.__main__ import main
+from py2swift.selection import dependency_closure
+
+MODULE = """import math
+
+SCALE = 3
+UNUSED = 99
+
+class Base:
+    def value(self):
+        return SCALE
+
+class Point(Base):
+    def norm(self):
+        return math.sqrt(helper(SCALE))
+
+def helper(n):
+    return leaf(n) * 2
+
+def leaf(n):
+    return n + SCALE
+
+def unrelated():
+    return UNUSED
+
+def uses_point():
+    return Point()
+"""
+
+
+def _names(statements):
+    names = []
+    for stmt in statements:
+        if isinstance(stmt, (ast.FunctionDef, ast.ClassDef)):
+            names.append(stmt.name)
+        elif isinstance(stmt, ast.Assign):
+            names.extend(t.id for t in stmt.targets)
+        else:
+            names.extend(alias.name for alias in stmt.names)
+    return names
+
+
+def _closure(*names):
+    return _names(dependency_closure(ast.parse(MODULE).body, names))
+
+
+def test_transitive_callees_and_globals_are_included_in_source_order():
+    assert _closure('helper') == ['SCALE', 'helper', 'leaf']
+
+
+def test_classes_bring_their_bases_methods_dependencies_and_imports():
+    assert _closure('uses_point') == ['math', 'SCALE', 'Base', 'Point', 'helper', 'leaf', 'uses_point']
+
+
+def test_unrelated_definitions_are_left_out():
+    assert 'unrelated' not in _closure('Point') and 'UNUSED' not in _closure('Point')
+    assert _closure('unrelated') == ['UNUSED', 'unrelated']
+
+
+def test_only_emits_just_the_closure():
+    swift = transpile(MODULE, only=['helper'])
+    assert "func helper(" in swift and "func leaf(" in swift
+    assert "func unrelated(" not in swift and "class Point" not in swift
+    assert swift == transpile(MODULE, only='helper')
+
+
+def test_unknown_names_give_a_clear_error(tmp_path, capsys):
+    with pytest.raises(TranspileError) as info:
+        transpile(MODULE, only=['helper', 'missing', 'nope'])
+    assert str(info.value) == "Símbolos não encontrados no nível superior: missing, nope"
+    src = tmp_path / "mod.py"
+    src.write_text(MODULE, encoding="utf-8")
+    assert main([str(src), str(tmp_path / "out.swift"), "--only", "missing"]) == 1
+    assert "Símbolos não encontrados no nível superior: missing" in capsys.readouterr().out
+    assert not (tmp_path / "out.swift").exists()
+    assert not (tmp_path / "out.swift.tmp").exists()
+
+
+def test_cli_only_flag(tmp_path):
+    src = tmp_path / "mod.py"
+    src.write_text(MODULE, encoding="utf-8")
+    out = tmp_path / "out.swift"
+    assert main([str(src), str(out), "--only", "leaf,Base"]) == 0
+    swift = out.read_text(encoding="utf-8")
+    assert "func leaf(" in swift and "class Base" in swift and "func helper(" not in swift
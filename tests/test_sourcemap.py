@@ -0,0 +1,97 @@
+import json
+
+import pytest
+
+from py2swift import PyToSwiftTranspiler, transpile_with_source_map
+from py2swift.__main__ import main
+from py2swift.sourcemap import build_source_map, decode_vlq, encode_vlq, original_positions
+
+SOURCE = ("def f(x: int) -> int:\n"
+          "    return x + 1\n"
+          "\n"
+          "y = f(2)\n"
+          "print(y)\n")
+
+HEADER = 5  # import Foundation, linha vazia, dois comentários, linha vazia
+
+
+# ===== VLQ =====
+@pytest.mark.parametrize("value, encoded", [(0, "A"), (1, "C"), (-1, "D"), (15, "e"),
+                                            (16, "gB"), (123, "2H"), (-123, "3H")])
+def test_vlq_known_values(value, encoded):
+    assert encode_vlq(value) == encoded
+    assert decode_vlq(encoded) == [value]
+
+
+def test_vlq_round_trip():
+    values = [0, 1, -1, 31, -32, 1023, -1024, 2 ** 20, -(2 ** 31)]
+    for value in values:
+        assert decode_vlq(encode_vlq(value)) == [value]
+    # Vários valores concatenados num segmento
+    assert decode_vlq("".join(map(encode_vlq, values))) == values
+
+
+# ===== MAPA V3 =====
+def test_v3_map_known_mappings():
+    swift, source_map = transpile_with_source_map(SOURCE, "f.swift", "f.py")
+    lines = swift.split("\n")
+    assert source_map["version"] == 3
+    assert source_map["file"] == "f.swift"
+    assert source_map["sources"] == ["f.py"]
+    # Cabeçalho sem origem; depois deltas de linha/coluna relativos ao segmento anterior
+    assert source_map["mappings"] == ";;;;;AAAA;AACI;AADJ;AAGA;AACA"
+
+    positions = original_positions(source_map)
+    assert positions[:HEADER] == [None] * HEADER
+    assert lines[HEADER] == "func f(_x: Int) -> Int {"
+    assert positions[HEADER] == (1, 0)
+    assert lines[HEADER + 1].strip() == "return (x + 1)"
+    assert positions[HEADER + 1] == (2, 4)
+    assert lines[HEADER + 2] == "}"
+    assert positions[HEADER + 2] == (1, 0)
+    assert lines[HEADER + 3].startswith("var y")
+    assert positions[HEADER + 3] == (4, 0)
+    assert positions[HEADER + 4] == (5, 0)
+
+
+def test_columns_count_characters_not_bytes():
+    source = "s = 'ção'; t = 1\n"
+    tp = PyToSwiftTranspiler(record_origins=True)
+    tp.generate(source)
+    # O ast conta 13 bytes até o t; o mapa usa 11 caracteres
+    assert tp.line_origins[-1] == (1, 13)
+    assert original_positions(tp.source_map())[-1] == (1, 11)
+
+
+def test_include_source_embeds_python_code():
+    source_map = build_source_map([None, (1, 0)], source_text=SOURCE, include_source=True)
+    assert source_map["sourcesContent"] == [SOURCE]
+    assert "sourcesContent" not in build_source_map([None, (1, 0)], source_text=SOURCE)
+
+
+# ===== REGISTRO DAS ORIGENS =====
+def test_origins_are_not_recorded_by_default():
+    tp = PyToSwiftTranspiler()
+    tp.generate(SOURCE)
+    assert tp.line_origins == []
+    with pytest.raises(ValueError, match="record_origins"):
+        tp.source_map()
+
+
+def test_streamed_map_matches_whole_generation():
+    expected = transpile_with_source_map(SOURCE)[1]
+    tp = PyToSwiftTranspiler(record_origins=True)
+    chunks = list(tp.iter_generate(SOURCE))
+    assert len(tp.line_origins) == "".join(chunks).count("\n")
+    assert tp.source_map() == expected
+
+
+def test_cli_writes_source_map(tmp_path):
+    inp = tmp_path / "f.py"
+    inp.write_text(SOURCE, encoding="utf-8")
+    map_path = tmp_path / "f.swift.map"
+    assert main([str(inp), str(tmp_path / "f.swift"), "--source-map", str(map_path)]) == 0
+    source_map = json.loads(map_path.read_text(encoding="utf-8"))
+    assert source_map["file"] == "f.swift"
+    assert source_map["sources"] == ["f.py"]
+    assert source_map["mappings"] == transpile_with_source_map(SOURCE)[1]["mappings"]
@@ -0,0 +1,104 @@
+import ast
+import pickle
+import tracemalloc
+
+import pytest
+
+from py2swift.swift_types import (ANY, BOOL, DOUBLE, INT, STRING, SwiftType, array_of, dict_of,
+                                  named, set_of)
+from py2swift.symbol_table import TypeEnvironment
+from py2swift.type_inference import TypeInferencer
+
+
+# ===== INTERNAÇÃO =====
+
+def test_structurally_equal_types_are_the_same_object():
+    assert array_of(INT) is array_of(INT)
+    assert dict_of(STRING, array_of(DOUBLE)) is dict_of(STRING, array_of(DOUBLE))
+    assert set_of(named('Int')) is set_of(INT)
+    assert named('Any') is ANY
+    assert array_of(INT) is not array_of(DOUBLE)
+    assert dict_of(STRING, INT) is not dict_of(INT, STRING)
+
+
+def test_interning_does_not_grow_for_repeated_types():
+    dict_of(STRING, array_of(INT))
+    set_of(array_of(INT))
+    before = len(SwiftType._interned)
+    for _ in range(1000):
+        dict_of(STRING, array_of(INT))
+        set_of(array_of(INT))
+    assert len(SwiftType._interned) == before
+
+
+def test_components_and_spelling():
+    nested = dict_of(STRING, array_of(dict_of(INT, BOOL)))
+    assert nested.is_dict and not nested.is_array
+    assert nested.key is STRING
+    assert nested.value.is_array and nested.value.element is dict_of(INT, BOOL)
+    assert nested.value.element.value is BOOL
+    assert str(nested) == '[String: [[Int: Bool]]]'
+    assert str(set_of(DOUBLE)) == 'Set<Double>' and set_of(DOUBLE).is_set
+    assert INT.is_numeric and DOUBLE.is_numeric and not STRING.is_numeric
+    assert repr(array_of(INT)) == "SwiftType('[Int]')"
+
+
+def test_types_are_immutable_and_reintern_when_unpickled():
+    with pytest.raises(AttributeError):
+        INT.name = 'Float'
+    typ = dict_of(STRING, array_of(INT))
+    assert pickle.loads(pickle.dumps(typ)) is typ
+
+
+def test_inference_returns_interned_types():
+    inferencer = TypeInferencer()
+    inferencer.infer(ast.parse("from typing import Dict, List\n"
+                               "def f(xs: List[int], d: Dict[str, List[float]]):\n"
+                               "    return xs\n"
+                               "m = {'a': [1.5]}\n"))
+    sig = inferencer.func_signatures['f']
+    assert sig['xs'] is array_of(INT)
+    assert sig['d'] is dict_of(STRING, array_of(DOUBLE))
+    assert sig['return'] is array_of(INT)
+    assert inferencer.type_env.get('global', 'm') is dict_of(STRING, array_of(DOUBLE))
+
+
+# ===== BUSCAS NO AMBIENTE DE TIPOS =====
+
+def _nested_environment():
+    env = TypeEnvironment()
+    cls = TypeEnvironment.child_scope(TypeEnvironment.GLOBAL, 'class', 'A')
+    method = TypeEnvironment.child_scope(cls, 'func', 'm')
+    inner = TypeEnvironment.child_scope(method, 'func', 'inner')
+    env.declare_scope(cls, TypeEnvironment.GLOBAL)
+    env.declare_scope(method, cls)
+    env.declare_scope(inner, method)
+    env.set(TypeEnvironment.GLOBAL, 'xs', array_of(INT))
+    env.set(method, 'n', INT)
+    return env, method, inner
+
+
+def test_lookups_do_not_allocate():
+    env, method, inner = _nested_environment()
+
+    def lookups(rounds):
+        for _ in range(rounds):
+            array_of(INT)
+            dict_of(STRING, array_of(DOUBLE))
+            env.resolve(inner, 'xs')
+            env.resolve(inner, 'n')
+            env.get(method, 'n')
+
+    lookups(10)  # interna os tipos antes da medição
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        lookups(20_000)
+        after, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    # Nada retido e pico constante (só temporários), independente do número de buscas
+    assert after - before < 512
+    assert peak - before < 2048
+    assert env.resolve(inner, 'xs') is array_of(INT)
@@ -0,0 +1,84 @@
+import json
+
+from py2swift import PyToSwiftTranspiler, tracing, transpile
+from py2swift.__main__ import main
+
+PROGRAM = ("def add(a: int, b: int):\n"
+           "    return a + b\n"
+           "\n"
+           "x = add(1, 2)\n")
+
+
+def _trace(source: str):
+    events = []
+    tracing.subscribe(events.append)
+    try:
+        transpile(source)
+    finally:
+        tracing.unsubscribe(events.append)
+    return events
+
+
+def test_phases_are_reported_in_order_and_balanced():
+    events = _trace(PROGRAM)
+    phases = [(e.kind, e.name) for e in events if e.kind in (tracing.PHASE_START, tracing.PHASE_END)]
+    top_level = [name for kind, name in phases if kind == tracing.PHASE_START and not name.startswith('opt:')]
+    assert top_level == ['parse', 'front_end', 'solve', 'optimize', 'emit']
+    stack = []
+    for kind, name in phases:
+        if kind == tracing.PHASE_START:
+            stack.append(name)
+        else:
+            assert stack.pop() == name
+    assert not stack
+    ends = [e for e in events if e.kind == tracing.PHASE_END]
+    assert all(e.duration >= 0 for e in ends)
+
+
+def test_visits_are_inclusive_and_carry_the_line():
+    events = _trace(PROGRAM)
+    emit_start = next(i for i, e in enumerate(events) if e.kind == tracing.PHASE_START and e.name == 'emit')
+    visits = [e for e in events[emit_start:] if e.kind == tracing.VISIT]
+    assert [(e.name, e.data['line']) for e in visits] == [('Return', 2), ('FunctionDef', 1), ('Assign', 4)]
+    ret, func = visits[0], visits[1]
+    # o visitante da função inclui o do return
+    assert func.time <= ret.time and ret.time + ret.duration <= func.time + func.duration
+
+
+def test_type_decisions_report_scope_type_and_source():
+    events = _trace(PROGRAM)
+    decisions = [(e.name, e.data['scope'], e.data['type'], e.data['source'])
+                 for e in events if e.kind == tracing.TYPE_DECISION]
+    assert ('return', 'func:add', 'Int', 'signature') in decisions
+    assert [d for d in decisions if d[0] == 'x'][-1] == ('x', 'global', 'Int', 'inference')
+    assert ('add', 'func:add', '(_a: Int, _b: Int) -> Int', 'emit') in decisions
+
+
+def test_no_subscribers_means_no_events_and_no_timed_visitor():
+    seen = []
+    tracing.subscribe(seen.append)
+    tracing.unsubscribe(seen.append)
+    assert not tracing.enabled()
+    tp = PyToSwiftTranspiler()
+    tp.generate(PROGRAM)
+    assert 'visit' not in tp.__dict__
+    assert seen == []
+
+
+def test_json_trace_writer_and_cli_flag(tmp_path, capsys):
+    src = tmp_path / "prog.py"
+    src.write_text(PROGRAM, encoding="utf-8")
+    trace_path = tmp_path / "trace.json"
+    assert main([str(src), str(tmp_path / "prog.swift"), "--trace", str(trace_path)]) == 0
+    assert not tracing.enabled()  # o CLI remove o assinante ao terminar
+    trace = json.loads(trace_path.read_text(encoding="utf-8"))
+    events = trace['traceEvents']
+    phases = [e for e in events if e['cat'] == tracing.PHASE_END]
+    assert [e['name'] for e in phases if not e['name'].startswith('opt:')] == \
+        ['parse', 'front_end', 'solve', 'optimize', 'emit']
+    assert all(e['ph'] == 'X' and e['dur'] >= 0 for e in phases)
+    decisions = [e for e in events if e['cat'] == tracing.TYPE_DECISION]
+    assert decisions and all(e['ph'] == 'i' for e in decisions)
+    assert any(e['name'] == 'return' and e['args'] == {'scope': 'func:add', 'type': 'Int', 'source': 'signature'}
+               for e in decisions)
+    assert f"Wrote trace: {trace_path}" in capsys.readouterr().err
@@ -0,0 +1,218 @@
+import ast
+import time
+
+from py2swift import transpile
+from py2swift.type_inference import TypeInferencer
+
+
+def _kernel(lines: int) -> str:
+    """Função longa cujos parâmetros sem anotação são usados em toda linha"""
+    body = []
+    for i in range(lines):
+        body.append(f"    x{i} = a * {i} + b")
+        body.append(f"    if a > x{i}:")
+        body.append(f"        b = b - {i}")
+    return "def kernel(a, b):\n" + "\n".join(body) + "\n    return a + b\n"
+
+
+def _infer_time(source: str) -> float:
+    best = float('inf')
+    for _ in range(3):
+        tree = ast.parse(source)
+        start = time.perf_counter()
+        TypeInferencer().infer(tree)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def test_parameter_inference_scales_linearly():
+    """8x mais código deve custar perto de 8x (quadrático daria 64x)"""
+    small = _infer_time(_kernel(300))
+    large = _infer_time(_kernel(2400))
+    assert large / small < 20, f"{small:.4f}s -> {large:.4f}s"
+
+
+def test_parameter_types_from_usage():
+    inferencer = TypeInferencer()
+    inferencer.infer(ast.parse(_kernel(10)))
+    assert str(inferencer.func_signatures['kernel']['a']) == 'Int'
+
+
+def _call_chain(functions: int) -> str:
+    """Funções que chamam a anterior: cada retorno resolvido muda uma assinatura"""
+    parts = []
+    for i in range(functions):
+        callee = f"f{i - 1}(a, b)" if i else "a + b"
+        parts.append(f"def f{i}(a, b):\n"
+                     f"    x = a * 2 + b\n"
+                     f"    y = x + {callee}\n"
+                     f"    z = [x, y, x + y]\n"
+                     f"    return x + y * 2\n")
+    return "\n".join(parts)
+
+
+class _FullInvalidation(TypeInferencer):
+    """Referência: qualquer mudança descarta o cache inteiro"""
+    
+    def _invalidate_dependents(self, dependency):
+        self.invalidate_cache()
+
+
+def test_targeted_invalidation_matches_full_invalidation():
+    source = _call_chain(60)
+    targeted, full = TypeInferencer(), _FullInvalidation()
+    targeted.infer(ast.parse(source))
+    full.infer(ast.parse(source))
+    assert dict(targeted.type_env.items()) == dict(full.type_env.items())
+    assert targeted.func_signatures == full.func_signatures
+
+
+def test_signature_change_keeps_unrelated_entries():
+    inferencer = TypeInferencer()
+    inferencer.infer(ast.parse(_call_chain(300)))
+    stats = inferencer.cache_stats()
+    # Só as expressões que dependem do que mudou são recalculadas
+    assert stats['evictions'] < stats['size'] / 2
+    assert stats['misses'] < 1.5 * stats['size']
+
+
+# ===== ESCOPOS QUALIFICADOS =====
+
+def test_same_named_methods_do_not_share_locals():
+    swift = transpile(
+        "class A:\n"
+        "    def setup(self):\n"
+        "        v = 1\n"
+        "        return v\n"
+        "class B:\n"
+        "    def setup(self):\n"
+        "        v = 'text'\n"
+        "        return v\n")
+    assert "let v: Int = 1" in swift
+    assert 'let v: String = "text"' in swift
+    assert "func setup() -> Int" in swift and "func setup() -> String" in swift
+
+
+def test_same_named_init_do_not_share_locals():
+    swift = transpile(
+        "class P:\n"
+        "    def __init__(self):\n"
+        "        label = 1\n"
+        "class Q:\n"
+        "    def __init__(self, p):\n"
+        "        label = 'p'\n")
+    assert "let label: Int = 1" in swift
+    assert 'let label: String = "p"' in swift
+
+
+def test_nested_function_shadowing_top_level():
+    swift = transpile(
+        "def inner():\n"
+        "    return 1\n"
+        "def outer():\n"
+        "    def inner():\n"
+        "        w = 1.5\n"
+        "        return w\n"
+        "    w = 'x'\n"
+        "    return inner()\n")
+    assert "func inner() -> Int" in swift
+    assert "let w: Double = 1.5" in swift
+    assert 'let w: String = "x"' in swift
+    assert "func outer() -> Double" in swift  # a chamada resolve para a função aninhada
+
+
+def test_qualified_signature_keys():
+    inferencer = TypeInferencer()
+    inferencer.infer(ast.parse(
+        "class A:\n"
+        "    def setup(self):\n"
+        "        return 1\n"
+        "def outer():\n"
+        "    def inner():\n"
+        "        return 'x'\n"
+        "    return inner()\n"))
+    assert str(inferencer.func_signatures['A.setup']['return']) == 'Int'
+    assert str(inferencer.func_signatures['outer.inner']['return']) == 'String'
+    assert str(inferencer.func_signatures['outer']['return']) == 'String'
+    assert 'setup' not in inferencer.func_signatures
+
+
+def test_front_end_indexes_parents_only():
+    tree = ast.parse("def f(a):\n    return a + 1\n")
+    inferencer = TypeInferencer()
+    inferencer.infer(tree)
+    ret = tree.body[0].body[0]
+    assert inferencer.node_index.parent(ret.value) is ret
+    assert inferencer.node_index.parent(ret.value.left) is ret.value
+    assert not hasattr(inferencer.node_index, 'name_uses')
+
+
+# ===== SOLVER DE ASSINATURAS (grafo de chamadas) =====
+
+def _signatures(source: str, inferencer: TypeInferencer = None):
+    inferencer = inferencer or TypeInferencer()
+    inferencer.infer(ast.parse(source))
+    return {name: {key: str(typ) for key, typ in sig.items()}
+            for name, sig in inferencer.func_signatures.items()}
+
+
+def test_caller_defined_before_callee_sees_the_callee_return_type():
+    sigs = _signatures("def caller():\n    return callee() + 1\n\n"
+                       "def callee():\n    return 41\n")
+    assert sigs['callee']['return'] == 'Int'
+    assert sigs['caller']['return'] == 'Int'
+
+
+def test_recursive_and_mutually_recursive_functions_resolve():
+    sigs = _signatures("def fib(n: int):\n"
+                       "    if n < 2:\n        return n\n"
+                       "    return fib(n - 1) + fib(n - 2)\n\n"
+                       "def is_even(n: int):\n"
+                       "    if n == 0:\n        return True\n"
+                       "    return is_odd(n - 1)\n\n"
+                       "def is_odd(n: int):\n"
+                       "    if n == 0:\n        return False\n"
+                       "    return is_even(n - 1)\n")
+    assert sigs['fib']['return'] == 'Int'
+    assert sigs['is_even']['return'] == 'Bool'
+    assert sigs['is_odd']['return'] == 'Bool'
+
+
+def test_signatures_do_not_depend_on_definition_order():
+    defs = ["def a():\n    return b() * 2\n",
+            "def b():\n    return c() + 1.5\n",
+            "def c():\n    return 3\n",
+            "def r(n: int):\n    if n == 0:\n        return a()\n    return r(n - 1)\n"]
+    expected = _signatures("\n".join(defs))
+    assert expected['a']['return'] == 'Double' and expected['r']['return'] == 'Double'
+    for order in ([3, 2, 1, 0], [1, 3, 0, 2], [2, 0, 3, 1]):
+        assert _signatures("\n".join(defs[i] for i in order)) == expected
+
+
+def test_components_come_callees_first():
+    inferencer = TypeInferencer()
+    inferencer.infer(ast.parse("def top():\n    return ping(1) + leaf()\n\n"
+                               "def ping(n: int):\n    return pong(n)\n\n"
+                               "def pong(n: int):\n    return ping(n) if n else leaf()\n\n"
+                               "def leaf():\n    return 1\n"))
+    components = inferencer._strongly_connected_components()
+    position = {name: i for i, component in enumerate(components) for name in component}
+    assert sorted(map(sorted, components)) == [['leaf'], ['ping', 'pong'], ['top']]
+    assert position['leaf'] < position['ping'] == position['pong'] < position['top']
+
+
+def test_acyclic_call_chain_visits_each_function_once():
+    chain = "\n".join(f"def f{i}():\n    return f{i + 1}() + 1\n" for i in range(200))
+    chain += "\ndef f200():\n    return 0\n"
+
+    class Counting(TypeInferencer):
+        visits = 0
+
+        def _infer_function_types(self, node):
+            Counting.visits += 1
+            return super()._infer_function_types(node)
+
+    sigs = _signatures(chain, Counting())
+    assert sigs['f0']['return'] == 'Int'
+    # ordem topológica reversa: nenhum chamador é revisitado
+    assert Counting.visits == 201
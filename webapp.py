@@ -1,4 +1,5 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request, jsonify, stream_with_context
+import json
 import os
 import sys
 import logging
@@ -8,13 +9,17 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 if BASE_DIR not in sys.path:
     sys.path.insert(0, BASE_DIR)
 
-from py2swift import transpile, TranspileError
+from py2swift import TranspilerPool, TranspileError
 
-# Configuração básica de logging
-logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
+# Configuração básica de logging (DEBUG só quando pedido, ex.: PY2SWIFT_LOG_LEVEL=DEBUG)
+logging.basicConfig(level=os.environ.get('PY2SWIFT_LOG_LEVEL', 'INFO').upper(),
+                    format='%(asctime)s - %(levelname)s - %(message)s')
 
 app = Flask(__name__, template_folder="templates")
 
+# Transpiladores reutilizados entre requisições (um por requisição simultânea)
+transpilers = TranspilerPool(size=int(os.environ.get('PY2SWIFT_POOL_SIZE', '8')))
+
 @app.route('/')
 def index():
     return render_template('index.html')
@@ -23,10 +28,10 @@ def index():
 def transpile_code():
     data = request.json or {}
     src = data.get('source', '')
-    logging.debug(f"Código recebido para transpilar: {src}")
+    logging.debug("Código recebido para transpilar: %s", src)
 
     try:
-        output = transpile(src)
+        output = transpilers.transpile(src)
         logging.debug("Transpiração bem-sucedida.")
         return jsonify({
             'success': True,
@@ -47,6 +52,52 @@ def transpile_code():
             'error': f"Erro Interno do Servidor: {str(e)}. Por favor, entre em contato com o suporte."
         }), 500
 
+@app.route('/transpile/stream', methods=['POST'])
+def transpile_stream():
+    """Transmite o código Swift em partes, um comando de nível superior por vez"""
+    data = request.json or {}
+    src = data.get('source', '')
+
+    try:
+        # A análise roda aqui; erros de sintaxe/inferência saem antes do primeiro byte
+        chunks = transpilers.iter_transpile(src)
+    except TranspileError as e:
+        logging.error(f"Erro de transpile: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': f"Erro de Transpiler: {str(e)}. Verifique o código Python fornecido e tente novamente."
+        }), 400
+
+    except Exception as e:
+        logging.exception("Erro inesperado durante a transpiração.")
+        return jsonify({
+            'success': False,
+            'error': f"Erro Interno do Servidor: {str(e)}. Por favor, entre em contato com o suporte."
+        }), 500
+
+    return Response(stream_with_context(_guarded_chunks(chunks)), mimetype='text/plain; charset=utf-8')
+
+# Marcador da última linha quando a geração falha depois do primeiro byte
+STREAM_ERROR_MARKER = '// py2swift-error: '
+
+def _guarded_chunks(chunks):
+    """Repassa os trechos; um erro no meio do streaming vira uma linha final
+    com o mesmo JSON de erro de /transpile (o status HTTP já foi enviado)"""
+    try:
+        yield from chunks
+    except TranspileError as e:
+        logging.error(f"Erro de transpile durante o streaming: {str(e)}")
+        yield _stream_error(400, f"Erro de Transpiler: {str(e)}. Verifique o código Python fornecido e tente novamente.")
+    except Exception as e:
+        logging.exception("Erro inesperado durante o streaming.")
+        yield _stream_error(500, f"Erro Interno do Servidor: {str(e)}. Por favor, entre em contato com o suporte.")
+    finally:
+        chunks.close()
+
+def _stream_error(status, message):
+    payload = json.dumps({'success': False, 'status': status, 'error': message}, ensure_ascii=False)
+    return f"\n{STREAM_ERROR_MARKER}{payload}\n"
+
 @app.route('/health', methods=['GET'])
 def health_check():
     return jsonify({
@@ -55,4 +106,5 @@ def health_check():
     })
 
 if __name__ == '__main__':
-    app.run(host='127.0.0.1', port=5000, debug=True)
\ No newline at end of file
+    # Cada requisição usa sua própria instância do pool: seguro com várias threads
+    app.run(host='127.0.0.1', port=5000, debug=True, threaded=True)
\ No newline at end of file